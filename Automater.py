@@ -5,7 +5,8 @@ The Automater.py module defines the main() function for Automater.
 Parameter Required is:
 target -- List one IP Address (CIDR or dash notation accepted), URL or Hash
 to query or pass the filename of a file containing IP Address info, URL or
-Hash to query each separated by a newline.
+Hash to query each separated by a newline. The file may be gzip compressed
+when its name ends in .gz and - reads the targets from stdin.
 
 Optional Parameters are:
 -o, --output -- This option will output the results to a file.
@@ -13,7 +14,14 @@ Optional Parameters are:
 -f, --cef -- This option will output the results to a CEF formatted file.
 -w, --web -- This option will output the results to an HTML file.
 -c, --csv -- This option will output the results to a CSV file.
--d, --delay -- Change the delay to the inputted seconds. Default is 2.
+--jsonl -- This option will output one JSON record per result to a file. The file is gzip
+compressed when its name ends in .gz.
+--jsonl-metadata -- This option adds the seconds each lookup took and whether its content came
+from the response cache to every JSON record. Default (no --jsonl-metadata) is False.
+--db -- This option will store the results of the run in a SQLite database that can be searched
+with the query command.
+-d, --delay -- Change the delay to the inputted seconds. The delay is applied between
+requests to the same source domain unless the site declares a ratelimit. Default is 2.
 -s, --source -- Will only run the target against a specific source engine
 to pull associated domains. Options are defined in the name attribute of
 the site element in the XML configuration file. This can be a list of names separated by a semicolon.
@@ -25,22 +33,108 @@ module in the Automater scope.  Default, (no -V) is False
 -r, --refreshxml -- This option refreshes the tekdefense.xml file from the remote GitHub site.
 Default (no -r) is False.
 -v, --verbose -- This option prints messages to the screen. Default (no -v) is False.
+--cache-dir -- This option sets the directory holding the response cache and the parsed XML
+configuration files. Default is ~/.automater
+--cache-ttl -- This option sets the seconds retrieved content is reused for sites that do not
+declare a cachettl in the XML configuration file. Default is 3600.
+--no-cache -- This option disables the response cache. Default (no --no-cache) is False.
+--cache-only -- This option only answers lookups from the response cache and never contacts a source.
+Default (no --cache-only) is False.
+--dry-run -- This option lists the lookups that would be made without contacting any source.
+Default (no --dry-run) is False.
+--pool-size -- This option sets the number of keep-alive connections kept open to each
+source domain. Default is 10.
+--workers -- This option sets the number of site lookups that will run at the same time.
+Requests to a single source are still separated by the delay. Default is 1.
+--retries -- This option sets how many times a request that cannot connect or is answered with 429
+or a 5xx status is sent again, waiting a jittered exponential backoff or the Retry-After the source
+asks for. Default is 2.
+--retry-backoff -- This option sets the most seconds the first retry waits. Every further retry
+doubles it. Default is 1.
+--breaker-threshold -- This option sets how many requests to a source domain must fail in a row
+before its requests fail at once for a cooldown. 0 never stops requests. Default is 5.
+--breaker-cooldown -- This option sets the seconds requests to a failing source domain fail at
+once before one request is let through to probe it. Default is 60.
+--connect-timeout -- This option sets the seconds every GET and POST request waits to connect to a
+source. Default is 5.
+--read-timeout -- This option sets the seconds every GET and POST request waits between bytes of
+the answer of a source. Default is 5.
+--lookup-deadline -- This option sets the seconds each lookup may take including its retries.
+Requests are cut short once they are passed. 0 does not limit a lookup. Default is 0.
+--deadline -- This option sets the seconds the whole run may take. Lookups still outstanding once
+they are passed are cancelled and the results retrieved so far are written. 0 does not limit the
+run. Default is 0.
+--max-bytes -- This option sets the most bytes read from each answer of a source that does not
+declare a maxbytes in the XML configuration file. 0 reads every answer whole. Default is 10485760.
+--stop-early -- This option stops reading the answer of a source once every regex of the site has
+matched, so later matches in the rest of the answer are not reported. Default (no --stop-early)
+is False.
+--max-expansion -- This option sets the most addresses a single CIDR or dash range expands to.
+0 does not limit the expansion. Default is 65536.
+--include-reserved -- This option keeps private, loopback, multicast and other reserved addresses
+when a range is expanded. Default (no --include-reserved) is False.
+--dedupe-limit -- This option sets how many unique targets are remembered exactly before duplicates
+are found with a probabilistic filter that uses less memory. IP Addresses are always remembered
+exactly and are not counted. Default is 1000000.
+--journal -- This option appends every completed lookup and its results to the file named so an
+interrupted run can be resumed with --resume.
+--resume -- This option restores the lookups completed in the journal file named instead of running
+them again and appends new lookups to the same file unless --journal names another.
+--sort -- This option writes the outputs sorted by target once every lookup has completed instead of
+writing each result as soon as its lookup completes. Default (no --sort) is False.
+--record -- This option records every answer of a source to the cassette directory named so the
+run can be replayed with --replay. Answers are recorded up to the most bytes read from the source.
+The response cache is not used.
+--replay -- This option answers every request from the cassette directory named instead of
+contacting any source. The response cache is not used.
+--replay-profile -- This option injects the latency and errors declared per source domain in the
+JSON file named into a --replay run (see transport.Cassette for the format).
+--replay-seed -- This option seeds the random latency and errors of --replay-profile. Default is 0.
+
+Automater.py query DATABASE searches the results stored by earlier runs with --db. Its optional
+parameters are:
+-t, --target -- This option only lists results for the target.
+-s, --source -- This option only lists results from the source named by its friendly name.
+--since -- This option only lists results stored on or after the date given as YYYY-MM-DD.
+--run -- This option only lists results stored by the run numbered.
+--limit -- This option sets the most results listed. 0 lists every result. Default is 0.
+--runs -- This option lists the runs stored instead of results.
+--diff OLDRUN NEWRUN -- This option lists the values found by only one of the two runs numbered.
+
+Automater.py serve runs Automater as a long-running local HTTP service that keeps the site
+definitions, connection pools and response cache warm between lookups (see service.py for the
+API). Its optional parameters are:
+--host -- This option sets the address the service listens on. Default is 127.0.0.1.
+--port -- This option sets the port the service listens on. Default is 8770.
+--socket -- This option listens on the Unix socket named instead of a TCP port.
+--workers -- This option sets the number of site lookups of one request that will run at the
+same time. Default is 4.
+-d, --delay, --proxy, -a, --useragent, --cache-dir, --cache-ttl, --no-cache, --pool-size,
+--retries, --retry-backoff, --breaker-threshold, --breaker-cooldown, --connect-timeout,
+--read-timeout, --lookup-deadline, --max-bytes, --max-expansion, --include-reserved and -v,
+--verbose work as they do for a run.
 
 Class(es):
 No classes are defined in this module.
 
 Function(s):
 main -- Provides the instantiation point for Automater.
+query -- Searches the results stored in a SQLite database.
+serve -- Runs Automater as a local HTTP service.
 
 Exception(s):
 No exceptions exported.
 """
 
 import sys
-from siteinfo import SiteFacade, Site
-from utilities import Parser, IPWrapper
-from outputs import SiteDetailOutput
+import os
+from siteinfo import SiteFacade, Site, SiteDefinitionCache, LookupJournal
+from utilities import Parser, QueryParser, ServeParser, TargetPipeline
+from outputs import SiteDetailOutput, StreamingOutput, ResultStore
 from inputs import TargetFile
+from transport import SessionRegistry, ResponseCache, RequestCoalescer, RetryPolicy, CircuitBreaker, Deadline, \
+    ResponseReader, Cassette
+from service import LookupService, ThreadedHTTPServer, ThreadedUnixHTTPServer
 
 __VERSION__ = '0.21'
 __GITLOCATION__ = 'https://github.com/1aN0rmus/TekDefense-Automater'
@@ -60,6 +154,13 @@ def main():
     The Method has no restrictions.
     """
 
+    if len(sys.argv) > 1 and sys.argv[1] == 'query':
+        query(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2:])
+        return
+
     sites = []
     parser = Parser('IP, URL, and Hash Passive Analysis tool', __VERSION__)
 
@@ -79,31 +180,152 @@ def main():
         sourcelist = parser.Source.split(';')
 
     # a file input capability provides a possibility of
-    # multiple lines of targets
-    targetlist = []
+    # multiple lines of targets. targets are read, defanged and
+    # expanded lazily as the lookups are planned
     if parser.hasInputFile():
-        for tgtstr in TargetFile.TargetList(parser.InputFile, parser.Verbose):
-            tgtstrstripped = tgtstr.replace('[.]', '.').replace('{.}', '.').replace('(.)', '.')
-            if IPWrapper.isIPorIPList(tgtstrstripped):
-                for targ in IPWrapper.getTarget(tgtstrstripped):
-                    targetlist.append(targ)
-            else:
-                targetlist.append(tgtstrstripped)
+        targetlist = TargetPipeline.getTargets(TargetFile.TargetList(parser.InputFile, parser.Verbose),
+                                               parser.MaxExpansion, not parser.hasIncludeReserved(),
+                                               parser.DedupeLimit, parser.Verbose)
     else:  # one target or list of range of targets added on console
-        target = parser.Target
-        tgtstrstripped = target.replace('[.]', '.').replace('{.}', '.').replace('(.)', '.')
-        if IPWrapper.isIPorIPList(tgtstrstripped):
-            for targ in IPWrapper.getTarget(tgtstrstripped):
-                targetlist.append(targ)
-        else:
-            targetlist.append(tgtstrstripped)
+        targetlist = TargetPipeline.getTargets([parser.Target], parser.MaxExpansion, not parser.hasIncludeReserved(),
+                                               parser.DedupeLimit, parser.Verbose)
 
-    sitefac = SiteFacade(parser.Verbose)
-    sitefac.runSiteAutomation(parser.Delay, parser.Proxy, targetlist, sourcelist, parser.UserAgent, parser.hasBotOut,
-                              parser.RefreshRemoteXML, __GITLOCATION__)
+    SessionRegistry.setPoolSize(parser.PoolSize)
+    SessionRegistry.setTimeout(parser.ConnectTimeout, parser.ReadTimeout)
+    RetryPolicy.configure(parser.Retries, parser.RetryBackoff)
+    CircuitBreaker.configure(parser.BreakerThreshold, parser.BreakerCooldown)
+    ResponseReader.configure(parser.MaxBytes, parser.hasStopEarly())
+    cassettemode = None
+    if parser.hasRecord():
+        cassettemode = Cassette.RECORD
+    elif parser.hasReplay():
+        cassettemode = Cassette.REPLAY
+    try:
+        Cassette.configure(parser.Cassette, cassettemode, parser.ReplayProfile, parser.ReplaySeed)
+    except (IOError, OSError, ValueError) as e:
+        print '[!] Cannot use the cassette: ' + str(e)
+        sys.exit(1)
+    SiteDefinitionCache.configure(parser.CacheDir)
+    # a cassette records or replays every request, so the response cache is bypassed
+    ResponseCache.configure(parser.CacheDir, not parser.hasNoCache() and cassettemode is None,
+                            parser.hasCacheOnly() and cassettemode is None, parser.CacheTTL, parser.Verbose)
+    journal = None
+    if parser.hasJournal() or parser.hasResume():
+        journal = LookupJournal(parser.Journal, parser.Resume, parser.Verbose)
+    # without --sort each site is written as soon as its lookup completes
+    output = None
+    if not parser.hasSort() and not parser.hasDryRun():
+        output = StreamingOutput(SiteDetailOutput.createWriters(parser))
+    sitefac = SiteFacade(parser.Verbose, journal, output)
+    if parser.hasDryRun():
+        jobs = sitefac.planLookups(parser.Delay, parser.Proxy, targetlist, sourcelist, parser.UserAgent,
+                                   parser.hasBotOut(), parser.RefreshRemoteXML, __GITLOCATION__)
+        SiteDetailOutput.PrintLookupPlan([job for job in jobs if not job.Restored])
+        if journal:
+            journal.close()
+        return
+
+    if output:
+        output.open()
+    Deadline.configure(parser.LookupDeadline, parser.Deadline)
+    try:
+        sitefac.runSiteAutomation(parser.Delay, parser.Proxy, targetlist, sourcelist, parser.UserAgent,
+                                  parser.hasBotOut(), parser.RefreshRemoteXML, __GITLOCATION__, parser.Workers)
+    finally:
+        if output:
+            output.close()
+        SessionRegistry.closeAll()
+        ResponseCache.close()
+        if journal:
+            journal.close()
+    SiteDetailOutput.PrintStandardOutput('\n[*] {retrieved} requests retrieved, {joined} joined an identical request in '
+                                         'flight and {reused} reused content already retrieved'
+                                         .format(**RequestCoalescer.getMetrics()), verbose=parser.Verbose)
+    SiteDetailOutput.PrintStandardOutput('[*] {opened} circuit breakers opened and {rejected} requests failed at once'
+                                         .format(**CircuitBreaker.getMetrics()), verbose=parser.Verbose)
+    if cassettemode is not None:
+        SiteDetailOutput.PrintStandardOutput('[*] {recorded} responses recorded, {replayed} replayed, {missing} not '
+                                             'found in the cassette and {injected} failed by the replay profile'
+                                             .format(**Cassette.getMetrics()), verbose=parser.Verbose)
+    if sitefac.Cancelled:
+        SiteDetailOutput.PrintStandardOutput('[-] The run deadline passed. Outstanding lookups were cancelled and '
+                                             'the output is partial.')
     sites = sitefac.Sites
     if sites:
         SiteDetailOutput(sites).createOutputInfo(parser)
 
+def query(arguments):
+    """
+    Searches the results stored in a SQLite database by earlier runs with --db
+    and prints the results, the runs or the difference between two runs.
+
+    Argument(s):
+    arguments -- list of the arguments following the query command.
+
+    Return value(s):
+    Nothing is returned from this Method.
+
+    Restriction(s):
+    The Method has no restrictions.
+    """
+    parser = QueryParser('Search the results stored by Automater runs with --db', arguments)
+    if not os.path.isfile(parser.Database):
+        print '[!] ' + parser.Database + ' does not exist.'
+        sys.exit(1)
+    since = parser.Since
+    store = ResultStore(parser.Database)
+    try:
+        if parser.hasRuns():
+            SiteDetailOutput.PrintStoredRuns(store.getRuns())
+        elif parser.hasDiff():
+            oldrun, newrun = parser.Diff
+            SiteDetailOutput.PrintStoredDiff(store.getDiff(oldrun, newrun, parser.Target, parser.Source))
+        else:
+            SiteDetailOutput.PrintStoredResults(store.getResults(parser.Target, parser.Source, since, parser.Run,
+                                                                 parser.Limit))
+    finally:
+        store.close()
+
+def serve(arguments):
+    """
+    Runs Automater as a long-running local HTTP service until it is interrupted.
+
+    Argument(s):
+    arguments -- list of the arguments following the serve command.
+
+    Return value(s):
+    Nothing is returned from this Method.
+
+    Restriction(s):
+    The Method has no restrictions.
+    """
+    parser = ServeParser('Run Automater as a local HTTP service', __VERSION__, arguments)
+    SessionRegistry.setPoolSize(parser.PoolSize)
+    SessionRegistry.setTimeout(parser.ConnectTimeout, parser.ReadTimeout)
+    RetryPolicy.configure(parser.Retries, parser.RetryBackoff)
+    CircuitBreaker.configure(parser.BreakerThreshold, parser.BreakerCooldown)
+    ResponseReader.configure(parser.MaxBytes)
+    SiteDefinitionCache.configure(parser.CacheDir)
+    ResponseCache.configure(parser.CacheDir, not parser.hasNoCache(), False, parser.CacheTTL, parser.Verbose)
+    Deadline.configure(parser.LookupDeadline)
+    service = LookupService(parser.Delay, parser.Proxy, parser.UserAgent, parser.Workers, parser.MaxExpansion,
+                            not parser.hasIncludeReserved(), __GITLOCATION__, parser.Verbose)
+    if parser.hasSocket():
+        server = ThreadedUnixHTTPServer(parser.Socket, service)
+        print '[+] Automater service listening on ' + parser.Socket
+    else:
+        server = ThreadedHTTPServer((parser.Host, parser.Port), service)
+        print '[+] Automater service listening on http://{host}:{port}/'.format(host=parser.Host,
+                                                                               port=server.server_address[1])
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        SessionRegistry.closeAll()
+        ResponseCache.close()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,388 @@
+"""
+The bench.py module benchmarks Automater end to end with no network.
+It serves a stand-in for every site of tekdefense.xml on loopback
+ports (see standin.py), builds synthetic target feeds (see feeds.py)
+and runs Automater once per feed size in a process of its own (see
+runner.py). It reports requests and lookups per second, p50 and p99
+lookup times, peak resident memory and wall-clock time for every run
+as JSON, so results can be compared across commits.
+
+Usage: python bench/bench.py [options] [-- Automater arguments]
+
+Every run uses a working directory of its own holding the rewritten
+tekdefense.xml, an empty sites.xml, the feed and the site definition
+cache. Runs use -d 0, --no-cache and the --workers given, and any
+Automater arguments following -- are added to every run. The screen
+output of Automater is discarded.
+
+Class(es):
+BenchParser -- Class representing the options of the benchmark.
+Benchmark -- Class running the benchmark and building its report.
+
+Function(s):
+main -- Runs the benchmark and writes the report.
+
+Exception(s):
+No exceptions exported.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from feeds import TargetFeed
+from standin import StandInServer, SiteProfile
+
+__REPODIR__ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+__EMPTYSITESXML__ = '<?xml version="1.0"?>\n<automater_root>\n</automater_root>\n'
+
+
+class BenchParser(object):
+    """
+    BenchParser represents an argparse object representing the options
+    of the benchmark.
+
+    Public Method(s):
+    (Property) Sizes
+    (Property) Workers
+    (Property) Profile
+    (Property) SiteProfiles
+    (Property) Seed
+    (Property) Output
+    (Property) AutomaterArguments
+
+    Instance variable(s):
+    _parser
+    args
+    """
+
+    def __init__(self, arguments=None):
+        """
+        Class constructor. Adds the argparse info into the instance variables.
+
+        Argument(s):
+        arguments -- list of the arguments to parse. Default is None which
+        parses the command line.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._parser = argparse.ArgumentParser(description='Benchmark Automater against a local stand-in for '
+                                                           'every tekdefense.xml source')
+        self._parser.add_argument('--sizes', default='1,100,10000,100000', help='This option sets the comma separated numbers of targets of the feeds, one run each. Default is 1,100,10000,100000.')
+        self._parser.add_argument('--workers', type=int, default=8, help='This option sets the --workers of every run. Default is 8.')
+        self._parser.add_argument('--latency', type=float, default=0.0, help='This option sets the seconds every stand-in delays its answers. Default is 0.')
+        self._parser.add_argument('--jitter', type=float, default=0.0, help='This option sets the most seconds added at random to the latency. Default is 0.')
+        self._parser.add_argument('--body-size', type=int, default=16384, help='This option sets the bytes of every successful answer. Default is 16384.')
+        self._parser.add_argument('--error-rate', type=float, default=0.0, help='This option sets the share of requests, between 0 and 1, answered with the error status. Default is 0.')
+        self._parser.add_argument('--error-status', type=int, default=503, help='This option sets the status of the failed answers. Default is 503.')
+        self._parser.add_argument('--site-profiles', help='This option names a JSON file mapping site names to any of latency, jitter, bodysize, errorrate and errorstatus overriding the options above for that site.')
+        self._parser.add_argument('--seed', type=int, default=0, help='This option seeds the feeds and the random latency and errors. Default is 0.')
+        self._parser.add_argument('-o', '--output', help='This option writes the JSON report to the file named instead of the screen.')
+        self._parser.add_argument('automaterarguments', nargs=argparse.REMAINDER, help='Automater arguments added to every run, following --.')
+        self.args = self._parser.parse_args(arguments)
+        try:
+            self._sizes = [int(size) for size in self.args.sizes.split(',') if size.strip()]
+        except ValueError:
+            self._parser.error('--sizes must be comma separated integers')
+
+    @property
+    def Sizes(self):
+        """
+        Returns the numbers of targets of the feeds.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of integers.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._sizes
+
+    @property
+    def Workers(self):
+        """
+        Returns the --workers of every run.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(1, self.args.workers)
+
+    @property
+    def Profile(self):
+        """
+        Returns the SiteProfile of every stand-in.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        SiteProfile.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return SiteProfile(self.args.latency, self.args.jitter, self.args.body_size, self.args.error_rate,
+                           self.args.error_status)
+
+    @property
+    def SiteProfiles(self):
+        """
+        Returns the values overriding the profile per site name.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict -- mapping site names to dicts. Empty if no file was named.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        Exits through argparse if the file cannot be read.
+        """
+        if not self.args.site_profiles:
+            return {}
+        try:
+            with open(self.args.site_profiles) as f:
+                return json.load(f)
+        except (IOError, ValueError) as e:
+            self._parser.error('--site-profiles cannot be read: ' + str(e))
+
+    @property
+    def Seed(self):
+        """
+        Returns the seed of the feeds and of the random latency and errors.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.seed
+
+    @property
+    def Output(self):
+        """
+        Returns the file the report is written to or None for the screen.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if the report is printed to the screen.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.output
+
+    @property
+    def AutomaterArguments(self):
+        """
+        Returns the Automater arguments added to every run.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of strings.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        arguments = self.args.automaterarguments
+        if arguments and arguments[0] == '--':
+            arguments = arguments[1:]
+        return arguments
+
+
+class Benchmark(object):
+    """
+    Benchmark runs Automater once per feed size against a StandInServer
+    and builds the report of every run.
+
+    Public Method(s):
+    run
+    runSize
+    getReport
+    (Class Method) getCommit
+
+    Instance variable(s):
+    _parser
+    _server
+    _runs
+    """
+
+    def __init__(self, parser):
+        """
+        Class constructor.
+
+        Argument(s):
+        parser -- BenchParser holding the options of the benchmark.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._parser = parser
+        self._server = StandInServer(os.path.join(__REPODIR__, 'tekdefense.xml'), parser.Profile,
+                                     parser.SiteProfiles, parser.Seed)
+        self._runs = []
+
+    def run(self):
+        """
+        Starts the stand-ins and runs Automater for every feed size.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._server.start()
+        try:
+            for size in self._parser.Sizes:
+                self._runs.append(self.runSize(size))
+        finally:
+            self._server.stop()
+
+    def runSize(self, size):
+        """
+        Runs Automater over a feed of size targets in a working directory
+        of its own and returns the measurements of the run.
+
+        Argument(s):
+        size -- integer number of targets of the feed.
+
+        Return value(s):
+        OrderedDict -- the measurements of the run.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        workdir = tempfile.mkdtemp(prefix='automater-bench-')
+        try:
+            self._server.writeXML(os.path.join(workdir, 'tekdefense.xml'))
+            with open(os.path.join(workdir, 'sites.xml'), 'w') as f:
+                f.write(__EMPTYSITESXML__)
+            feedfile = os.path.join(workdir, 'targets.txt')
+            TargetFeed.write(feedfile, size, self._parser.Seed)
+            resultfile = os.path.join(workdir, 'result.json')
+            command = [sys.executable, os.path.join(__REPODIR__, 'bench', 'runner.py'), resultfile, feedfile,
+                       '-d', '0', '--no-cache', '--cache-dir', os.path.join(workdir, 'cache'),
+                       '--workers', str(self._parser.Workers)] + self._parser.AutomaterArguments
+            self._server.getCounts()
+            with open(os.devnull, 'w') as devnull:
+                returncode = subprocess.call(command, cwd=workdir, stdout=devnull, stderr=devnull)
+            served, failed = self._server.getCounts()
+            result = OrderedDict([('targets', size), ('workers', self._parser.Workers), ('returncode', returncode)])
+            if returncode != 0 or not os.path.isfile(resultfile):
+                return result
+            with open(resultfile) as f:
+                measured = json.load(f)
+            wall = measured['wall_seconds']
+            result['lookups'] = measured['lookups']
+            result['requests'] = served
+            result['failed_requests'] = failed
+            result['wall_seconds'] = round(wall, 3)
+            result['requests_per_second'] = round(served / wall, 1) if wall else None
+            result['lookups_per_second'] = round(measured['lookups'] / wall, 1) if wall else None
+            for name in ('latency_p50_seconds', 'latency_p99_seconds'):
+                result[name] = round(measured[name], 6) if measured[name] is not None else None
+            result['peak_rss_kb'] = measured['peak_rss_kb']
+            return result
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @classmethod
+    def getCommit(cls):
+        """
+        Returns the git commit of the Automater tree being measured.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if the tree is not a git checkout.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        try:
+            with open(os.devnull, 'w') as devnull:
+                return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=__REPODIR__,
+                                               stderr=devnull).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def getReport(self):
+        """
+        Returns the report of the benchmark.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        OrderedDict -- the commit, the settings and the measurements of every run.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return OrderedDict([('commit', self.getCommit()),
+                            ('timestamp', time.strftime('%Y-%m-%dT%H:%M:%S')),
+                            ('python', platform.python_version()),
+                            ('settings', OrderedDict([('profile', self._parser.Profile.toDictionary()),
+                                                      ('site_profiles', self._parser.SiteProfiles),
+                                                      ('seed', self._parser.Seed),
+                                                      ('automater_arguments', self._parser.AutomaterArguments)])),
+                            ('runs', self._runs)])
+
+
+def main():
+    """
+    Runs the benchmark and writes its JSON report to the screen or a file.
+
+    Argument(s):
+    No arguments are required.
+
+    Return value(s):
+    Nothing is returned from this Method.
+
+    Restriction(s):
+    The Method has no restrictions.
+    """
+    parser = BenchParser()
+    benchmark = Benchmark(parser)
+    benchmark.run()
+    report = json.dumps(benchmark.getReport(), indent=2)
+    if parser.Output:
+        with open(parser.Output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print report
+
+if __name__ == "__main__":
+    main()
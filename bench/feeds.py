@@ -0,0 +1,90 @@
+"""
+The feeds.py module builds the synthetic target feeds the benchmark
+runs Automater against. A feed of a given size always holds the same
+targets, so runs of different commits look up the same lookups.
+
+Class(es):
+TargetFeed -- Class building a reproducible list of unique targets.
+
+Function(s):
+No global exportable functions are defined.
+
+Exception(s):
+No exceptions exported.
+"""
+import hashlib
+import random
+
+
+class TargetFeed(object):
+    """
+    TargetFeed provides Class Methods to build a reproducible feed of
+    unique targets mixing the target types Automater looks up: public
+    IPv4 addresses, hostnames and MD5 hashes.
+
+    Public Method(s):
+    (Class Method) getTargets
+    (Class Method) write
+
+    Instance variable(s):
+    No instance variables.
+    """
+    # share of every target type in a feed, in the order they are drawn
+    __MIX__ = (('ip', 0.6), ('hostname', 0.25), ('md5', 0.15))
+
+    @classmethod
+    def getTargets(cls, count, seed=0):
+        """
+        Yields count unique targets.
+
+        Argument(s):
+        count -- integer number of targets.
+        seed -- integer choosing the targets. Default is 0.
+
+        Return value(s):
+        Iterator of strings.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        chooser = random.Random(seed)
+        seen = set()
+        index = 0
+        while len(seen) < count:
+            index += 1
+            draw = chooser.random()
+            for targettype, share in cls.__MIX__:
+                draw -= share
+                if draw < 0:
+                    break
+            if targettype == 'ip':
+                # 11.0.0.0 to 99.255.255.255 holds no reserved ranges
+                target = '{0}.{1}.{2}.{3}'.format(chooser.randint(11, 99), chooser.randint(0, 255),
+                                                  chooser.randint(0, 255), chooser.randint(1, 254))
+            elif targettype == 'hostname':
+                target = 'host{0}.bench{1}.example.com'.format(index, chooser.randint(0, 999))
+            else:
+                target = hashlib.md5('{0}:{1}'.format(seed, index)).hexdigest()
+            if target not in seen:
+                seen.add(target)
+                yield target
+
+    @classmethod
+    def write(cls, filename, count, seed=0):
+        """
+        Writes a feed of count targets to a file, one target per line.
+
+        Argument(s):
+        filename -- string representing the file written.
+        count -- integer number of targets.
+        seed -- integer choosing the targets. Default is 0.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with open(filename, 'w') as f:
+            for target in cls.getTargets(count, seed):
+                f.write(target + '\n')
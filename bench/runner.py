@@ -0,0 +1,162 @@
+"""
+The runner.py module runs one Automater run for the benchmark in a
+process of its own, so its wall-clock time and peak memory are
+measured apart from the stand-in server and from every other run. The
+time each lookup took is gathered from SiteFacade as the lookups
+complete.
+
+Usage: python bench/runner.py RESULTFILE [Automater arguments]
+
+The Automater arguments are handed to Automater.main unchanged. The
+measurements are written to RESULTFILE as JSON.
+
+Class(es):
+LatencyHistogram -- Class gathering lookup times in bounded memory.
+
+Function(s):
+main -- Runs Automater and writes the measurements.
+
+Exception(s):
+No exceptions exported.
+"""
+import json
+import math
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Automater
+from siteinfo import SiteFacade
+
+
+class LatencyHistogram(object):
+    """
+    LatencyHistogram gathers lookup times into buckets growing by 1% each,
+    so percentiles are within 1% of the exact value however many
+    lookups a run makes, and the memory used does not grow with the run.
+
+    Public Method(s):
+    add
+    getPercentile
+    (Property) Count
+
+    Instance variable(s):
+    _buckets
+    _count
+    """
+    __SMALLEST__ = 1e-6
+    __GROWTH__ = math.log(1.01)
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._buckets = {}
+        self._count = 0
+
+    def add(self, seconds):
+        """
+        Adds the time of one lookup.
+
+        Argument(s):
+        seconds -- float seconds the lookup took.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        bucket = int(math.log(max(seconds, self.__SMALLEST__) / self.__SMALLEST__) / self.__GROWTH__)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self._count += 1
+
+    def getPercentile(self, percentile):
+        """
+        Returns the time below which the percentile of lookups completed.
+
+        Argument(s):
+        percentile -- float between 0 and 100.
+
+        Return value(s):
+        float -- seconds, the upper bound of the bucket holding the percentile.
+        None -- if no time was added.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if not self._count:
+            return None
+        rank = max(1, int(math.ceil(self._count * percentile / 100.0)))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return self.__SMALLEST__ * math.exp((bucket + 1) * self.__GROWTH__)
+
+    @property
+    def Count(self):
+        """
+        Returns the number of lookup times added.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._count
+
+
+def main():
+    """
+    Runs Automater with the arguments following the result file and writes
+    the wall-clock time, the lookup count, the p50 and p99 lookup times and
+    the peak resident memory of the run to the result file.
+
+    Argument(s):
+    No arguments are required.
+
+    Return value(s):
+    Nothing is returned from this Method.
+
+    Restriction(s):
+    The Method has no restrictions.
+    """
+    resultfile = sys.argv[1]
+    histogram = LatencyHistogram()
+    runlookup = SiteFacade.runLookup
+
+    def timedLookup(facade, job):
+        job = runlookup(facade, job)
+        if job.Site is not None and job.Site.Elapsed is not None:
+            histogram.add(job.Site.Elapsed)
+        return job
+
+    SiteFacade.runLookup = timedLookup
+    sys.argv = ['Automater.py'] + sys.argv[2:]
+    started = time.time()
+    Automater.main()
+    wall = time.time() - started
+    with open(resultfile, 'w') as f:
+        json.dump({'wall_seconds': wall,
+                   'lookups': histogram.Count,
+                   'latency_p50_seconds': histogram.getPercentile(50),
+                   'latency_p99_seconds': histogram.getPercentile(99),
+                   # ru_maxrss is kilobytes on Linux
+                   'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}, f)
+
+if __name__ == "__main__":
+    main()
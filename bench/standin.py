@@ -0,0 +1,682 @@
+"""
+The standin.py module provides a local HTTP server impersonating every
+site of the tekdefense.xml configuration file so Automater can be
+benchmarked end to end with no network. Each site is served on its own
+loopback port, so rate limits, pooled sessions and circuit breakers see
+one domain per site just as they do against the real sources.
+
+Every answer holds a string generated from each regex of the site, so
+the lookups find results, followed by filler up to the body size
+asked for. Latency and errors can be set for every site and
+overridden per site by name.
+
+Class(es):
+SampleGenerator -- Class building a string matched by a regex.
+SiteProfile -- Class holding the latency, body size and error rate of a site.
+StandInSite -- Class holding what the stand-in of one site answers.
+StandInRequestHandler -- Class answering the requests sent to the stand-in of a site.
+StandInHTTPServer -- Class serving the stand-in of one site on a loopback port.
+StandInServer -- Class serving the stand-ins of every site of an xml config file.
+
+Function(s):
+No global exportable functions are defined.
+
+Exception(s):
+No exceptions exported.
+"""
+import random
+import re
+import sre_constants
+import sre_parse
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+__TARGETSENTINEL__ = 'QQBENCHTARGETQQ'
+
+
+class SampleGenerator(object):
+    """
+    SampleGenerator provides Class Methods to build a short string matched
+    by a regex from the parsed form of the regex. Alternatives take their
+    first branch, repeats their least count of at least one and character
+    classes their first member, which is enough for the regexs of the
+    xml config files.
+
+    Public Method(s):
+    (Class Method) generate
+    (Class Method) generateParsed
+    (Class Method) generateFromClass
+    (Class Method) classMatches
+
+    Instance variable(s):
+    No instance variables.
+    """
+    __CANDIDATES__ = 'aZ0 x-_.:/'
+
+    @classmethod
+    def generate(cls, regex):
+        """
+        Returns a string the regex is expected to match.
+
+        Argument(s):
+        regex -- regex string.
+
+        Return value(s):
+        string.
+        None -- if the regex cannot be parsed or the string built is not
+        matched by it.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        try:
+            sample = cls.generateParsed(sre_parse.parse(regex))
+            if re.search(regex, sample):
+                return sample
+        except (sre_constants.error, ValueError, TypeError):
+            pass
+        return None
+
+    @classmethod
+    def generateParsed(cls, pattern):
+        """
+        Returns a string matched by a parsed regex.
+
+        Argument(s):
+        pattern -- the parsed regex returned by sre_parse.parse.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        parts = []
+        for op, av in pattern:
+            if op == sre_constants.LITERAL:
+                parts.append(unichr(av) if av > 255 else chr(av))
+            elif op == sre_constants.NOT_LITERAL:
+                parts.append('a' if av != ord('a') else 'b')
+            elif op == sre_constants.ANY:
+                parts.append('a')
+            elif op == sre_constants.IN:
+                parts.append(cls.generateFromClass(av))
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                least, most, subpattern = av
+                count = least if least > 0 else min(1, most)
+                parts.append(cls.generateParsed(subpattern) * count)
+            elif op == sre_constants.SUBPATTERN:
+                parts.append(cls.generateParsed(av[-1]))
+            elif op == sre_constants.BRANCH:
+                parts.append(cls.generateParsed(av[1][0]))
+            # anchors, assertions and group references add nothing
+        return ''.join(parts)
+
+    @classmethod
+    def generateFromClass(cls, items):
+        """
+        Returns one character of a parsed character class.
+
+        Argument(s):
+        items -- list of the (op, av) members of the class.
+
+        Return value(s):
+        string -- a single character.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises ValueError if no candidate character fits a negated class.
+        """
+        if items and items[0][0] == sre_constants.NEGATE:
+            for candidate in cls.__CANDIDATES__:
+                if not cls.classMatches(candidate, items[1:]):
+                    return candidate
+            raise ValueError('no candidate fits the negated class')
+        for candidate in cls.__CANDIDATES__:
+            if cls.classMatches(candidate, items):
+                return candidate
+        op, av = items[0]
+        if op == sre_constants.LITERAL:
+            return chr(av)
+        if op == sre_constants.RANGE:
+            return chr(av[0])
+        raise ValueError('no candidate fits the class')
+
+    @classmethod
+    def classMatches(cls, character, items):
+        """
+        Checks whether a character is a member of a parsed character class.
+
+        Argument(s):
+        character -- string of a single character.
+        items -- list of the (op, av) members of the class without NEGATE.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        code = ord(character)
+        for op, av in items:
+            if op == sre_constants.LITERAL and av == code:
+                return True
+            if op == sre_constants.RANGE and av[0] <= code <= av[1]:
+                return True
+            if op == sre_constants.CATEGORY:
+                category = {sre_constants.CATEGORY_DIGIT: character.isdigit(),
+                            sre_constants.CATEGORY_NOT_DIGIT: not character.isdigit(),
+                            sre_constants.CATEGORY_SPACE: character.isspace(),
+                            sre_constants.CATEGORY_NOT_SPACE: not character.isspace(),
+                            sre_constants.CATEGORY_WORD: character.isalnum() or character == '_',
+                            sre_constants.CATEGORY_NOT_WORD: not (character.isalnum() or character == '_')}
+                if category.get(av):
+                    return True
+        return False
+
+
+class SiteProfile(object):
+    """
+    SiteProfile holds how the stand-in of a site answers: how long it
+    waits, how large its answers are and how often it fails.
+
+    Public Method(s):
+    (Class Method) fromDictionary
+    getDelay
+    isFailing
+    toDictionary
+
+    Instance variable(s):
+    latency
+    jitter
+    bodysize
+    errorrate
+    errorstatus
+    """
+    __slots__ = ('latency', 'jitter', 'bodysize', 'errorrate', 'errorstatus')
+
+    def __init__(self, latency=0.0, jitter=0.0, bodysize=16384, errorrate=0.0, errorstatus=503):
+        """
+        Class constructor.
+
+        Argument(s):
+        latency -- float seconds every answer is delayed. Default is 0.
+        jitter -- float most seconds added at random to the latency. Default is 0.
+        bodysize -- integer bytes of every successful answer. Default is 16384.
+        errorrate -- float share of requests, between 0 and 1, answered with
+        errorstatus. Default is 0.
+        errorstatus -- integer status of the failed answers. Default is 503.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self.latency = max(0.0, float(latency))
+        self.jitter = max(0.0, float(jitter))
+        self.bodysize = max(0, int(bodysize))
+        self.errorrate = min(1.0, max(0.0, float(errorrate)))
+        self.errorstatus = int(errorstatus)
+
+    @classmethod
+    def fromDictionary(cls, values, default):
+        """
+        Builds a profile from a dictionary, taking every value it does not
+        hold from the default profile.
+
+        Argument(s):
+        values -- dict with any of latency, jitter, bodysize, errorrate and errorstatus.
+        default -- SiteProfile the missing values are taken from.
+
+        Return value(s):
+        SiteProfile.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        merged = default.toDictionary()
+        merged.update(values)
+        return cls(merged['latency'], merged['jitter'], merged['bodysize'], merged['errorrate'],
+                   merged['errorstatus'])
+
+    def getDelay(self, chooser):
+        """
+        Returns the seconds an answer is delayed.
+
+        Argument(s):
+        chooser -- random.Random making the random choices.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.jitter:
+            return self.latency + chooser.uniform(0, self.jitter)
+        return self.latency
+
+    def isFailing(self, chooser):
+        """
+        Decides whether a request is answered with the error status.
+
+        Argument(s):
+        chooser -- random.Random making the random choices.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return self.errorrate > 0 and chooser.random() < self.errorrate
+
+    def toDictionary(self):
+        """
+        Returns the profile as a dictionary.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+
+class StandInSite(object):
+    """
+    StandInSite holds what the stand-in of one site of the xml config
+    file answers and counts the requests it served.
+
+    Public Method(s):
+    getBody
+    countRequest
+    getCounts
+    (Property) Name
+    (Property) Profile
+    (Property) Unmatched
+
+    Instance variable(s):
+    _name
+    _profile
+    _samples
+    _unmatched
+    _filler
+    _chooser
+    _guard
+    _served
+    _failed
+    """
+
+    def __init__(self, name, regexs, profile, seed=0):
+        """
+        Class constructor. Builds a sample string for every regex of the site.
+
+        Argument(s):
+        name -- string defined in the name attribute of the site element.
+        regexs -- list of the regex strings of the site.
+        profile -- SiteProfile of the site.
+        seed -- integer seeding the latency and error choices. Default is 0.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._name = name
+        self._profile = profile
+        self._samples = []
+        self._unmatched = []
+        for regex in regexs:
+            sample = SampleGenerator.generate(regex.replace('%TARGET%', __TARGETSENTINEL__))
+            if sample is None:
+                self._unmatched.append(regex)
+            else:
+                self._samples.append(sample)
+        self._filler = ('#' * 63 + '\n') * (profile.bodysize // 64 + 1)
+        self._chooser = random.Random('{seed}:{name}'.format(seed=seed, name=name))
+        self._guard = threading.Lock()
+        self._served = 0
+        self._failed = 0
+
+    @property
+    def Name(self):
+        """
+        Returns the name of the site.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._name
+
+    @property
+    def Profile(self):
+        """
+        Returns the SiteProfile of the site.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        SiteProfile.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._profile
+
+    @property
+    def Unmatched(self):
+        """
+        Returns the regexs no sample string could be built for.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of regex strings.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._unmatched
+
+    def countRequest(self):
+        """
+        Counts a request and decides how it is answered.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- (delay, failing) float seconds the answer is delayed and
+        whether it is answered with the error status.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._guard:
+            delay = self._profile.getDelay(self._chooser)
+            failing = self._profile.isFailing(self._chooser)
+            self._served += 1
+            if failing:
+                self._failed += 1
+        return delay, failing
+
+    def getBody(self, target):
+        """
+        Returns the body of a successful answer for a target: one line for
+        each regex of the site, then filler up to the body size.
+
+        Argument(s):
+        target -- string target taken from the request path.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        head = '\n'.join(sample.replace(__TARGETSENTINEL__, target) for sample in self._samples) + '\n'
+        return head + self._filler[:max(0, self._profile.bodysize - len(head))]
+
+    def getCounts(self):
+        """
+        Returns how many requests were served and failed since the last call
+        and starts counting again.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- (served, failed) integers.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._guard:
+            counts = self._served, self._failed
+            self._served = self._failed = 0
+        return counts
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    StandInRequestHandler answers GET and POST requests to the stand-in of
+    a site. The target is the first segment of the request path.
+
+    Public Method(s):
+    do_GET
+    do_POST
+    answer
+    log_message
+
+    Instance variable(s):
+    No instance variables.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """
+        Answers a GET request.
+        """
+        self.answer()
+
+    def do_POST(self):
+        """
+        Reads the posted data and answers the request.
+        """
+        length = int(self.headers.getheader('content-length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.answer()
+
+    def answer(self):
+        """
+        Sends the answer of the site after its delay.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        site = self.server.site
+        delay, failing = site.countRequest()
+        if delay:
+            time.sleep(delay)
+        if failing:
+            body = ''
+            self.send_response(site.Profile.errorstatus)
+        else:
+            target = self.path.split('?', 1)[0].strip('/').split('/', 1)[0]
+            body = site.getBody(target)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """
+        Keeps requests from being logged, which would slow the stand-in down.
+        """
+        pass
+
+
+class StandInHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    StandInHTTPServer serves the stand-in of one site on a free loopback
+    port and answers each connection on its own thread.
+
+    Public Method(s):
+    No public methods beyond HTTPServer.
+
+    Instance variable(s):
+    site
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, site):
+        """
+        Class constructor. Binds the server to a free loopback port and
+        stores the StandInSite it answers for.
+
+        Argument(s):
+        site -- StandInSite answering the requests.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self.site = site
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StandInRequestHandler)
+
+
+class StandInServer(object):
+    """
+    StandInServer serves the stand-in of every site of an xml config file,
+    each on its own loopback port, and writes a copy of the xml config
+    file whose sites point at their stand-ins.
+
+    Public Method(s):
+    start
+    stop
+    writeXML
+    getCounts
+    (Property) Sites
+
+    Instance variable(s):
+    _tree
+    _sites
+    _servers
+    """
+
+    def __init__(self, xmlfile, profile, siteprofiles=None, seed=0):
+        """
+        Class constructor. Reads the sites of the xml config file.
+
+        Argument(s):
+        xmlfile -- string representing the xml config file to impersonate.
+        profile -- SiteProfile used for every site.
+        siteprofiles -- dict mapping site names to dicts overriding the values
+        of profile for that site. Default is None.
+        seed -- integer seeding the latency and error choices. Default is 0.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        siteprofiles = siteprofiles or {}
+        self._tree = ElementTree.parse(xmlfile)
+        self._sites = []
+        self._servers = []
+        for siteelement in self._tree.getroot().iter('site'):
+            name = siteelement.get('name')
+            regexs = [entry.text or '' for entry in siteelement.find('regex').findall('entry')]
+            siteprofile = SiteProfile.fromDictionary(siteprofiles.get(name, {}), profile)
+            self._sites.append((siteelement, StandInSite(name, regexs, siteprofile, seed)))
+
+    @property
+    def Sites(self):
+        """
+        Returns the stand-in of every site in the order of the xml config file.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of StandInSite objects.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return [site for siteelement, site in self._sites]
+
+    def start(self):
+        """
+        Starts serving every site on a thread of its own.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for siteelement, site in self._sites:
+            server = StandInHTTPServer(site)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.daemon = True
+            thread.start()
+            self._servers.append(server)
+            baseurl = 'http://127.0.0.1:{port}/'.format(port=server.server_address[1])
+            siteelement.find('domainurl').text = baseurl
+            siteelement.find('fullurl').text = baseurl + '%TARGET%'
+
+    def stop(self):
+        """
+        Stops serving every site.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def writeXML(self, xmlfile):
+        """
+        Writes the xml config file with every site pointing at its stand-in.
+
+        Argument(s):
+        xmlfile -- string representing the file written.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        Only sites of a started server point at their stand-ins.
+        """
+        self._tree.write(xmlfile)
+
+    def getCounts(self):
+        """
+        Returns how many requests every site served and failed since the
+        last call.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- (served, failed) integers.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        served = failed = 0
+        for site in self.Sites:
+            siteserved, sitefailed = site.getCounts()
+            served += siteserved
+            failed += sitefailed
+        return served, failed
@@ -18,6 +18,8 @@ Exception(s):
 No exceptions exported.
 """
 import os
+import sys
+import gzip
 import hashlib
 import requests
 from outputs import SiteDetailOutput
@@ -45,6 +47,9 @@ class TargetFile(object):
         """
         Opens a file for reading.
         Returns each string from each line of a single or multi-line file.
+        The file is read one line at a time so large feeds are never held
+        in memory. A filename of - reads from stdin and a filename ending
+        in .gz is decompressed as it is read.
         
         Argument(s):
         filename -- string based name of the file that will be retrieved and parsed.
@@ -58,11 +63,19 @@ class TargetFile(object):
         """
         try:
             target = ''
-            with open(filename) as f:
-                li = f.readlines()
-                for i in li:
+            if filename == '-':
+                f = sys.stdin
+            elif filename.endswith('.gz'):
+                f = gzip.open(filename, 'rb')
+            else:
+                f = open(filename)
+            try:
+                for i in f:
                     target = str(i).strip()
                     yield target
+            finally:
+                if f is not sys.stdin:
+                    f.close()
         except IOError:
             SiteDetailOutput.PrintStandardOutput('There was an error reading from the target input file.',
                                                  verbose=verbose)
@@ -7,6 +7,18 @@ any other output requirement should be programmed in this module.
 Class(es):
 SiteDetailOutput -- Wrapper class around all functions that print output
 from Automater, to include standard output and file system output.
+ResultRecord -- Class holding one normalized line of output flattened from a site.
+StreamingOutput -- Class that writes each site to every requested output
+as soon as its lookup completes.
+SiteWriter -- Parent class of the writers formatting result records for one output.
+ScreenWriter -- Class that prints result records to standard output.
+CEFWriter -- Class that writes result records to a CEF formatted file.
+TextWriter -- Class that writes result records to a text file.
+CSVWriter -- Class that writes result records to a CSV file.
+JSONLWriter -- Class that writes result records to a file of JSON records.
+DBWriter -- Class that stores result records in a SQLite database.
+ResultStore -- Class that keeps the results of every run in a SQLite database.
+HTMLWriter -- Class that writes result records to an HTML file.
 
 Function(s):
 No global exportable functions are defined.
@@ -16,8 +28,15 @@ No exceptions exported.
 """
 
 import csv
+import gzip
+import json
 import socket
 import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from operator import attrgetter
 
@@ -29,10 +48,22 @@ class SiteDetailOutput(object):
 
     Public Method(s):
     createOutputInfo
+    writeSites
+    (Property) Records
+    (Class Method) createWriters
+    (Class Method) PrintLookupPlan
+    (Class Method) PrintStoredRuns
+    (Class Method) PrintStoredResults
+    (Class Method) PrintStoredDiff
+    (Class Method) getTimestamp
+    (Class Method) PrintStandardOutput
 
     Instance variable(s):
     _listofsites - list storing the list of site results stored.
+    _records - list storing the result records flattened from the sorted sites.
     """
+    # guards standard output so messages from worker threads do not interleave
+    _stdoutlock = threading.Lock()
 
     def __init__(self,sitelist):
         """
@@ -46,6 +77,7 @@ class SiteDetailOutput(object):
         """
         self._listofsites = []
         self._listofsites = sitelist
+        self._records = None
 
     @property
     def ListOfSites(self):
@@ -90,6 +122,10 @@ class SiteDetailOutput(object):
             self.PrintToHTMLFile(parser.HTMLOutFile)
         if parser.hasCSVOutSet():
             self.PrintToCSVFile(parser.CSVOutFile)
+        if parser.hasJSONLOutFile():
+            self.PrintToJSONLFile(parser.JSONLOutFile, parser.hasJSONLMetadata())
+        if parser.hasDatabase():
+            self.PrintToDatabase(parser.Database)
 
     def PrintToScreen(self, printinbotformat):
         """
@@ -125,73 +161,1286 @@ class SiteDetailOutput(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        sites = sorted(self.ListOfSites, key=attrgetter('Target'))
-        target = ""
-        if sites is not None:
-            for site in sites:
-                if not isinstance(site._regex,basestring):  # this is a multisite
-                    for index in range(len(site.RegEx)):  # the regexs will ensure we have the exact number of lookups
-                        siteimpprop = site.getImportantProperty(index)
-                        if target != site.Target:
-                            print "\n**_ Results found for: " + site.Target + " _**"
-                            target = site.Target
-                            # Check for them ALL to be None or 0 length
-                        sourceurlhasnoreturn = True
-                        for answer in siteimpprop:
-                            if answer is not None:
-                                if len(answer) > 0:
-                                    sourceurlhasnoreturn = False
-
-                        if sourceurlhasnoreturn:
-                            print '[+] ' + site.SourceURL + ' No results found'
-                            break
-                        else:
-                            if siteimpprop is None or len(siteimpprop) == 0:
-                                print "No results in the " + site.FriendlyName[index] + " category"
-                            else:
-                                if siteimpprop[index] is None or len(siteimpprop[index]) == 0:
-                                    print site.ReportStringForResult[index] + ' No results found'
-                                else:
-                                    laststring = ""
-                                    # if it's just a string we don't want it output like a list
-                                    if isinstance(siteimpprop[index], basestring):
-                                        if "" + site.ReportStringForResult[index] + " " + str(siteimpprop) != laststring:
-                                            print "" + site.ReportStringForResult[index] + " " + str(siteimpprop).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                            laststring = "" + site.ReportStringForResult[index] + " " + str(siteimpprop)
-                                    # must be a list since it failed the isinstance check on string
-                                    else:
-                                        laststring = ""
-                                        for siteresult in siteimpprop[index]:
-                                            if "" + site.ReportStringForResult[index] + " " + str(siteresult) != laststring:
-                                                print "" + site.ReportStringForResult[index] + " " + str(siteresult).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                                laststring = "" + site.ReportStringForResult[index] + " " + str(siteresult)
-                else:#this is a singlesite
-                    siteimpprop = site.getImportantProperty(0)
-                    if target != site.Target:
-                        print "\n**_ Results found for: " + site.Target + " _**"
-                        target = site.Target
-                    if siteimpprop is None or len(siteimpprop)==0:
-                        print '[+] ' + site.FriendlyName + ' No results found'
-                    else:
-                        laststring = ""
-                        #if it's just a string we don't want it output like a list
-                        if isinstance(siteimpprop, basestring):
-                            if "" + site.ReportStringForResult + " " + str(siteimpprop) != laststring:
-                                print "" + site.ReportStringForResult + " " + str(siteimpprop).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                laststring = "" + site.ReportStringForResult + " " + str(siteimpprop)
-                        #must be a list since it failed the isinstance check on string
-                        else:
-                            laststring = ""
-                            for siteresult in siteimpprop:
-                                if "" + site.ReportStringForResult + " " + str(siteresult) != laststring:
-                                    print "" + site.ReportStringForResult + " " + str(siteresult).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                    laststring = "" + site.ReportStringForResult + " " + str(siteresult)
+        self.writeSites(ScreenWriter(True))
+
+    def PrintToScreenNormal(self):
+        """
+        Formats site information correctly and prints it to the user's standard output.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(ScreenWriter(False))
+
+    def PrintToCEFFile(self,cefoutfile):
+        """
+        Formats site information correctly and prints it to an output file in CEF format.
+        CEF format specification from http://mita-tac.wikispaces.com/file/view/CEF+White+Paper+071709.pdf
+        "Jan 18 11:07:53 host message"
+        where message:
+        "CEF:Version|Device Vendor|Device Product|Device Version|Signature ID|Name|Severity|Extension"
+        Returns nothing.
+
+        Argument(s):
+        cefoutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(CEFWriter(cefoutfile))
+
+    def PrintToTextFile(self,textoutfile):
+        """
+        Formats site information correctly and prints it to an output file in text format.
+        Returns nothing.
+
+        Argument(s):
+        textoutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(TextWriter(textoutfile))
+
+    def PrintToCSVFile(self,csvoutfile):
+        """
+        Formats site information correctly and prints it to an output file with comma-seperators.
+        Returns nothing.
+
+        Argument(s):
+        csvoutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(CSVWriter(csvoutfile))
+
+    def PrintToJSONLFile(self, jsonloutfile, metadata=False):
+        """
+        Formats site information as one JSON record per result and prints it
+        to an output file, gzip compressed when the file name ends in .gz.
+        Returns nothing.
+
+        Argument(s):
+        jsonloutfile -- A string representation of a file that will store the output.
+        metadata -- True if the seconds each lookup took and whether its content
+        came from the response cache are added to every record. Default is False.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(JSONLWriter(jsonloutfile, metadata))
+
+    def PrintToDatabase(self, dbfile):
+        """
+        Stores site information as a new run in a SQLite database.
+        Returns nothing.
+
+        Argument(s):
+        dbfile -- A string representation of a SQLite database file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(DBWriter(dbfile))
+
+    def PrintToHTMLFile(self, htmloutfile):
+        """
+        Formats site information correctly and prints it to an output file using HTML markup.
+        Returns nothing.
+
+        Argument(s):
+        htmloutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.writeSites(HTMLWriter(htmloutfile))
+
+    @property
+    def Records(self):
+        """
+        Flattens the sites sorted by target into result records the first
+        time it is called, so every output requested writes the same records.
+        Returns the list of ResultRecord objects.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of ResultRecord objects.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self._records is None:
+            self._records = []
+            for site in sorted(self.ListOfSites, key=attrgetter('Target')):
+                self._records.extend(ResultRecord.fromSite(site))
+        return self._records
+
+    def writeSites(self, writer):
+        """
+        Writes the result records of every site, sorted by target, with a writer.
+        Returns nothing.
+
+        Argument(s):
+        writer -- SiteWriter object that formats the records.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        writer.open()
+        writer.writeRecords(self.Records)
+        writer.close()
+
+    @classmethod
+    def createWriters(cls, parser):
+        """
+        Creates the writers for every output requested in the order
+        createOutputInfo writes them.
+
+        Argument(s):
+        parser -- Parser object storing program input parameters used when program was run.
+
+        Return value(s):
+        list -- of SiteWriter objects.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        writers = [ScreenWriter(parser.hasBotOut())]
+        if parser.hasCEFOutFile():
+            writers.append(CEFWriter(parser.CEFOutFile))
+        if parser.hasTextOutFile():
+            writers.append(TextWriter(parser.TextOutFile))
+        if parser.hasHTMLOutFile():
+            writers.append(HTMLWriter(parser.HTMLOutFile))
+        if parser.hasCSVOutSet():
+            writers.append(CSVWriter(parser.CSVOutFile))
+        if parser.hasJSONLOutFile():
+            writers.append(JSONLWriter(parser.JSONLOutFile, parser.hasJSONLMetadata()))
+        if parser.hasDatabase():
+            writers.append(DBWriter(parser.Database))
+        return writers
+
+    @classmethod
+    def PrintLookupPlan(cls, jobs):
+        """
+        Prints every planned lookup and the request it would send, followed
+        by the number of lookups planned. Used for dry runs.
+        Returns nothing.
+
+        Argument(s):
+        jobs -- list of LookupJob objects planned by the SiteFacade.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for job in jobs:
+            site = job.PlannedSite
+            cls.PrintStandardOutput('[*] ' + job.Target + ' | ' + job.SourceName + ' | ' + site.Method + ' ' +
+                                    site.FullURL)
+        cls.PrintStandardOutput('\n[+] {count} lookups planned'.format(count=len(jobs)))
+
+    @classmethod
+    def PrintStoredRuns(cls, runs):
+        """
+        Prints every run stored in a result database.
+        Returns nothing.
+
+        Argument(s):
+        runs -- list of (run, started, finished, arguments, count) tuples from a ResultStore.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for run, started, finished, arguments, count in runs:
+            if finished is None:
+                finished = 'unfinished'
+            else:
+                finished = cls.getTimestamp(finished)
+            cls.PrintStandardOutput(u'[*] Run {run} | {started} | {finished} | {count} results | {arguments}'.format(
+                run=run, started=cls.getTimestamp(started), finished=finished, count=count,
+                arguments=arguments).encode('utf-8'))
+
+    @classmethod
+    def PrintStoredResults(cls, results):
+        """
+        Prints results stored in a result database followed by their number.
+        Returns nothing.
+
+        Argument(s):
+        results -- list of (run, timestamp, target, type, source, field, value, status) tuples from a ResultStore.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for run, timestamp, target, targettype, source, field, value, status in results:
+            if value is None:
+                value = 'No results found'
+            cls.PrintStandardOutput(u'[*] {timestamp} | run {run} | {target} | {source} | {field} {value}'.format(
+                timestamp=cls.getTimestamp(timestamp), run=run, target=target, source=source, field=field,
+                value=value).encode('utf-8'))
+        cls.PrintStandardOutput('\n[+] {count} results found'.format(count=len(results)))
+
+    @classmethod
+    def PrintStoredDiff(cls, changes):
+        """
+        Prints the values that differ between two stored runs followed by their number.
+        Returns nothing.
+
+        Argument(s):
+        changes -- list of (change, target, source, field, value) tuples from a ResultStore.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for change, target, source, field, value in changes:
+            cls.PrintStandardOutput(u'{change} {target} | {source} | {field} {value}'.format(
+                change=change, target=target, source=source, field=field, value=value).encode('utf-8'))
+        cls.PrintStandardOutput('\n[+] {count} changes found'.format(count=len(changes)))
+
+    @classmethod
+    def getTimestamp(cls, seconds):
+        """
+        Formats seconds since the epoch as local date and time.
+
+        Argument(s):
+        seconds -- float seconds since the epoch.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return datetime.fromtimestamp(seconds).strftime('%Y-%m-%d %H:%M:%S')
+
+    @classmethod
+    def PrintStandardOutput(cls, strout, *args, **kwargs):
+        if 'verbose' in kwargs.keys():
+            if kwargs['verbose'] is True:
+                with cls._stdoutlock:
+                    print strout
+            else:
+                return
+        else:
+            with cls._stdoutlock:
+                print strout
+
+    def getHTMLOpening(self):
+        """
+        Creates HTML markup to provide correct formatting for initial HTML file requirements.
+        Returns string that contains opening HTML markup information for HTML output file.
+
+        Argument(s):
+        No arguments required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return HTMLWriter.getHTMLOpening()
+
+    def getHTMLClosing(self):
+        """
+        Creates HTML markup to provide correct formatting for closing HTML file requirements.
+        Returns string that contains closing HTML markup information for HTML output file.
+
+        Argument(s):
+        No arguments required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return HTMLWriter.getHTMLClosing()
+
+
+class ResultRecord(object):
+    """
+    ResultRecord is one normalized line of output flattened from a site:
+    the target, its type, the source, the report string of the field and
+    one value found for it, or the reason nothing was found. A site is
+    flattened once and every writer formats the same records, so the
+    number of outputs requested does not change how often sites are walked.
+
+    Public Method(s):
+    toDictionary
+    (Class Method) fromSite
+
+    Instance variable(s):
+    target
+    targettype
+    source
+    field
+    value
+    status
+    multi
+    siteempty
+    sourceurl
+    repeated
+    detail
+    first
+    elapsed
+    cachehit
+    """
+    __slots__ = ('target', 'targettype', 'source', 'field', 'value', 'status', 'multi', 'siteempty', 'sourceurl',
+                 'repeated', 'detail', 'first', 'elapsed', 'cachehit')
+    # the important property held a value, was empty for the whole site or was empty for one field
+    FOUND = 'found'
+    EMPTY = 'empty'
+    FIELDEMPTY = 'fieldempty'
+
+    def __init__(self, target, targettype, source, field, value, status, multi, siteempty, sourceurl,
+                 repeated=False, detail=None):
+        """
+        Class constructor.
+
+        Argument(s):
+        target -- string representation of the target looked up.
+        targettype -- string representation of the target type.
+        source -- string representation of the friendly name of the source.
+        field -- string representation of the report string of the field.
+        value -- the value found or None if nothing was found.
+        status -- FOUND, EMPTY or FIELDEMPTY.
+        multi -- True if the record comes from a site with more than one regex.
+        siteempty -- True if the site found no value for any of its fields.
+        sourceurl -- string representation of the url of the source.
+        repeated -- True if the value equals the value found just before it.
+        detail -- the value written after the report string in CEF output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self.target = target
+        self.targettype = targettype
+        self.source = source
+        self.field = field
+        self.value = value
+        self.status = status
+        self.multi = multi
+        self.siteempty = siteempty
+        self.sourceurl = sourceurl
+        self.repeated = repeated
+        self.detail = detail
+        self.first = False
+        self.elapsed = None
+        self.cachehit = None
+
+    def toDictionary(self, metadata=False):
+        """
+        Returns the record as an ordered dictionary of target, type, source,
+        field, value and status, where value is None when nothing was found.
+        Text is decoded as UTF-8 the way ResultStore stores it, so the
+        dictionary can be dumped as JSON whatever bytes a source returned.
+
+        Argument(s):
+        metadata -- True if the seconds the lookup took and whether its content
+        came from the response cache are added. Default is False.
+
+        Return value(s):
+        OrderedDict.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if isinstance(self.value, (tuple, list)):
+            value = [ResultStore.toText(item) for item in self.value]
+        else:
+            value = ResultStore.toText(self.value)
+        dictionary = OrderedDict([('target', ResultStore.toText(self.target)), ('type', self.targettype),
+                                  ('source', ResultStore.toText(self.source)),
+                                  ('field', ResultStore.toText(self.field)), ('value', value),
+                                  ('status', self.status)])
+        if metadata:
+            if self.elapsed is not None:
+                dictionary['elapsed'] = round(self.elapsed, 3)
+            else:
+                dictionary['elapsed'] = None
+            dictionary['cachehit'] = self.cachehit
+        return dictionary
+
+    @classmethod
+    def fromSite(cls, site):
+        """
+        Flattens the important property of a site into records in the order
+        the outputs write them.
+
+        Argument(s):
+        site -- Site object or one of its subordinates holding results.
+
+        Return value(s):
+        list -- of ResultRecord objects, never empty.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        records = []
+        target = site.Target
+        targettype = site.TargetType
+        sourceurl = site.SourceURL
+        if not isinstance(site._regex, basestring):  # this is a multisite
+            for index in range(len(site.RegEx)):  # the regexs will ensure we have the exact number of lookups
+                siteimpprop = site.getImportantProperty(index)
+                source = site.FriendlyName[index]
+                field = site.ReportStringForResult[index]
+                siteempty = True
+                for answer in siteimpprop or []:
+                    if answer is not None and len(answer) > 0:
+                        siteempty = False
+                        break
+                if siteimpprop is None or len(siteimpprop) == 0:
+                    records.append(cls(target, targettype, source, field, None, cls.EMPTY, True, siteempty,
+                                       sourceurl))
+                elif siteimpprop[index] is None or len(siteimpprop[index]) == 0:
+                    records.append(cls(target, targettype, source, field, None, cls.FIELDEMPTY, True, siteempty,
+                                       sourceurl))
+                # if it's just a string we don't want it output like a list
+                elif isinstance(siteimpprop[index], basestring):
+                    records.append(cls(target, targettype, source, field, siteimpprop[index], cls.FOUND, True,
+                                       siteempty, sourceurl, False, siteimpprop[index]))
+                # must be a list since it failed the isinstance check on string
+                else:
+                    laststring = None
+                    for siteresult in siteimpprop[index]:
+                        records.append(cls(target, targettype, source, field, siteresult, cls.FOUND, True, siteempty,
+                                           sourceurl, str(siteresult) == laststring, siteresult))
+                        laststring = str(siteresult)
+        else:  # this is a singlesite
+            siteimpprop = site.getImportantProperty(0)
+            source = site.FriendlyName
+            field = site.ReportStringForResult
+            if siteimpprop is None or len(siteimpprop) == 0:
+                records.append(cls(target, targettype, source, field, None, cls.EMPTY, False, True, sourceurl))
+            # if it's just a string we don't want it output like a list
+            elif isinstance(siteimpprop, basestring):
+                records.append(cls(target, targettype, source, field, siteimpprop, cls.FOUND, False, False,
+                                   sourceurl, False, siteimpprop))
+            # must be a list since it failed the isinstance check on string.
+            # CEF output has always followed each value with the whole list
+            else:
+                laststring = None
+                for siteresult in siteimpprop:
+                    records.append(cls(target, targettype, source, field, siteresult, cls.FOUND, False, False,
+                                       sourceurl, str(siteresult) == laststring, siteimpprop))
+                    laststring = str(siteresult)
+        records[0].first = True
+        elapsed = site.Elapsed
+        cachehit = site.CacheHit
+        for record in records:
+            record.elapsed = elapsed
+            record.cachehit = cachehit
+        return records
+
+
+class StreamingOutput(object):
+    """
+    StreamingOutput writes each site to every requested output as soon
+    as its lookup completes instead of waiting for the whole run, so
+    results reach the screen and the output files while later lookups
+    are still running and no site needs to be kept once written. Sites
+    are written in the order they complete rather than sorted by target.
+
+    Public Method(s):
+    open
+    write
+    close
+
+    Instance variable(s):
+    _writers
+    """
+
+    def __init__(self, writers):
+        """
+        Class constructor. Stores the writers for the requested outputs.
+
+        Argument(s):
+        writers -- list of SiteWriter objects.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._writers = writers
+
+    def open(self):
+        """
+        Opens every writer. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for writer in self._writers:
+            writer.open()
+
+    def write(self, site):
+        """
+        Flattens a site into records once, writes them to every writer
+        and flushes it. Returns nothing.
+
+        Argument(s):
+        site -- Site object or one of its subordinates holding results.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        records = ResultRecord.fromSite(site)
+        for writer in self._writers:
+            writer.writeRecords(records)
+            writer.flush()
+
+    def close(self):
+        """
+        Closes every writer. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for writer in self._writers:
+            writer.close()
+
+
+class SiteWriter(object):
+    """
+    SiteWriter is the parent object of the writers that format result
+    records for one output. A writer is opened once, written one record
+    at a time and closed once, so the same writer serves sorted output at
+    the end of a run and streaming output during it.
+
+    Public Method(s):
+    open
+    write
+    writeRecords
+    flush
+    close
+
+    Instance variable(s):
+    No instance variables.
+    """
+
+    def open(self):
+        """
+        Prepares the output before the first record. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        pass
+
+    def write(self, record):
+        """
+        Formats one record for the output. Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        pass
+
+    def writeRecords(self, records):
+        """
+        Formats every record in turn for the output. Returns nothing.
+
+        Argument(s):
+        records -- list of ResultRecord objects.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """
+        Pushes everything written so far to the output. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        pass
+
+    def close(self):
+        """
+        Finishes the output after the last record. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        pass
+
+
+class ScreenWriter(SiteWriter):
+    """
+    ScreenWriter prints records to the user's standard output in the normal
+    or the minimized bot format.
+
+    Public Method(s):
+    write
+    writeRecords
+    flush
+
+    Instance variable(s):
+    _printinbotformat
+    _target
+    _skipsite
+    """
+
+    def __init__(self, printinbotformat):
+        """
+        Class constructor.
+
+        Argument(s):
+        printinbotformat -- True or False argument representing minimized output. True if minimized requested.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._printinbotformat = printinbotformat
+        self._target = ""
+        self._skipsite = False
+
+    def write(self, record):
+        """
+        Prints a record to the user's standard output.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._printinbotformat:
+            self.writeBot(record)
+        else:
+            self.writeNormal(record)
+
+    def writeRecords(self, records):
+        """
+        Prints every record to the user's standard output without interleaving
+        with messages printed by worker threads.
+        Returns nothing.
+
+        Argument(s):
+        records -- list of ResultRecord objects.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with SiteDetailOutput._stdoutlock:
+            for record in records:
+                self.write(record)
+
+    def flush(self):
+        """
+        Flushes standard output.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        sys.stdout.flush()
+
+    def writeBot(self, record):
+        """
+        Formats a record minimized and prints it to the user's standard output.
+        A site that found nothing at all is reported once by its url.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if record.first:
+            self._skipsite = False
+        elif self._skipsite:
+            return
+        if self._target != record.target:
+            print "\n**_ Results found for: " + record.target + " _**"
+            self._target = record.target
+        if record.multi and record.siteempty:
+            print '[+] ' + record.sourceurl + ' No results found'
+            self._skipsite = True
+        elif record.status == ResultRecord.EMPTY:
+            print '[+] ' + record.source + ' No results found'
+        elif record.status == ResultRecord.FIELDEMPTY:
+            print record.field + ' No results found'
+        elif not record.repeated:
+            print "" + record.field + " " + str(record.value).replace('www.', 'www[.]').replace('http', 'hxxp')
+
+    def writeNormal(self, record):
+        """
+        Formats a record correctly and prints it to the user's standard output.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._target != record.target:
+            print "\n____________________     Results found for: " + record.target + "     ____________________"
+            self._target = record.target
+        if record.status == ResultRecord.EMPTY:
+            if record.multi:
+                print "No results in the " + record.source + " category"
+            else:
+                print "No results found in the " + record.source
+        elif record.status == ResultRecord.FIELDEMPTY:
+            print record.field + ' No results found'
+        elif not record.repeated:
+            print "" + record.field + " " + str(record.value).replace('www.', 'www[.]').replace('http', 'hxxp')
+
+
+class CEFWriter(SiteWriter):
+    """
+    CEFWriter writes records to an output file in CEF format.
+    CEF format specification from http://mita-tac.wikispaces.com/file/view/CEF+White+Paper+071709.pdf
+    "Jan 18 11:07:53 host message"
+    where message:
+    "CEF:Version|Device Vendor|Device Product|Device Version|Signature ID|Name|Severity|Extension"
+
+    Public Method(s):
+    open
+    write
+    flush
+    close
+
+    Instance variable(s):
+    _cefoutfile
+    _file
+    _writer
+    _prefix
+    _fields
+    _severity
+    """
+    __PATTERN__ = "^\[\+\]\s+"
+
+    def __init__(self, cefoutfile):
+        """
+        Class constructor.
+
+        Argument(s):
+        cefoutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._cefoutfile = cefoutfile
+        self._file = None
+        self._writer = None
+        self._prefix = None
+        self._fields = None
+        self._severity = None
+
+    def open(self):
+        """
+        Creates the output file and writes what comes before the first record.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        curr_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        hostname = socket.gethostname()
+        self._prefix = ' '.join([curr_date,hostname])
+        cef_version = "CEF:Version1.1"
+        cef_deviceVendor = "TekDefense"
+        cef_deviceProduct = "Automater"
+        cef_deviceVersion = "2.1"
+        cef_SignatureID = "0"
+        self._severity = "2"
+        cef_Extension = " "
+        self._fields = [cef_version,cef_deviceVendor,cef_deviceProduct,cef_deviceVersion, \
+                        cef_SignatureID, self._severity, cef_Extension]
+        print '\n[+] Generating CEF output: ' + self._cefoutfile
+        self._file = open(self._cefoutfile, "wb")
+        csv.register_dialect('escaped', delimiter='|', escapechar='\\', doublequote=False, quoting=csv.QUOTE_NONE)
+        self._writer = csv.writer(self._file, 'escaped')
+
+    def write(self, record):
+        """
+        Formats a record correctly and writes it to the output file in CEF format.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        tgt = record.target
+        typ = record.targettype
+        source = record.source
+        if record.status != ResultRecord.FOUND:
+            res = "No results found"
+            self._writer.writerow([self._prefix] + self._fields[:5] + \
+                                  ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+res])+"] "] + \
+                                  [1] + [tgt])
+        elif not record.repeated:
+            res = record.value
+            self._writer.writerow([self._prefix] + self._fields[:5] + \
+                                  ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+str(res)])+"] " + \
+                                   re.sub(self.__PATTERN__,"",record.field) + str(record.detail)] + \
+                                  [self._severity] + [tgt])
+
+    def flush(self):
+        """
+        Flushes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
+
+    def close(self):
+        """
+        Writes what comes after the last record and closes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
+        self._file.close()
+        print "" + self._cefoutfile + " Generated"
+
+
+class TextWriter(SiteWriter):
+    """
+    TextWriter writes records to an output file in text format.
+
+    Public Method(s):
+    open
+    write
+    flush
+    close
+
+    Instance variable(s):
+    _textoutfile
+    _file
+    _target
+    """
+
+    def __init__(self, textoutfile):
+        """
+        Class constructor.
+
+        Argument(s):
+        textoutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._textoutfile = textoutfile
+        self._file = None
+        self._target = ""
+
+    def open(self):
+        """
+        Creates the output file and writes what comes before the first record.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        print "\n[+] Generating text output: " + self._textoutfile
+        self._file = open(self._textoutfile, "w")
+
+    def write(self, record):
+        """
+        Formats a record correctly and writes it to the output file in text format.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._target != record.target:
+            self._file.write("\n____________________     Results found for: " + record.target + "     ____________________")
+            self._target = record.target
+        if record.status == ResultRecord.EMPTY:
+            if record.multi:
+                self._file.write("\nNo results in the " + record.source + " category")
+            else:
+                self._file.write("\nNo results found in the " + record.source)
+        elif record.status == ResultRecord.FIELDEMPTY:
+            self._file.write('\n' + record.field + ' No results found')
+        elif not record.repeated:
+            self._file.write("\n" + record.field + " " + str(record.value))
+
+    def flush(self):
+        """
+        Flushes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
+
+    def close(self):
+        """
+        Writes what comes after the last record and closes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
+        self._file.close()
+        print "" + self._textoutfile + " Generated"
+
+
+class CSVWriter(SiteWriter):
+    """
+    CSVWriter writes records to an output file with comma-seperators.
+
+    Public Method(s):
+    open
+    write
+    flush
+    close
+
+    Instance variable(s):
+    _csvoutfile
+    _file
+    _writer
+    """
+
+    def __init__(self, csvoutfile):
+        """
+        Class constructor.
+
+        Argument(s):
+        csvoutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._csvoutfile = csvoutfile
+        self._file = None
+        self._writer = None
+
+    def open(self):
+        """
+        Creates the output file and writes what comes before the first record.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        print '\n[+] Generating CSV output: ' + self._csvoutfile
+        self._file = open(self._csvoutfile, "wb")
+        self._writer = csv.writer(self._file, quoting=csv.QUOTE_ALL)
+        self._writer.writerow(['Target', 'Type', 'Source', 'Result'])
+
+    def write(self, record):
+        """
+        Formats a record correctly and writes it to the output file with comma-seperators.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if record.status != ResultRecord.FOUND:
+            self._writer.writerow([record.target, record.targettype, record.source, "No results found"])
+        elif not record.repeated:
+            self._writer.writerow([record.target, record.targettype, record.source, record.value])
+
+    def flush(self):
+        """
+        Flushes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
+
+    def close(self):
+        """
+        Writes what comes after the last record and closes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
+        self._file.close()
+        print "" + self._csvoutfile + " Generated"
+
+
+class JSONLWriter(SiteWriter):
+    """
+    JSONLWriter writes one JSON object per line for every result so the
+    output can be followed while it grows and loaded without parsing
+    markup. Records hold the target, type, source, field, value and
+    status, where value is null when nothing was found. The file is gzip
+    compressed when its name ends in .gz; every flush still ends a
+    complete block so the lines written so far can be read.
+
+    Public Method(s):
+    open
+    write
+    flush
+    close
+
+    Instance variable(s):
+    _jsonloutfile
+    _metadata
+    _file
+    """
+
+    def __init__(self, jsonloutfile, metadata=False):
+        """
+        Class constructor.
+
+        Argument(s):
+        jsonloutfile -- A string representation of a file that will store the output.
+        metadata -- True if the seconds each lookup took and whether its content
+        came from the response cache are added to every record. Default is False.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._jsonloutfile = jsonloutfile
+        self._metadata = metadata
+        self._file = None
+
+    def open(self):
+        """
+        Creates the output file. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        print '\n[+] Generating JSON Lines output: ' + self._jsonloutfile
+        if self._jsonloutfile.endswith('.gz'):
+            self._file = gzip.open(self._jsonloutfile, "wb")
         else:
-            pass
+            self._file = open(self._jsonloutfile, "wb")
+
+    def write(self, record):
+        """
+        Formats a record as a JSON object and writes it to the output file
+        on a line of its own. Repeated values are not written.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if record.repeated:
+            return
+        self._file.write(json.dumps(record.toDictionary(self._metadata)) + "\n")
+
+    def flush(self):
+        """
+        Flushes the output file.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._file.flush()
 
-    def PrintToScreenNormal(self):
+    def close(self):
         """
-        Formats site information correctly and prints it to the user's standard output.
+        Closes the output file.
         Returns nothing.
 
         Argument(s):
@@ -203,70 +1452,49 @@ class SiteDetailOutput(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        sites = sorted(self.ListOfSites, key=attrgetter('Target'))
-        target = ""
-        if sites is not None:
-            for site in sites:
-                if not isinstance(site._regex, basestring):  # this is a multisite
-                    for index in range(len(site.RegEx)):  # the regexs will ensure we have the exact number of lookups
-                        siteimpprop = site.getImportantProperty(index)
-                        if target != site.Target:
-                            print "\n____________________     Results found for: " + site.Target + "     ____________________"
-                            target = site.Target
-                        if siteimpprop is None or len(siteimpprop) == 0:
-                            print "No results in the " + site.FriendlyName[index] + " category"
-                        else:
-                            if siteimpprop[index] is None or len(siteimpprop[index]) == 0:
-                                print site.ReportStringForResult[index] + ' No results found'
-                            else:
-                                laststring = ""
-                                # if it's just a string we don't want it output like a list
-                                if isinstance(siteimpprop[index], basestring):
-                                    if "" + site.ReportStringForResult[index] + " " + str(siteimpprop) != laststring:
-                                        print "" + site.ReportStringForResult[index] + " " + str(siteimpprop).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                        laststring = "" + site.ReportStringForResult[index] + " " + str(siteimpprop)
-                                # must be a list since it failed the isinstance check on string
-                                else:
-                                    laststring = ""
-                                    for siteresult in siteimpprop[index]:
-                                        if "" + site.ReportStringForResult[index] + " " + str(siteresult) != laststring:
-                                            print "" + site.ReportStringForResult[index] + " " + str(siteresult).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                            laststring = "" + site.ReportStringForResult[index] + " " + str(siteresult)
-                else:  # this is a singlesite
-                    siteimpprop = site.getImportantProperty(0)
-                    if target != site.Target:
-                        print "\n____________________     Results found for: " + site.Target + "     ____________________"
-                        target = site.Target
-                    if siteimpprop is None or len(siteimpprop) == 0:
-                        print "No results found in the " + site.FriendlyName
-                    else:
-                        laststring = ""
-                        # if it's just a string we don't want it output like a list
-                        if isinstance(siteimpprop, basestring):
-                            if "" + site.ReportStringForResult + " " + str(siteimpprop) != laststring:
-                                print "" + site.ReportStringForResult + " " + str(siteimpprop).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                laststring = "" + site.ReportStringForResult + " " + str(siteimpprop)
-                        # must be a list since it failed the isinstance check on string
-                        else:
-                            laststring = ""
-                            for siteresult in siteimpprop:
-                                if "" + site.ReportStringForResult + " " + str(siteresult) != laststring:
-                                    print "" + site.ReportStringForResult + " " + str(siteresult).replace('www.', 'www[.]').replace('http', 'hxxp')
-                                    laststring = "" + site.ReportStringForResult + " " + str(siteresult)
-        else:
-            pass
+        self._file.flush()
+        self._file.close()
+        print "" + self._jsonloutfile + " Generated"
 
-    def PrintToCEFFile(self,cefoutfile):
+
+class HTMLWriter(SiteWriter):
+    """
+    HTMLWriter writes records to an output file using HTML markup.
+    Repeated values are written as well.
+
+    Public Method(s):
+    open
+    write
+    flush
+    close
+    (Class Method) getHTMLOpening
+    (Class Method) getHTMLClosing
+
+    Instance variable(s):
+    _htmloutfile
+    _file
+    """
+
+    def __init__(self, htmloutfile):
         """
-        Formats site information correctly and prints it to an output file in CEF format.
-        CEF format specification from http://mita-tac.wikispaces.com/file/view/CEF+White+Paper+071709.pdf
-        "Jan 18 11:07:53 host message"
-        where message:
-        "CEF:Version|Device Vendor|Device Product|Device Version|Signature ID|Name|Severity|Extension"
+        Class constructor.
+
+        Argument(s):
+        htmloutfile -- A string representation of a file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._htmloutfile = htmloutfile
+        self._file = None
+
+    def open(self):
+        """
+        Creates the output file and writes what comes before the first record.
         Returns nothing.
 
         Argument(s):
-        cefoutfile -- A string representation of a file that will store the output.
+        No arguments are required.
 
         Return value(s):
         Nothing is returned from this Method.
@@ -274,123 +1502,17 @@ class SiteDetailOutput(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        sites = sorted(self.ListOfSites, key=attrgetter('Target'))
-        curr_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        hostname = socket.gethostname()
-        prefix = ' '.join([curr_date,hostname])
-        cef_version = "CEF:Version1.1"
-        cef_deviceVendor = "TekDefense"
-        cef_deviceProduct = "Automater"
-        cef_deviceVersion = "2.1"
-        cef_SignatureID = "0"
-        cef_Severity = "2"
-        cef_Extension = " "
-        cef_fields = [cef_version,cef_deviceVendor,cef_deviceProduct,cef_deviceVersion, \
-                       cef_SignatureID, cef_Severity, cef_Extension]
-        pattern = "^\[\+\]\s+"
-        target = ""
-        print '\n[+] Generating CEF output: ' + cefoutfile
-        f = open(cefoutfile, "wb")
-        csv.register_dialect('escaped', delimiter='|', escapechar='\\', doublequote=False, quoting=csv.QUOTE_NONE)
-        cefRW = csv.writer(f, 'escaped')
-        # cefRW.writerow(['Target', 'Type', 'Source', 'Result'])
-        if sites is not None:
-            for site in sites:
-                if not isinstance(site._regex,basestring):  # this is a multisite:
-                    for index in range(len(site.RegEx)):  # the regexs will ensure we have the exact number of lookups
-                        siteimpprop = site.getImportantProperty(index)
-                        if siteimpprop is None or len(siteimpprop)==0:
-                            tgt = site.Target
-                            typ = site.TargetType
-                            source = site.FriendlyName[index]
-                            res = "No results found"
-                            cefRW.writerow([prefix] + cef_fields[:5] + \
-                                           ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+res])+"] "] + \
-                                           [1] + [tgt])
-                        else:
-                            if siteimpprop[index] is None or len(siteimpprop[index])==0:
-                                tgt = site.Target
-                                typ = site.TargetType
-                                source = site.FriendlyName[index]
-                                res = "No results found"
-                                cefRW.writerow([prefix] + cef_fields[:5] + \
-                                           ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+res])+"] "] + \
-                                           [1] + [tgt])
-                            else:
-                                laststring = ""
-                                # if it's just a string we don't want it to output like a list
-                                if isinstance(siteimpprop, basestring):
-                                    tgt = site.Target
-                                    typ = site.TargetType
-                                    source = site.FriendlyName
-                                    res = siteimpprop
-                                    if "" + tgt + typ + source + res != laststring:
-                                        cefRW.writerow([prefix] + cef_fields[:5] + \
-                                          ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+res])+"] " + \
-                                               re.sub(pattern,"",site.ReportStringForResult[index])+ str(siteimpprop)] + \
-                                           [cef_Severity] + [tgt])
-                                        laststring = "" + tgt + typ + source + res
-                                # must be a list since it failed the isinstance check on string
-                                else:
-                                    laststring = ""
-                                    for siteresult in siteimpprop[index]:
-                                        tgt = site.Target
-                                        typ = site.TargetType
-                                        source = site.FriendlyName[index]
-                                        res =   siteresult
-                                        if "" + tgt + typ + source + str(res) != laststring:
-                                            cefRW.writerow([prefix] + cef_fields[:5] + ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+str(res)])+"] " + re.sub(pattern, "", site.ReportStringForResult[index]) + str(siteresult)] + [cef_Severity] + [tgt])
-                                            laststring = "" + tgt + typ + source + str(res)
-                else: # this is a singlesite
-                    siteimpprop = site.getImportantProperty(0)
-                    if siteimpprop is None or len(siteimpprop)==0:
-                        tgt = site.Target
-                        typ = site.TargetType
-                        source = site.FriendlyName
-                        res = "No results found"
-                        cefRW.writerow([prefix] + cef_fields[:5] + \
-                                          ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+res])+"] "] + \
-                                           [1] + [tgt])
-                    else:
-                        laststring = ""
-                        # if it's just a string we don't want it output like a list
-                        if isinstance(siteimpprop, basestring):
-                            tgt = site.Target
-                            typ = site.TargetType
-                            source = site.FriendlyName
-                            res = siteimpprop
-                            if "" + tgt + typ + source + res != laststring:
-                                cefRW.writerow([prefix] + cef_fields[:5] + \
-                                          ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+res])+"] " + \
-                                               re.sub(pattern,"",site.ReportStringForResult)+ str(siteimpprop)] + \
-                                           [cef_Severity] + [tgt])
-                                laststring = "" + tgt + typ + source + res
-                        else:
-                            laststring = ""
-                            for siteresult in siteimpprop:
-                                tgt = site.Target
-                                typ = site.TargetType
-                                source = site.FriendlyName
-                                res = siteresult
-                                if "" + tgt + typ + source + str(res) != laststring:
-                                    cefRW.writerow([prefix] + cef_fields[:5] + \
-                                         ["["+",".join(["tgt="+tgt,"typ="+typ,"src="+source,"res="+str(res)])+"] " + \
-                                               re.sub(pattern,"",site.ReportStringForResult)+ str(siteimpprop)] + \
-                                           [cef_Severity] + [tgt])
-                                    laststring = "" + tgt + typ + source + str(res)
-
-        f.flush()
-        f.close()
-        print "" + cefoutfile + " Generated"
-
+        print '\n[+] Generating HTML output: ' + self._htmloutfile
+        self._file = open(self._htmloutfile, "w")
+        self._file.write(self.getHTMLOpening())
 
-    def PrintToTextFile(self,textoutfile):
+    def write(self, record):
         """
-        Formats site information correctly and prints it to an output file in text format.
+        Formats a record correctly and writes it to the output file using HTML markup.
         Returns nothing.
 
         Argument(s):
-        textoutfile -- A string representation of a file that will store the output.
+        record -- ResultRecord object.
 
         Return value(s):
         Nothing is returned from this Method.
@@ -398,68 +1520,21 @@ class SiteDetailOutput(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        sites = sorted(self.ListOfSites, key=attrgetter('Target'))
-        target = ""
-        print "\n[+] Generating text output: " + textoutfile
-        f = open(textoutfile, "w")
-        if sites is not None:
-            for site in sites:
-                if not isinstance(site._regex,basestring): #this is a multisite
-                    for index in range(len(site.RegEx)): #the regexs will ensure we have the exact number of lookups
-                        siteimpprop = site.getImportantProperty(index)
-                        if target != site.Target:
-                            f.write("\n____________________     Results found for: " + site.Target + "     ____________________")
-                            target = site.Target
-                        if siteimpprop is None or len(siteimpprop)==0:
-                            f.write("\nNo results in the " + site.FriendlyName[index] + " category")
-                        else:
-                            if siteimpprop[index] is None or len(siteimpprop[index]) == 0:
-                                f.write('\n' + site.ReportStringForResult[index] + ' No results found')
-                            else:
-                                laststring = ""
-                                #if it's just a string we don't want it to output like a list
-                                if isinstance(siteimpprop[index], basestring):
-                                    if "" + site.ReportStringForResult[index] + " " + str(siteimpprop) != laststring:
-                                        f.write("\n" + site.ReportStringForResult[index] + " " + str(siteimpprop))
-                                        laststring = "" + site.ReportStringForResult[index] + " " + str(siteimpprop)
-                                #must be a list since it failed the isinstance check on string
-                                else:
-                                    laststring = ""
-                                    for siteresult in siteimpprop[index]:
-                                        if "" + site.ReportStringForResult[index] + " " + str(siteresult) != laststring:
-                                            f.write("\n" + site.ReportStringForResult[index] + " " + str(siteresult))
-                                            laststring = "" + site.ReportStringForResult[index] + " " + str(siteresult)
-                else:#this is a singlesite
-                    siteimpprop = site.getImportantProperty(0)
-                    if target != site.Target:
-                        f.write("\n____________________     Results found for: " + site.Target + "     ____________________")
-                        target = site.Target
-                    if siteimpprop is None or len(siteimpprop)==0:
-                        f.write("\nNo results found in the " + site.FriendlyName)
-                    else:
-                        laststring = ""
-                        #if it's just a string we don't want it output like a list
-                        if isinstance(siteimpprop, basestring):
-                            if "" + site.ReportStringForResult + " " + str(siteimpprop) != laststring:
-                                f.write("\n" + site.ReportStringForResult + " " + str(siteimpprop))
-                                laststring = "" + site.ReportStringForResult + " " + str(siteimpprop)
-                        else:
-                            laststring = ""
-                            for siteresult in siteimpprop:
-                                if "" + site.ReportStringForResult + " " + str(siteresult) != laststring:
-                                    f.write("\n" + site.ReportStringForResult + " " + str(siteresult))
-                                    laststring = "" + site.ReportStringForResult + " " + str(siteresult)
-        f.flush()
-        f.close()
-        print "" + textoutfile + " Generated"
+        if record.status != ResultRecord.FOUND:
+            res = "No results found"
+        else:
+            res = record.value
+        tableData = '<tr><td>' + record.target + '</td><td>' + record.targettype + '</td><td>' + record.source + \
+                    '</td><td>' + str(res) + '</td></tr>'
+        self._file.write(tableData)
 
-    def PrintToCSVFile(self,csvoutfile):
+    def flush(self):
         """
-        Formats site information correctly and prints it to an output file with comma-seperators.
+        Flushes the output file.
         Returns nothing.
 
         Argument(s):
-        csvoutfile -- A string representation of a file that will store the output.
+        No arguments are required.
 
         Return value(s):
         Nothing is returned from this Method.
@@ -467,93 +1542,15 @@ class SiteDetailOutput(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        sites = sorted(self.ListOfSites, key=attrgetter('Target'))
-        target = ""
-        print '\n[+] Generating CSV output: ' + csvoutfile
-        f = open(csvoutfile, "wb")
-        csvRW = csv.writer(f, quoting=csv.QUOTE_ALL)
-        csvRW.writerow(['Target', 'Type', 'Source', 'Result'])
-        if sites is not None:
-            for site in sites:
-                if not isinstance(site._regex,basestring): #this is a multisite:
-                    for index in range(len(site.RegEx)): #the regexs will ensure we have the exact number of lookups
-                        siteimpprop = site.getImportantProperty(index)
-                        if siteimpprop is None or len(siteimpprop)==0:
-                            tgt = site.Target
-                            typ = site.TargetType
-                            source = site.FriendlyName[index]
-                            res = "No results found"
-                            csvRW.writerow([tgt,typ,source,res])
-                        else:
-                            if siteimpprop[index] is None or len(siteimpprop[index])==0:
-                                tgt = site.Target
-                                typ = site.TargetType
-                                source = site.FriendlyName[index]
-                                res = "No results found"
-                                csvRW.writerow([tgt,typ,source,res])
-                            else:
-                                laststring = ""
-                                #if it's just a string we don't want it to output like a list
-                                if isinstance(siteimpprop, basestring):
-                                    tgt = site.Target
-                                    typ = site.TargetType
-                                    source = site.FriendlyName
-                                    res = siteimpprop
-                                    if "" + tgt + typ + source + res != laststring:
-                                        csvRW.writerow([tgt,typ,source,res])
-                                        laststring = "" + tgt + typ + source + res
-                                #must be a list since it failed the isinstance check on string
-                                else:
-                                    laststring = ""
-                                    for siteresult in siteimpprop[index]:
-                                        tgt = site.Target
-                                        typ = site.TargetType
-                                        source = site.FriendlyName[index]
-                                        res = siteresult
-                                        if "" + tgt + typ + source + str(res) != laststring:
-                                            csvRW.writerow([tgt,typ,source,res])
-                                            laststring = "" + tgt + typ + source + str(res)
-                else:#this is a singlesite
-                    siteimpprop = site.getImportantProperty(0)
-                    if siteimpprop is None or len(siteimpprop)==0:
-                        tgt = site.Target
-                        typ = site.TargetType
-                        source = site.FriendlyName
-                        res = "No results found"
-                        csvRW.writerow([tgt,typ,source,res])
-                    else:
-                        laststring = ""
-                        #if it's just a string we don't want it output like a list
-                        if isinstance(siteimpprop, basestring):
-                            tgt = site.Target
-                            typ = site.TargetType
-                            source = site.FriendlyName
-                            res = siteimpprop
-                            if "" + tgt + typ + source + res != laststring:
-                                csvRW.writerow([tgt,typ,source,res])
-                                laststring = "" + tgt + typ + source + res
-                        else:
-                            laststring = ""
-                            for siteresult in siteimpprop:
-                                tgt = site.Target
-                                typ = site.TargetType
-                                source = site.FriendlyName
-                                res = siteresult
-                                if "" + tgt + typ + source + str(res) != laststring:
-                                    csvRW.writerow([tgt,typ,source,res])
-                                    laststring = "" + tgt + typ + source + str(res)
-
-        f.flush()
-        f.close()
-        print "" + csvoutfile + " Generated"
+        self._file.flush()
 
-    def PrintToHTMLFile(self, htmloutfile):
+    def close(self):
         """
-        Formats site information correctly and prints it to an output file using HTML markup.
+        Writes what comes after the last record and closes the output file.
         Returns nothing.
 
         Argument(s):
-        htmloutfile -- A string representation of a file that will store the output.
+        No arguments are required.
 
         Return value(s):
         Nothing is returned from this Method.
@@ -561,90 +1558,13 @@ class SiteDetailOutput(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        sites = sorted(self.ListOfSites, key=attrgetter('Target'))
-        target = ""
-        print '\n[+] Generating HTML output: ' + htmloutfile
-        f = open(htmloutfile, "w")
-        f.write(self.getHTMLOpening())
-        if sites is not None:
-            for site in sites:
-                if not isinstance(site._regex,basestring): #this is a multisite:
-                    for index in range(len(site.RegEx)): #the regexs will ensure we have the exact number of lookups
-                        siteimpprop = site.getImportantProperty(index)
-                        if siteimpprop is None or len(siteimpprop)==0:
-                            tgt = site.Target
-                            typ = site.TargetType
-                            source = site.FriendlyName[index]
-                            res = "No results found"
-                            tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                            f.write(tableData)
-                        else:
-                            if siteimpprop[index] is None or len(siteimpprop[index])==0:
-                                tgt = site.Target
-                                typ = site.TargetType
-                                source = site.FriendlyName[index]
-                                res = "No results found"
-                                tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                                f.write(tableData)
-                            else:
-                                # if it's just a string we don't want it to output like a list
-                                if isinstance(siteimpprop, basestring):
-                                    tgt = site.Target
-                                    typ = site.TargetType
-                                    source = site.FriendlyName
-                                    res = siteimpprop
-                                    tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                                    f.write(tableData)
-                                else:
-                                    for siteresult in siteimpprop[index]:
-                                        tgt = site.Target
-                                        typ = site.TargetType
-                                        source = site.FriendlyName[index]
-                                        res = siteresult
-                                        tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                                        f.write(tableData)
-                else:  # this is a singlesite
-                    siteimpprop = site.getImportantProperty(0)
-                    if siteimpprop is None or len(siteimpprop)==0:
-                        tgt = site.Target
-                        typ = site.TargetType
-                        source = site.FriendlyName
-                        res = "No results found"
-                        tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                        f.write(tableData)
-                    else:
-                        # if it's just a string we don't want it output like a list
-                        if isinstance(siteimpprop, basestring):
-                            tgt = site.Target
-                            typ = site.TargetType
-                            source = site.FriendlyName
-                            res = siteimpprop
-                            tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                            f.write(tableData)
-                        else:
-                            for siteresult in siteimpprop:
-                                tgt = site.Target
-                                typ = site.TargetType
-                                source = site.FriendlyName
-                                res = siteresult
-                                tableData = '<tr><td>' + tgt + '</td><td>' + typ + '</td><td>' + source + '</td><td>' + str(res) + '</td></tr>'
-                                f.write(tableData)
-        f.write(self.getHTMLClosing())
-        f.flush()
-        f.close()
-        print "" + htmloutfile + " Generated"
+        self._file.write(self.getHTMLClosing())
+        self._file.flush()
+        self._file.close()
+        print "" + self._htmloutfile + " Generated"
 
     @classmethod
-    def PrintStandardOutput(cls, strout, *args, **kwargs):
-        if 'verbose' in kwargs.keys():
-            if kwargs['verbose'] is True:
-                print strout
-            else:
-                return
-        else:
-            print strout
-
-    def getHTMLOpening(self):
+    def getHTMLOpening(cls):
         """
         Creates HTML markup to provide correct formatting for initial HTML file requirements.
         Returns string that contains opening HTML markup information for HTML output file.
@@ -656,7 +1576,7 @@ class SiteDetailOutput(object):
         string.
 
         Restriction(s):
-        The Method has no restrictions.
+        This Method is tagged as a Class Method
         """
         return '''<style type="text/css">
                         #table-3 {
@@ -729,7 +1649,8 @@ class SiteDetailOutput(object):
                         </tr>
                         '''
 
-    def getHTMLClosing(self):
+    @classmethod
+    def getHTMLClosing(cls):
         """
         Creates HTML markup to provide correct formatting for closing HTML file requirements.
         Returns string that contains closing HTML markup information for HTML output file.
@@ -741,7 +1662,7 @@ class SiteDetailOutput(object):
         string.
 
         Restriction(s):
-        The Method has no restrictions.
+        This Method is tagged as a Class Method
         """
         return '''
             </table>
@@ -751,3 +1672,388 @@ class SiteDetailOutput(object):
             </body>
             </html>
             '''
+
+
+class DBWriter(SiteWriter):
+    """
+    DBWriter stores records in a SQLite database through a ResultStore.
+    Every run is recorded on its own so later runs can be compared with
+    it. Records are inserted in batches inside one transaction, and a
+    batch is also committed when a flush comes some time after the last
+    commit, so a streaming run keeps the database current without
+    committing every site.
+
+    Public Method(s):
+    open
+    write
+    flush
+    commit
+    close
+
+    Instance variable(s):
+    _dbfile
+    _store
+    _run
+    _pending
+    _lastcommit
+    """
+    __BATCHSIZE__ = 500
+    __COMMITINTERVAL__ = 2
+
+    def __init__(self, dbfile):
+        """
+        Class constructor.
+
+        Argument(s):
+        dbfile -- A string representation of a SQLite database file that will store the output.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._dbfile = dbfile
+        self._store = None
+        self._run = None
+        self._pending = []
+        self._lastcommit = 0
+
+    def open(self):
+        """
+        Opens the database, creating it if needed, and starts a run.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        print '\n[+] Generating SQLite output: ' + self._dbfile
+        self._store = ResultStore(self._dbfile)
+        self._run = self._store.startRun(' '.join(sys.argv[1:]))
+        self._lastcommit = time.time()
+
+    def write(self, record):
+        """
+        Queues a record for the next batch. Repeated values are not stored.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if record.repeated:
+            return
+        self._pending.append((self._run, time.time(), ResultStore.toText(record.target), record.targettype,
+                              ResultStore.toText(record.source), ResultStore.toText(record.field),
+                              ResultStore.toText(record.value), record.status))
+        if len(self._pending) >= self.__BATCHSIZE__:
+            self.commit()
+
+    def flush(self):
+        """
+        Commits the queued records if the last commit is older than
+        __COMMITINTERVAL__ seconds.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._pending and time.time() - self._lastcommit >= self.__COMMITINTERVAL__:
+            self.commit()
+
+    def commit(self):
+        """
+        Inserts the queued records in one transaction.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._pending:
+            self._store.addResults(self._pending)
+            self._pending = []
+        self._lastcommit = time.time()
+
+    def close(self):
+        """
+        Commits the queued records, marks the run finished and closes the database.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.commit()
+        self._store.finishRun(self._run)
+        self._store.close()
+        print "" + self._dbfile + " Generated"
+
+
+class ResultStore(object):
+    """
+    ResultStore keeps the results of every run in a SQLite database so
+    what a source reported for a target can be looked up later without
+    asking the source again. Results are indexed by target, source and
+    timestamp, and the database uses write-ahead logging so queries are
+    not blocked while a run is writing.
+
+    Public Method(s):
+    startRun
+    finishRun
+    addResults
+    getRuns
+    getFilter
+    getResults
+    getDiff
+    close
+    (Class Method) toText
+
+    Instance variable(s):
+    _dbfile
+    _connection
+    """
+    __SCHEMA__ = ("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL NOT NULL, "
+                  "finished REAL, arguments TEXT)",
+                  "CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                  "run INTEGER NOT NULL REFERENCES runs (id), timestamp REAL NOT NULL, target TEXT NOT NULL, "
+                  "type TEXT, source TEXT NOT NULL, field TEXT, value TEXT, status TEXT NOT NULL)",
+                  "CREATE INDEX IF NOT EXISTS results_target ON results (target, timestamp)",
+                  "CREATE INDEX IF NOT EXISTS results_source ON results (source, timestamp)",
+                  "CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp)",
+                  "CREATE INDEX IF NOT EXISTS results_run ON results (run, target)")
+
+    def __init__(self, dbfile):
+        """
+        Class constructor. Opens the database and creates its tables and
+        indexes if they do not exist.
+
+        Argument(s):
+        dbfile -- A string representation of a SQLite database file.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._dbfile = dbfile
+        self._connection = sqlite3.connect(dbfile)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            for statement in self.__SCHEMA__:
+                self._connection.execute(statement)
+
+    @classmethod
+    def toText(cls, value):
+        """
+        Converts a value to text the database accepts.
+
+        Argument(s):
+        value -- the value to store.
+
+        Return value(s):
+        unicode.
+        None -- if value is None.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if value is None or isinstance(value, unicode):
+            return value
+        if not isinstance(value, str):
+            value = str(value)
+        return value.decode('utf-8', 'replace')
+
+    def startRun(self, arguments):
+        """
+        Records the start of a run. Returns the number of the run.
+
+        Argument(s):
+        arguments -- string representation of the arguments the run was started with.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._connection:
+            cursor = self._connection.execute("INSERT INTO runs (started, arguments) VALUES (?, ?)",
+                                              (time.time(), self.toText(arguments)))
+        return cursor.lastrowid
+
+    def finishRun(self, run):
+        """
+        Records the end of a run. Returns nothing.
+
+        Argument(s):
+        run -- integer number of the run.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._connection:
+            self._connection.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run))
+
+    def addResults(self, rows):
+        """
+        Inserts results in one transaction. Returns nothing.
+
+        Argument(s):
+        rows -- list of (run, timestamp, target, type, source, field, value, status) tuples.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._connection:
+            self._connection.executemany("INSERT INTO results (run, timestamp, target, type, source, field, value, "
+                                         "status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def getRuns(self):
+        """
+        Returns every run with the number of results it stored, oldest first.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of (run, started, finished, arguments, count) tuples.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return self._connection.execute("SELECT runs.id, runs.started, runs.finished, runs.arguments, "
+                                        "COUNT(results.id) FROM runs LEFT JOIN results ON results.run = runs.id "
+                                        "GROUP BY runs.id ORDER BY runs.id").fetchall()
+
+    def getFilter(self, target=None, source=None, since=None, run=None):
+        """
+        Builds the conditions selecting results. Returns the condition
+        string and its parameters.
+
+        Argument(s):
+        target -- string target the results must belong to. Default is None.
+        source -- string friendly name of the source. Default is None.
+        since -- float seconds since the epoch the results must be stored after. Default is None.
+        run -- integer number of the run. Default is None.
+
+        Return value(s):
+        tuple -- (string, list).
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        conditions = []
+        parameters = []
+        if target is not None:
+            conditions.append("target = ?")
+            parameters.append(self.toText(target))
+        if source is not None:
+            conditions.append("source = ?")
+            parameters.append(self.toText(source))
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(since)
+        if run is not None:
+            conditions.append("run = ?")
+            parameters.append(run)
+        if not conditions:
+            return "1", parameters
+        return " AND ".join(conditions), parameters
+
+    def getResults(self, target=None, source=None, since=None, run=None, limit=0):
+        """
+        Returns the stored results matching every argument given, oldest first.
+
+        Argument(s):
+        target -- string target the results must belong to. Default is None.
+        source -- string friendly name of the source. Default is None.
+        since -- float seconds since the epoch the results must be stored after. Default is None.
+        run -- integer number of the run. Default is None.
+        limit -- the most results returned. 0 returns every result. Default is 0.
+
+        Return value(s):
+        list -- of (run, timestamp, target, type, source, field, value, status) tuples.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        condition, parameters = self.getFilter(target, source, since, run)
+        statement = "SELECT run, timestamp, target, type, source, field, value, status FROM results WHERE " + \
+                    condition + " ORDER BY timestamp, id"
+        if limit > 0:
+            statement += " LIMIT ?"
+            parameters.append(limit)
+        return self._connection.execute(statement, parameters).fetchall()
+
+    def getDiff(self, oldrun, newrun, target=None, source=None):
+        """
+        Compares the values two runs found. Returns the values only the new
+        run found marked with + and the values only the old run found marked
+        with -, sorted by target and source.
+
+        Argument(s):
+        oldrun -- integer number of the run compared against.
+        newrun -- integer number of the run compared.
+        target -- string target the results must belong to. Default is None.
+        source -- string friendly name of the source. Default is None.
+
+        Return value(s):
+        list -- of (change, target, source, field, value) tuples.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        condition, parameters = self.getFilter(target, source)
+        statement = "SELECT target, source, field, value FROM results WHERE run = ? AND status = 'found' AND " + \
+                    condition
+        added = self._connection.execute(statement + " EXCEPT " + statement,
+                                         [newrun] + parameters + [oldrun] + parameters).fetchall()
+        removed = self._connection.execute(statement + " EXCEPT " + statement,
+                                           [oldrun] + parameters + [newrun] + parameters).fetchall()
+        changes = [('+',) + tuple(row) for row in added] + [('-',) + tuple(row) for row in removed]
+        return sorted(changes, key=lambda change: (change[1], change[2], change[0]))
+
+    def close(self):
+        """
+        Closes the database. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._connection.close()
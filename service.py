@@ -0,0 +1,527 @@
+"""
+The service.py module runs Automater as a long-running local HTTP
+service. The parsed site definitions, compiled regexs, keep-alive
+connection pools and the response cache stay warm between requests, so
+a lookup only costs the time spent talking to the sources.
+
+The service answers:
+GET /health -- reports the service is up, how many lookups it ran and how
+many identical requests were coalesced and which sources are failing.
+GET /lookup?target=...&source=...&metadata=1 -- target and source may be repeated.
+POST /lookup -- a JSON object with targets, optional sources and metadata.
+Lookups return the JSON object {"records": [...]} holding the records the
+--jsonl output would write for the same targets.
+
+Class(es):
+LookupService -- Class that runs lookups against the warm state.
+RecordCollector -- Class that keeps the result records of one request.
+LookupRequestHandler -- Class that answers the HTTP API.
+ThreadedHTTPServer -- Class that serves the HTTP API on a TCP port.
+ThreadedUnixHTTPServer -- Class that serves the HTTP API on a Unix socket.
+
+Function(s):
+No global exportable functions are defined.
+
+Exception(s):
+No exceptions exported.
+"""
+
+import json
+import os
+import stat
+import threading
+import time
+import urlparse
+from collections import OrderedDict
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn, UnixStreamServer
+from siteinfo import SiteFacade
+from outputs import SiteDetailOutput, StreamingOutput, SiteWriter
+from utilities import TargetPipeline
+from transport import RequestCoalescer, CircuitBreaker
+
+
+class LookupService(object):
+    """
+    LookupService runs the lookups requested by the HTTP API. Every
+    request gets its own SiteFacade while the state shared by all of
+    them, such as the site definitions, the connection pools and the
+    response cache, is kept by their registries for the life of the
+    process.
+
+    Public Method(s):
+    lookup
+    getHealth
+    (Property) Verbose
+    (Class Method) toString
+
+    Instance variable(s):
+    _delay
+    _proxy
+    _useragent
+    _workers
+    _maxexpansion
+    _excludereserved
+    _versionlocation
+    _verbose
+    _started
+    _lookups
+    _guard
+    """
+
+    def __init__(self, delay, proxy, useragent, workers, maxexpansion, excludereserved, versionlocation, verbose):
+        """
+        Class constructor. Stores the settings every lookup is run with.
+
+        Argument(s):
+        delay -- the amount of seconds to wait between requests to the same source domain.
+        proxy -- proxy server address as server:port_number.
+        useragent -- String representing user-agent that will be utilized when
+        requesting or submitting data to or from a web site.
+        workers -- integer representing how many site lookups of a request may run at the same time.
+        maxexpansion -- integer representing the most addresses a single range expands to.
+        excludereserved -- true or false representing if special purpose
+        addresses are left out of ranges.
+        versionlocation -- string representing the GitHub location of Automater.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._delay = delay
+        self._proxy = proxy
+        self._useragent = useragent
+        self._workers = workers
+        self._maxexpansion = maxexpansion
+        self._excludereserved = excludereserved
+        self._versionlocation = versionlocation
+        self._verbose = verbose
+        self._started = time.time()
+        self._lookups = 0
+        self._guard = threading.Lock()
+
+    @classmethod
+    def toString(cls, value):
+        """
+        Converts a value decoded from a request to the byte string the rest
+        of Automater works with.
+
+        Argument(s):
+        value -- string or unicode value.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+        return str(value)
+
+    def lookup(self, targets, sources=None, metadata=False):
+        """
+        Looks the targets up against the sources and returns the records
+        found in the order the lookups completed.
+
+        Argument(s):
+        targets -- list of strings representing targets. Ranges are expanded
+        and, unless the service was started with --include-reserved,
+        reserved addresses are left out as on the command line.
+        sources -- list of site names to use instead of every site. Default
+        is None which uses every site.
+        metadata -- True if the seconds each lookup took and whether its content
+        came from the response cache are added to every record. Default is False.
+
+        Return value(s):
+        list -- of OrderedDict records.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        targetlist = TargetPipeline.getTargets([self.toString(target) for target in targets], self._maxexpansion,
+                                               self._excludereserved, None, self._verbose)
+        sourcelist = ['allsources']
+        if sources:
+            sourcelist = [self.toString(source) for source in sources]
+        collector = RecordCollector()
+        sitefac = SiteFacade(self._verbose, None, StreamingOutput([collector]))
+        sitefac.runSiteAutomation(self._delay, self._proxy, targetlist, sourcelist, self._useragent,
+                                  not self._verbose, False, self._versionlocation, self._workers)
+        with self._guard:
+            self._lookups += 1
+        return [record.toDictionary(metadata) for record in collector.Records]
+
+    @property
+    def Verbose(self):
+        """
+        Returns whether messages are printed to stdout.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._verbose
+
+    def getHealth(self):
+        """
+        Returns the state of the service.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        OrderedDict -- holding status, uptime, lookups and the RequestCoalescer
+        and CircuitBreaker metrics.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._guard:
+            lookups = self._lookups
+        return OrderedDict([('status', 'ok'), ('uptime', round(time.time() - self._started, 3)),
+                            ('lookups', lookups), ('coalescer', RequestCoalescer.getMetrics()),
+                            ('breakers', CircuitBreaker.getMetrics())])
+
+
+class RecordCollector(SiteWriter):
+    """
+    RecordCollector keeps the result records written to it so a request
+    can return them. Repeated values are left out as they are in the
+    --jsonl output.
+
+    Public Method(s):
+    write
+    (Property) Records
+
+    Instance variable(s):
+    _records
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._records = []
+
+    def write(self, record):
+        """
+        Keeps a record unless it repeats the value before it.
+        Returns nothing.
+
+        Argument(s):
+        record -- ResultRecord object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if not record.repeated:
+            self._records.append(record)
+
+    @property
+    def Records(self):
+        """
+        Returns the records kept.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of ResultRecord objects.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._records
+
+
+class LookupRequestHandler(BaseHTTPRequestHandler):
+    """
+    LookupRequestHandler answers the HTTP API of the service with JSON.
+    Connections are kept alive between requests.
+
+    Public Method(s):
+    do_GET
+    do_POST
+    lookup
+    sendJSON
+    sendBody
+    address_string
+    log_message
+
+    Instance variable(s):
+    No instance variables.
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'Automater'
+
+    def do_GET(self):
+        """
+        Answers /health and /lookup requested with GET. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        path, _, querystring = self.path.partition('?')
+        if path == '/health':
+            self.sendJSON(200, self.server.service.getHealth())
+        elif path == '/lookup':
+            query = urlparse.parse_qs(querystring)
+            metadata = query.get('metadata', ['0'])[0].lower() in ('1', 'true', 'yes')
+            self.lookup(query.get('target', []), query.get('source', []), metadata)
+        else:
+            self.sendJSON(404, {'error': 'Unknown path ' + path})
+
+    def do_POST(self):
+        """
+        Answers /lookup requested with a JSON object holding targets,
+        optional sources and metadata. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        path = self.path.partition('?')[0]
+        length = int(self.headers.getheader('content-length', 0))
+        body = self.rfile.read(length)
+        if path != '/lookup':
+            self.sendJSON(404, {'error': 'Unknown path ' + path})
+            return
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self.sendJSON(400, {'error': 'The request body is not JSON'})
+            return
+        if not isinstance(request, dict):
+            self.sendJSON(400, {'error': 'The request body must be a JSON object'})
+            return
+        targets = request.get('targets', request.get('target', []))
+        sources = request.get('sources', request.get('source', []))
+        if isinstance(targets, basestring):
+            targets = [targets]
+        if isinstance(sources, basestring):
+            sources = [sources]
+        self.lookup(targets, sources, bool(request.get('metadata', False)))
+
+    def lookup(self, targets, sources, metadata):
+        """
+        Runs the lookups of a request and sends the records found.
+        Returns nothing.
+
+        Argument(s):
+        targets -- list of strings representing targets.
+        sources -- list of site names, empty to use every site.
+        metadata -- True if lookup timing and cache metadata is added to the records.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if not targets:
+            self.sendJSON(400, {'error': 'No target given'})
+            return
+        try:
+            records = self.server.service.lookup(targets, sources, metadata)
+            body = json.dumps(OrderedDict([('records', records)]))
+        except Exception as e:
+            self.sendJSON(500, {'error': str(e)})
+            return
+        self.sendBody(200, body)
+
+    def sendJSON(self, status, content):
+        """
+        Sends a response holding content encoded as JSON.
+        Returns nothing.
+
+        Argument(s):
+        status -- integer HTTP status code.
+        content -- object to encode as JSON.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.sendBody(status, json.dumps(content))
+
+    def sendBody(self, status, body):
+        """
+        Sends a response holding a body already encoded as JSON.
+        Returns nothing.
+
+        Argument(s):
+        status -- integer HTTP status code.
+        body -- string holding the JSON.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        """
+        Returns the client address for log messages without a reverse
+        DNS lookup. Unix socket clients have no address.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format, *args):
+        """
+        Prints a request log message when verbose output was requested.
+        Returns nothing.
+
+        Argument(s):
+        format -- string format of the message.
+        args -- values formatted into the message.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        SiteDetailOutput.PrintStandardOutput('[*] ' + self.address_string() + ' ' + format % args,
+                                             verbose=self.server.service.Verbose)
+
+
+class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    ThreadedHTTPServer serves the HTTP API on a TCP port and answers each
+    connection on its own thread.
+
+    Public Method(s):
+    No public methods beyond HTTPServer.
+
+    Instance variable(s):
+    service
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, service):
+        """
+        Class constructor. Binds the server and stores the LookupService.
+
+        Argument(s):
+        address -- tuple of (host, port) to listen on.
+        service -- LookupService answering the lookups.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self.service = service
+        HTTPServer.__init__(self, address, LookupRequestHandler)
+
+
+class ThreadedUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """
+    ThreadedUnixHTTPServer serves the HTTP API on a Unix socket, which only
+    local users allowed by the socket's permissions can reach, and answers
+    each connection on its own thread. A socket left behind by an earlier
+    service is replaced.
+
+    Public Method(s):
+    server_bind
+    server_close
+
+    Instance variable(s):
+    service
+    """
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        """
+        Class constructor. Binds the server and stores the LookupService.
+
+        Argument(s):
+        path -- string path of the Unix socket to listen on.
+        service -- LookupService answering the lookups.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self.service = service
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+        UnixStreamServer.__init__(self, path, LookupRequestHandler)
+
+    def server_bind(self):
+        """
+        Binds the socket and sets the names BaseHTTPRequestHandler expects.
+        Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        UnixStreamServer.server_bind(self)
+        self.server_name = self.server_address
+        self.server_port = 0
+
+    def server_close(self):
+        """
+        Closes the socket and removes its file. Returns nothing.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
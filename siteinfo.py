@@ -6,6 +6,21 @@ file and the arguments sent in to the Automater.
 Class(es):
 SiteFacade -- Class used to run the automation necessary to retrieve
 site information and store results.
+LookupJob -- Class used to represent one planned lookup of a target
+against a site and the results attached once it has run.
+LookupJournal -- Class used to record completed lookups so an
+interrupted run can be resumed.
+SerialExecutor -- Class used to run lookups one after the other.
+ThreadedExecutor -- Class used to run lookups on a pool of worker threads.
+SiteDefinition -- Class used to represent one validated site entry
+of the xml config files.
+SiteDefinitionCache -- Class used to load the xml config files into
+SiteDefinition objects and keep them on disk between runs.
+SiteIndex -- Class used to look up site definitions by target type
+and by name.
+RegExCache -- Class used to compile each site regex once.
+FieldExtractor -- Class used to run every regex of a site against
+retrieved content with a literal prefilter.
 Site -- Parent Class used to store sites and information retrieved.
 SingleResultsSite -- Class used to store information from a site that
 only has one result requested and discovered.
@@ -27,197 +42,1794 @@ No exceptions exported.
 """
 import requests
 import re
-import time
 import os
+import ast
+import threading
+import time
+import sre_parse
+import sre_constants
+import cPickle
+from collections import OrderedDict, namedtuple, deque
+from multiprocessing.pool import ThreadPool
 from os import listdir
 from os.path import isfile, join
 from requests.exceptions import ConnectionError
 from outputs import SiteDetailOutput
 from inputs import SitesFile
 from utilities import VersionChecker
+from transport import RateLimiter, SessionRegistry, RequestCoalescer, ResponseCache, RetryPolicy, CircuitBreaker, \
+    Deadline, ResponseReader, Cassette
+
+requests.packages.urllib3.disable_warnings()
+
+__TEKDEFENSEXML__ = 'tekdefense.xml'
+__SITESXML__ = 'sites.xml'
+
+class SiteFacade(object):
+    """
+    SiteFacade provides a Facade to run the multiple requirements needed
+    to automate the site retrieval and storage processes.
+
+    Public Method(s):
+    runSiteAutomation
+    planLookups
+    generateLookups
+    planBatch
+    executeLookups
+    untilDeadline
+    cancelLookup
+    runLookup
+    planSite
+    decorateSite
+    (Property) Sites
+    (Property) Jobs
+    (Property) Cancelled
+
+    Instance variable(s):
+    _sites
+    _jobs
+    _verbose
+    _journal
+    _output
+    _cancelled
+    """
+    _planbatchsize = 1000
+    _ipaddressregex = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+    _md5regex = re.compile(r'[a-fA-F0-9]{32}', re.IGNORECASE)
+
+    def __init__(self, verbose, journal=None, output=None):
+        """
+        Class constructor. Simply creates a blank list and assigns it to
+        instance variable _sites that will be filled with retrieved info
+        from sites defined in the xml configuration file.
+
+        Argument(s):
+        verbose -- boolean value representing whether output will be printed to stdout
+        journal -- LookupJournal used to restore and record completed lookups.
+        Default is None which keeps no journal.
+        output -- object with a write Method, such as StreamingOutput, that each
+        completed site is handed to instead of being kept in _sites. Default is
+        None which keeps every site for output at the end of the run.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+
+        self._sites = []
+        self._jobs = []
+        self._verbose = verbose
+        self._journal = journal
+        self._output = output
+        self._cancelled = 0
+
+    def runSiteAutomation(self, webretrievedelay, proxy, targetlist, sourcelist,
+                          useragent, botoutputrequested, refreshremotexml, versionlocation, workers=1,
+                          executor=None):
+        """
+        Builds site objects representative of each site listed in the xml
+        config file. Appends a Site object or one of it's subordinate objects
+        to the _sites instance variable so retrieved information can be used.
+        The lookups are planned in batches as the targets are read and run
+        through the executor as they are planned. Returns nothing.
+
+        Argument(s):
+        webretrievedelay -- The amount of seconds to wait between site retrieve
+        calls. Default delay is 2 seconds.
+        proxy -- proxy server address as server:port_number
+        targetlist -- iterable of strings representing targets to be investigated.
+        Targets can be IP Addresses, MD5 hashes, or hostnames.
+        sourcelist -- list of strings representing a specific site that should only be used
+        for investigation purposes instead of all sites listed in the xml
+        config file.
+        useragent -- String representing user-agent that will be utilized when
+        requesting or submitting data to or from a web site.
+        botoutputrequested -- true or false representing if a minimalized output
+        will be required for the site.
+        refreshremotexml -- true or false representing if Automater will refresh 
+        the tekdefense.xml file on each run.
+        versionlocation -- string representing the GitHub location of Automater.
+        workers -- integer representing how many site lookups may run at the
+        same time. Default is 1 which runs every lookup serially.
+        executor -- object with an execute Method used to run the lookups. By
+        default a SerialExecutor or a ThreadedExecutor based on workers.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        jobs = self.generateLookups(webretrievedelay, proxy, targetlist, sourcelist, useragent, botoutputrequested,
+                                    refreshremotexml, versionlocation)
+        if executor is None:
+            if workers > 1:
+                executor = ThreadedExecutor(workers)
+            else:
+                executor = SerialExecutor()
+        self.executeLookups(jobs, executor)
+
+    def planLookups(self, webretrievedelay, proxy, targetlist, sourcelist,
+                    useragent, botoutputrequested, refreshremotexml, versionlocation):
+        """
+        Builds a LookupJob for every site listed in the xml config files
+        that applies to each target and source requested. Nothing is
+        retrieved from the network, so the requests of the jobs are released
+        from the RequestCoalescer again. The jobs are stored in the _jobs
+        instance variable and returned.
+
+        Argument(s):
+        webretrievedelay -- The amount of seconds to wait between site retrieve
+        calls. Default delay is 2 seconds.
+        proxy -- proxy server address as server:port_number
+        targetlist -- iterable of strings representing targets to be investigated.
+        sourcelist -- list of strings representing a specific site that should only be used
+        for investigation purposes instead of all sites listed in the xml
+        config file.
+        useragent -- String representing user-agent that will be utilized when
+        requesting or submitting data to or from a web site.
+        botoutputrequested -- true or false representing if a minimalized output
+        will be required for the site.
+        refreshremotexml -- true or false representing if Automater will refresh
+        the tekdefense.xml file on each run.
+        versionlocation -- string representing the GitHub location of Automater.
+
+        Return value(s):
+        list -- of LookupJob objects in the order they would run serially.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._jobs = list(self.generateLookups(webretrievedelay, proxy, targetlist, sourcelist, useragent,
+                                               botoutputrequested, refreshremotexml, versionlocation))
+        for job in self._jobs:
+            if not job.Restored:
+                RequestCoalescer.release(job.PlannedSite.getRequestKey())
+        return self._jobs
+
+    def generateLookups(self, webretrievedelay, proxy, targetlist, sourcelist,
+                        useragent, botoutputrequested, refreshremotexml, versionlocation):
+        """
+        Yields a LookupJob for every site listed in the xml config files
+        that applies to each target and source requested, reading the
+        targets lazily. The targets are planned in batches of
+        _planbatchsize so a large feed starts running as soon as its first
+        batch is planned. The jobs of each target are planned together, in
+        the order the sites are listed, so the lookups of a target complete
+        together and streamed output stays grouped by target.
+        Nothing is retrieved from the network.
+
+        Argument(s):
+        webretrievedelay -- The amount of seconds to wait between site retrieve
+        calls. Default delay is 2 seconds.
+        proxy -- proxy server address as server:port_number
+        targetlist -- iterable of strings representing targets to be investigated.
+        sourcelist -- list of strings representing a specific site that should only be used
+        for investigation purposes instead of all sites listed in the xml
+        config file.
+        useragent -- String representing user-agent that will be utilized when
+        requesting or submitting data to or from a web site.
+        botoutputrequested -- true or false representing if a minimalized output
+        will be required for the site.
+        refreshremotexml -- true or false representing if Automater will refresh
+        the tekdefense.xml file on each run.
+        versionlocation -- string representing the GitHub location of Automater.
+
+        Return value(s):
+        Iterator of LookupJob objects in the order they would run serially.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if refreshremotexml:
+            SitesFile.updateTekDefenseXMLTree(proxy, self._verbose)
+
+        remotedefinitions = SiteDefinitionCache.load(__TEKDEFENSEXML__, self._verbose)
+        localdefinitions = SiteDefinitionCache.load(__SITESXML__, self._verbose)
+
+        if not localdefinitions and not remotedefinitions:
+            print 'Unfortunately there is neither a {tekd} file nor a {sites} file that can be utilized for proper' \
+                  ' parsing.\nAt least one configuration XML file must be available for Automater to work properly.\n' \
+                  'Please see {url} for further instructions.'\
+                .format(tekd=__TEKDEFENSEXML__, sites=__SITESXML__, url=versionlocation)
+            return
+
+        definitions = []
+        for sitedefinitions in (localdefinitions, remotedefinitions):
+            if not sitedefinitions:
+                continue
+            for definition in sitedefinitions:
+                if definition.valid:
+                    definitions.append(definition)
+                else:
+                    print 'A problem was found in the {sites} file. There appears to be a site entry with ' \
+                          'unequal numbers of regexs and reporting requirements'.format(sites=__SITESXML__)
+        siteindex = SiteIndex(definitions)
+        for source in sourcelist:
+            if source != "allsources" and not siteindex.hasName(source):
+                SiteDetailOutput.PrintStandardOutput('[-] No site named {source} is defined in the {tekd} or '
+                                                     '{sites} file.'.format(source=source, tekd=__TEKDEFENSEXML__,
+                                                                            sites=__SITESXML__),
+                                                     verbose=self._verbose)
+        for definition in siteindex.Definitions:
+            RegExCache.precompile(definition.getRegExList())
+
+        batch = []
+        for targ in targetlist:
+            batch.append(targ)
+            if len(batch) >= self._planbatchsize:
+                for job in self.planBatch(siteindex, batch, webretrievedelay, proxy, sourcelist, useragent,
+                                          botoutputrequested):
+                    yield job
+                batch = []
+        for job in self.planBatch(siteindex, batch, webretrievedelay, proxy, sourcelist, useragent,
+                                  botoutputrequested):
+            yield job
+
+    def planBatch(self, siteindex, targetlist, webretrievedelay, proxy, sourcelist, useragent, botoutputrequested):
+        """
+        Yields a LookupJob for every site in the SiteIndex that applies to
+        each target of a batch and source requested, target by target in
+        the order given and then by site entry. Each target is classified
+        once and only the sites accepting its type are visited. Lookups
+        completed by an earlier run are restored from the journal.
+
+        Argument(s):
+        siteindex -- SiteIndex of the valid site definitions.
+        targetlist -- list of strings representing the targets of the batch.
+        webretrievedelay -- The amount of seconds to wait between site retrieve
+        calls. Default delay is 2 seconds.
+        proxy -- proxy server address as server:port_number
+        sourcelist -- list of strings representing a specific site that should only be used
+        for investigation purposes instead of all sites listed in the xml
+        config file.
+        useragent -- String representing user-agent that will be utilized when
+        requesting or submitting data to or from a web site.
+        botoutputrequested -- true or false representing if a minimalized output
+        will be required for the site.
+
+        Return value(s):
+        Iterator of LookupJob objects.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        definitionsbytype = {}
+        for target in targetlist:
+            targettype = self.identifyTargetType(target)
+            if targettype not in definitionsbytype:
+                definitionsbytype[targettype] = siteindex.getDefinitions([targettype], sourcelist)
+            for definition, sitetypes, sourcecount in definitionsbytype[targettype]:
+                for count in xrange(sourcecount):
+                    restored, results = False, None
+                    if self._journal is not None:
+                        restored, results = self._journal.restore(definition.name, target)
+                    job = LookupJob(definition.name, self.planSite(definition, webretrievedelay, proxy, targettype,
+                                                                   target, useragent, botoutputrequested,
+                                                                   not restored))
+                    if restored:
+                        job.restoreResults(results)
+                    yield job
+
+    def executeLookups(self, jobs, executor):
+        """
+        Runs each LookupJob through the executor and appends the decorated
+        Site object of every completed job to the _sites instance variable
+        in the order the executor hands the jobs back, or hands it to the
+        output if one was given. Every completed job is recorded in the
+        journal if one is kept. Once the run Deadline has passed no more
+        jobs are started and the jobs cancelled are neither recorded nor
+        output.
+
+        Argument(s):
+        jobs -- iterable of LookupJob objects.
+        executor -- object with an execute Method, such as SerialExecutor or
+        ThreadedExecutor.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for job in executor.execute(self.untilDeadline(jobs), self.runLookup):
+            if job.Cancelled:
+                self._cancelled += 1
+                continue
+            if self._journal is not None:
+                self._journal.record(job)
+            if self._output is not None:
+                self._output.write(job.Site)
+            else:
+                self._sites.append(job.Site)
+
+    def untilDeadline(self, jobs):
+        """
+        Yields each LookupJob until the run Deadline has passed. The first
+        job taken after that is cancelled and no more jobs are taken, so
+        no more lookups are planned either.
+
+        Argument(s):
+        jobs -- iterable of LookupJob objects.
+
+        Return value(s):
+        Iterator of LookupJob objects.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        for job in jobs:
+            if Deadline.RunExpired():
+                self.cancelLookup(job)
+                self._cancelled += 1
+                return
+            yield job
+
+    def cancelLookup(self, job):
+        """
+        Cancels a LookupJob that will not run and releases its request
+        from the RequestCoalescer.
+
+        Argument(s):
+        job -- the LookupJob to cancel.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        job.cancel()
+        if not job.Restored:
+            RequestCoalescer.release(job.PlannedSite.getRequestKey())
+
+    def runLookup(self, job):
+        """
+        Decorates the planned Site object of a LookupJob, retrieves its
+        results, or restores them if the job was completed by an earlier
+        run, and attaches the decorated Site object to the job. The seconds
+        the lookup took are stored on the Site object. A job that would
+        retrieve its results after the run Deadline has passed, or that ran
+        out of time before it, is cancelled instead.
+        Returns the job.
+
+        Argument(s):
+        job -- the LookupJob to run.
+
+        Return value(s):
+        LookupJob.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if not job.Restored and Deadline.RunExpired():
+            self.cancelLookup(job)
+            return job
+        started = time.time()
+        site = self.decorateSite(job.PlannedSite)
+        if job.Restored:
+            site.restoreResults(job.RestoredResults)
+        else:
+            site.Deadline = Deadline.forLookup()
+            site.retrieveResults()
+            if site.OutOfTime and site.Deadline.RunBound:
+                job.cancel()
+                return job
+        site.Elapsed = time.time() - started
+        job.attachSite(site)
+        return job
+
+    def getSiteInfoIfSiteTypesMatch(self, source, target, siteelement):
+        if isinstance(siteelement, SiteDefinition):
+            name = siteelement.name
+            sitetypes = siteelement.sitetypes
+        else:
+            name = siteelement.get("name")
+            sitetypes = [st.text for st in siteelement.find("sitetype").findall("entry")]
+        if source == "allsources" or source == name:
+            targettype = self.identifyTargetType(target)
+            if targettype in sitetypes:
+                return True, targettype, target
+
+        return False, None, None
+
+    def siteEntryIsValid(self, siteelement):
+        return SiteDefinition.entryIsValid(siteelement)
+
+    def buildSiteList(self, siteelement, webretrievedelay, proxy, targettype, targ, useragent, botoutputrequested):
+        self._sites.append(self.buildSite(siteelement, webretrievedelay, proxy, targettype, targ, useragent,
+                                          botoutputrequested))
+
+    def buildSite(self, siteelement, webretrievedelay, proxy, targettype, targ, useragent, botoutputrequested):
+        site = self.decorateSite(Site.buildSiteFromXML(siteelement, webretrievedelay, proxy, targettype, targ,
+                                                       useragent, botoutputrequested, self._verbose))
+        site.retrieveResults()
+        return site
+
+    def planSite(self, siteelement, webretrievedelay, proxy, targettype, targ, useragent, botoutputrequested,
+                 register=True):
+        """
+        Builds the undecorated Site object for a lookup without retrieving
+        anything and registers its request with the RequestCoalescer so
+        site entries that expand to the same request share one retrieval.
+        Returns the undecorated Site object.
+
+        Argument(s):
+        siteelement -- the SiteDefinition, or the siteelement object that
+        will be used as the start element.
+        webretrievedelay -- the amount of seconds to wait between site retrieve
+        calls. Default delay is 2 seconds.
+        proxy -- proxy server address as server:port_number
+        targettype -- the targettype as defined. Either ip, md5, or hostname.
+        targ -- the target that will be used to gather information on.
+        useragent -- String representing user-agent that will be utilized when
+        requesting or submitting data to or from a web site.
+        botoutputrequested -- true or false representing if a minimalized output
+        will be required for the site.
+        register -- true or false representing if the request will be retrieved
+        and so registered with the RequestCoalescer. Default is True.
+
+        Return value(s):
+        Site object.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if isinstance(siteelement, SiteDefinition):
+            site = Site.buildSiteFromDefinition(siteelement, webretrievedelay, proxy, targettype, targ, useragent,
+                                                botoutputrequested, self._verbose)
+        else:
+            site = Site.buildSiteFromXML(siteelement, webretrievedelay, proxy, targettype, targ, useragent,
+                                         botoutputrequested, self._verbose)
+        if register:
+            RequestCoalescer.register(site.getRequestKey())
+        return site
+
+    def decorateSite(self, site):
+        """
+        Wraps an undecorated Site object in the subordinate Site object that
+        matches its method and number of regexs, which knows how to retrieve
+        and store the results. Returns the decorated Site object.
+
+        Argument(s):
+        site -- the undecorated Site object to decorate.
+
+        Return value(s):
+        MethodPostSite, SingleResultsSite or MultiResultsSite object.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if site.Method == "POST":
+            return MethodPostSite(site)
+        elif isinstance(site.RegEx, basestring):
+            return SingleResultsSite(site)
+        else:
+            return MultiResultsSite(site)
+
+    @property
+    def Sites(self):
+        """
+        Checks the instance variable _sites is empty or None.
+        Returns _sites (the site list) or None if it is empty.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of Site objects or its subordinates.
+        None -- if _sites is empty or None.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self._sites is None or len(self._sites) == 0:
+            return None
+        return self._sites
+
+    @property
+    def Jobs(self):
+        """
+        Returns the list of LookupJob objects built by planLookups.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of LookupJob objects. Empty if nothing was planned.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._jobs
+
+    @property
+    def Cancelled(self):
+        """
+        Returns the number of lookups cancelled because the run Deadline
+        had passed.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._cancelled
+
+    def identifyTargetType(self, target):
+        """
+        Checks the target information provided to determine if it is a(n)
+        IP Address in standard; CIDR or dash notation, or an MD5 hash,
+        or a string hostname.
+        Returns a string md5 if MD5 hash is identified. Returns the string
+        ip if any IP Address format is found. Returns the string hostname
+        if neither of those two are found.
+
+        Argument(s):
+        target -- string representing the target provided as the first
+        argument to the program when Automater is run.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._ipaddressregex.search(target) is not None:
+            return "ip"
+
+        if self._md5regex.search(target) is not None:
+            return "md5"
+
+        return "hostname"
+
+class LookupJob(object):
+    """
+    LookupJob is the lightweight unit of work planned by SiteFacade. It
+    pairs a site definition with one target as an undecorated Site
+    object, which retrieves nothing, and receives the decorated Site
+    object holding the results once an executor has run it.
+
+    Public Method(s):
+    attachSite
+    restoreResults
+    (Property) SourceName
+    (Property) PlannedSite
+    (Property) Target
+    (Property) TargetType
+    (Property) Site
+    (Property) Completed
+    (Property) Restored
+    (Property) RestoredResults
+    cancel
+    (Property) Cancelled
+    (Property) Wait
+
+    Instance variable(s):
+    _sourcename
+    _plannedsite
+    _site
+    _restored
+    _restoredresults
+    _cancelled
+    """
+
+    def __init__(self, sourcename, plannedsite):
+        """
+        Class constructor. Stores the name of the site element and the
+        undecorated Site object planned for the lookup.
+
+        Argument(s):
+        sourcename -- string defined in the name attribute of the site element.
+        plannedsite -- the undecorated Site object for the lookup.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._sourcename = sourcename
+        self._plannedsite = plannedsite
+        self._site = None
+        self._restored = False
+        self._restoredresults = None
+        self._cancelled = False
+
+    @property
+    def SourceName(self):
+        """
+        Returns the name attribute of the site element used for the lookup.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._sourcename
+
+    @property
+    def PlannedSite(self):
+        """
+        Returns the undecorated Site object planned for the lookup.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Site object.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._plannedsite
+
+    @property
+    def Target(self):
+        """
+        Returns the target the lookup investigates.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._plannedsite.Target
+
+    @property
+    def TargetType(self):
+        """
+        Returns the type of the target the lookup investigates.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- defined as ip, md5, or hostname.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._plannedsite.TargetType
+
+    @property
+    def Site(self):
+        """
+        Returns the decorated Site object holding the results of the lookup.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        SingleResultsSite, MultiResultsSite or MethodPostSite object.
+        None -- if the lookup has not run.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._site
+
+    @property
+    def Completed(self):
+        """
+        Returns True if the lookup has run and its results are attached.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._site is not None
+
+    def attachSite(self, site):
+        """
+        Attaches the decorated Site object holding the results of the lookup.
+
+        Argument(s):
+        site -- the decorated Site object.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._site = site
+
+    def restoreResults(self, results):
+        """
+        Marks the lookup as already completed by an earlier run and stores
+        the results that run retrieved, so it is not retrieved again.
+
+        Argument(s):
+        results -- the results of the site as stored in the journal.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._restored = True
+        self._restoredresults = results
+
+    @property
+    def Restored(self):
+        """
+        Returns True if the results of the lookup came from a journal.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._restored
+
+    @property
+    def RestoredResults(self):
+        """
+        Returns the results restored from a journal.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        The results as stored in the journal, or None if not restored.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._restoredresults
+
+    def cancel(self):
+        """
+        Marks the lookup as cancelled so its results are never retrieved.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._cancelled = True
+
+    @property
+    def Cancelled(self):
+        """
+        Returns True if the lookup was cancelled before it ran.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._cancelled
+
+    @property
+    def Wait(self):
+        """
+        Returns how long the request of the lookup would wait on the
+        RateLimiter if it was sent now.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float -- seconds, 0 if the lookup was restored by an earlier run.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self._restored:
+            return 0.0
+        site = self._plannedsite
+        return RateLimiter.getWait(site.FullURL, site.WebRetrieveDelay, site.RateLimit)
+
+
+class LookupJournal(object):
+    """
+    LookupJournal is an append-only record of completed lookups. One line
+    is written per lookup as soon as it completes, holding the name of
+    the site, the target and the results retrieved. A run started with
+    the journal of an earlier run restores those lookups instead of
+    retrieving them again, and its outputs are built from the restored
+    results as if they had just been retrieved.
+
+    Public Method(s):
+    restore
+    record
+    close
+    (Property) RestoredCount
+
+    Instance variable(s):
+    _journalfile
+    _completed
+    _copyrestored
+    _restoredcount
+    _file
+    _guard
+    """
+
+    def __init__(self, journalfile=None, resumefile=None, verbose=False):
+        """
+        Class constructor. Loads the completed lookups from resumefile and
+        opens journalfile for appending.
+
+        Argument(s):
+        journalfile -- string representing the file completed lookups are
+        appended to. Default is None which uses resumefile.
+        resumefile -- string representing the journal of an earlier run whose
+        completed lookups are restored. Default is None.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._journalfile = journalfile or resumefile
+        self._completed = {}
+        self._restoredcount = 0
+        self._guard = threading.Lock()
+        self._file = None
+        # restored lookups only need writing again when they are not already in the journal
+        self._copyrestored = resumefile is None or (journalfile is not None and
+                                                    os.path.abspath(journalfile) != os.path.abspath(resumefile))
+        if resumefile:
+            self.load(resumefile, verbose)
+        if self._journalfile:
+            try:
+                self._file = open(self._journalfile, 'a+')
+                # end a line cut short by a killed run so the next record starts on its own line
+                self._file.seek(0, os.SEEK_END)
+                if self._file.tell() > 0:
+                    self._file.seek(-1, os.SEEK_END)
+                    if self._file.read(1) != '\n':
+                        self._file.write('\n')
+                        self._file.flush()
+            except IOError:
+                SiteDetailOutput.PrintStandardOutput('[-] Cannot open the journal file {journal} for writing. '
+                                                     'Completed lookups will not be recorded.'.
+                                                     format(journal=self._journalfile))
+
+    def load(self, resumefile, verbose):
+        loaded = 0
+        try:
+            with open(resumefile) as f:
+                for line in f:
+                    try:
+                        sourcename, target, results = ast.literal_eval(line)
+                    except (ValueError, SyntaxError, TypeError):
+                        # the last line of a journal may be cut short when a run is killed
+                        continue
+                    self._completed.setdefault((sourcename, target), deque()).append(results)
+                    loaded += 1
+        except IOError:
+            SiteDetailOutput.PrintStandardOutput('[-] Cannot read the journal file {journal}. No lookups will be '
+                                                 'restored.'.format(journal=resumefile))
+            return
+        SiteDetailOutput.PrintStandardOutput('[*] {count} completed lookups loaded from {journal}.'.
+                                             format(count=loaded, journal=resumefile), verbose=verbose)
+
+    @property
+    def RestoredCount(self):
+        """
+        Returns the number of lookups restored so far.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._restoredcount
+
+    def restore(self, sourcename, target):
+        """
+        Takes the next completed lookup of the site and target from the
+        journal. A site looked up more than once for a target is restored
+        once for every time it was recorded.
+
+        Argument(s):
+        sourcename -- string defined in the name attribute of the site element.
+        target -- the target of the lookup.
+
+        Return value(s):
+        tuple -- (True, results) if a completed lookup was found or
+        (False, None) if the lookup still has to run.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._guard:
+            completed = self._completed.get((sourcename, target))
+            if not completed:
+                return False, None
+            results = completed.popleft()
+            if not completed:
+                del self._completed[(sourcename, target)]
+            self._restoredcount += 1
+        return True, results
+
+    def record(self, job):
+        """
+        Appends a completed lookup to the journal and flushes it so it
+        survives the run being killed.
+
+        Argument(s):
+        job -- the completed LookupJob.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self._file is None or (job.Restored and not self._copyrestored):
+            return
+        line = repr((job.SourceName, job.Target, job.Site._results)) + '\n'
+        with self._guard:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """
+        Closes the journal file.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._guard:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SerialExecutor(object):
+    """
+    SerialExecutor runs lookups one after the other in the calling thread.
+    Among a bounded window of upcoming jobs it runs the first one whose
+    source the RateLimiter would let through at once, so the thread does
+    not sleep out the delay of one source while others are idle. Jobs
+    are still handed back in the order they were given.
+
+    Public Method(s):
+    execute
+
+    Instance variable(s):
+    _window
+    """
+
+    def __init__(self, window=16):
+        """
+        Class constructor. Stores how many jobs are looked at ahead.
+
+        Argument(s):
+        window -- integer representing the most jobs taken from the iterable
+        ahead of the oldest job not yet handed back. Default is 16.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._window = max(1, window)
+
+    def execute(self, jobs, runner):
+        """
+        Runs the jobs with runner and yields each job once it and every job
+        before it have completed. The next job run is the first of the
+        window that would not wait on the RateLimiter, or else the one that
+        would wait the least.
+
+        Argument(s):
+        jobs -- iterable of LookupJob objects.
+        runner -- callable that runs a LookupJob and returns it.
+
+        Return value(s):
+        Iterator of completed LookupJob objects in the order given.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        jobs = iter(jobs)
+        pending = deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < self._window:
+                try:
+                    pending.append([next(jobs), False])
+                except StopIteration:
+                    exhausted = True
+            if not pending:
+                return
+            chosen, shortest = None, None
+            for entry in pending:
+                if entry[1]:
+                    continue
+                wait = entry[0].Wait
+                if shortest is None or wait < shortest:
+                    chosen, shortest = entry, wait
+                    if wait <= 0:
+                        break
+            chosen[0] = runner(chosen[0])
+            chosen[1] = True
+            while pending and pending[0][1]:
+                yield pending.popleft()[0]
+
+
+class ThreadedExecutor(object):
+    """
+    ThreadedExecutor runs lookups on a bounded pool of worker threads and
+    hands them back in the order they were given, so results are identical
+    to a serial run. Only a bounded window of jobs is taken from the
+    iterable ahead of the oldest unfinished job, so jobs planned lazily
+    from a large target feed are not all held in memory at once.
+
+    Public Method(s):
+    execute
+
+    Instance variable(s):
+    _workers
+    _window
+    """
+
+    def __init__(self, workers):
+        """
+        Class constructor. Stores the number of worker threads to use.
+
+        Argument(s):
+        workers -- integer representing the number of worker threads.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._workers = max(1, workers)
+        self._window = self._workers * 4
+
+    def execute(self, jobs, runner):
+        """
+        Runs the jobs with runner on the worker threads and yields each job
+        once it and every job before it have completed.
+
+        Argument(s):
+        jobs -- iterable of LookupJob objects.
+        runner -- callable that runs a LookupJob and returns it.
+
+        Return value(s):
+        Iterator of completed LookupJob objects in the order given.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        pool = ThreadPool(self._workers)
+        pending = deque()
+        try:
+            for job in jobs:
+                pending.append(pool.apply_async(runner, (job,)))
+                if len(pending) >= self._window:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+        finally:
+            pool.close()
+            pool.join()
+
+
+class SiteDefinition(namedtuple('SiteDefinition', 'name valid sitetypes domainurl method postdata '
+                                                  'reportstringforresult sitefriendlyname regex fullurl '
+                                                  'importantproperty params headers ratelimit cachettl maxbytes')):
+    """
+    SiteDefinition is the immutable, validated form of one site entry
+    from the xml config files. Everything the lookups need is read from
+    the XML once. Entries that were a list in the XML are kept as tuples
+    and dictionaries as tuples of (key, value) pairs, so a definition
+    can be shared by every lookup and kept on disk by the
+    SiteDefinitionCache.
+
+    Public Method(s):
+    (Class Method) fromXML
+    (Class Method) entryIsValid
+    (Class Method) copyDictionary
+    (Class Method) copyStringOrList
+    getRegExList
+
+    Instance variable(s):
+    name
+    valid
+    sitetypes
+    domainurl
+    method
+    postdata
+    reportstringforresult
+    sitefriendlyname
+    regex
+    fullurl
+    importantproperty
+    params
+    headers
+    ratelimit
+    cachettl
+    maxbytes
+    """
+    __slots__ = ()
+
+    @classmethod
+    def fromXML(cls, siteelement):
+        """
+        Reads every value a lookup needs from a site element of the xml
+        config file. Entries with unequal numbers of regexs and reporting
+        requirements are returned with valid set to False and nothing
+        else read.
+
+        Argument(s):
+        siteelement -- the siteelement object that will be used as the
+        start element.
+
+        Return value(s):
+        SiteDefinition object.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        name = siteelement.get("name")
+        if not cls.entryIsValid(siteelement):
+            return cls(name, False, (), None, None, None, None, None, None, None, None, None, None, None, None, None)
+        try:
+            method = siteelement.find("method").text
+            if method.upper() != "GET" and method.upper() != "POST":
+                method = "GET"
+        except:
+            method = "GET"
+        return cls(name, True,
+                   tuple(st.text for st in siteelement.find("sitetype").findall("entry")),
+                   siteelement.find("domainurl").text,
+                   method.upper(),
+                   cls.freeze(Site.buildDictionaryFromXML(siteelement, "postdata")),
+                   cls.freeze(Site.buildStringOrListfromXML(siteelement, "reportstringforresult")),
+                   cls.freeze(Site.buildStringOrListfromXML(siteelement, "sitefriendlyname")),
+                   cls.freeze(Site.buildStringOrListfromXML(siteelement, "regex")),
+                   siteelement.find("fullurl").text,
+                   cls.freeze(Site.buildStringOrListfromXML(siteelement, "importantproperty")),
+                   cls.freeze(Site.buildDictionaryFromXML(siteelement, "params")),
+                   cls.freeze(Site.buildDictionaryFromXML(siteelement, "headers")),
+                   Site.buildRateLimitFromXML(siteelement),
+                   Site.buildCacheTTLFromXML(siteelement),
+                   Site.buildMaxBytesFromXML(siteelement))
+
+    @classmethod
+    def entryIsValid(cls, siteelement):
+        """
+        Checks a site element of the xml config file has equal numbers of
+        reporting strings, friendly names, regexs and important properties.
+
+        Argument(s):
+        siteelement -- the siteelement object that will be used as the
+        start element.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        reportstringcount = len(siteelement.find("reportstringforresult").findall("entry"))
+        sitefriendlynamecount = len(siteelement.find("sitefriendlyname").findall("entry"))
+        regexcount = len(siteelement.find("regex").findall("entry"))
+        importantpropertycount = len(siteelement.find("importantproperty").findall("entry"))
+
+        if reportstringcount == sitefriendlynamecount and reportstringcount == regexcount and reportstringcount == importantpropertycount:
+            return True
+        return False
+
+    @classmethod
+    def freeze(cls, value):
+        if isinstance(value, dict):
+            return tuple(value.items())
+        if isinstance(value, list):
+            return tuple(value)
+        return value
+
+    @classmethod
+    def copyDictionary(cls, value):
+        """
+        Returns a fresh dictionary built from stored (key, value) pairs.
+
+        Argument(s):
+        value -- params, headers or postdata stored in the definition.
+
+        Return value(s):
+        dict or None.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if value is None:
+            return None
+        return dict(value)
+
+    @classmethod
+    def copyStringOrList(cls, value):
+        """
+        Returns a fresh list for multiple stored entries, or the string
+        when only one entry was stored.
+
+        Argument(s):
+        value -- string or tuple of strings stored in the definition.
+
+        Return value(s):
+        list, string or None.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if isinstance(value, tuple):
+            return list(value)
+        return value
+
+    def getRegExList(self):
+        """
+        Returns the regexs of the definition as a list, whether one or
+        several were entered in the xml config file.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of strings.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.regex is None:
+            return []
+        if isinstance(self.regex, basestring):
+            return [self.regex]
+        return list(self.regex)
+
+
+class SiteDefinitionCache(object):
+    """
+    SiteDefinitionCache provides Class Methods to load the xml config
+    files into SiteDefinition objects. The definitions are pickled into
+    the cache directory keyed by the md5 of the file they were read from
+    and reused until the file changes, so the XML is not parsed again
+    on every run.
+
+    Public Method(s):
+    (Class Method) configure
+    (Class Method) load
+
+    Instance variable(s):
+    No instance variables.
+    """
+    __FORMAT__ = 2
+    _cachedir = None
+    _loaded = {}
+    _guard = threading.Lock()
+
+    @classmethod
+    def configure(cls, cachedir):
+        """
+        Sets the directory the definitions are kept in. If it is never
+        called the definitions are only kept for the current run.
+
+        Argument(s):
+        cachedir -- string representing the directory holding the cache.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            cls._cachedir = cachedir
+            cls._loaded = {}
+
+    @classmethod
+    def load(cls, filename, verbose):
+        """
+        Returns the SiteDefinition objects for every site entry in an xml
+        config file, in the order they are listed. Returns None if the
+        file is not present or cannot be parsed, after printing the same
+        messages SitesFile.getXMLTree prints.
+
+        Argument(s):
+        filename -- string representing the xml config file.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        tuple -- of SiteDefinition objects.
+        None -- if the file could not be read.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        try:
+            md5 = SitesFile.getMD5OfLocalFile(filename)
+        except IOError:
+            md5 = None
+        if md5 is not None:
+            with cls._guard:
+                definitions = cls._loaded.get((filename, md5))
+            if definitions is None:
+                definitions = cls.readCacheFile(filename, md5)
+            if definitions is not None:
+                with cls._guard:
+                    cls._loaded[(filename, md5)] = definitions
+                return definitions
+
+        sitetree = SitesFile.getXMLTree(filename, verbose)
+        if not sitetree:
+            return None
+        definitions = tuple(SiteDefinition.fromXML(siteelement) for siteelement in sitetree.iter(tag="site"))
+        if md5 is not None:
+            with cls._guard:
+                cls._loaded[(filename, md5)] = definitions
+            cls.writeCacheFile(filename, md5, definitions)
+        return definitions
+
+    @classmethod
+    def getCacheFileName(cls, filename):
+        if not cls._cachedir:
+            return None
+        return os.path.join(cls._cachedir, 'sitedefinitions-{name}.pickle'.format(
+            name=os.path.basename(os.path.abspath(filename))))
+
+    @classmethod
+    def readCacheFile(cls, filename, md5):
+        cachefilename = cls.getCacheFileName(filename)
+        if not cachefilename:
+            return None
+        try:
+            with open(cachefilename, 'rb') as f:
+                cacheformat, cachedmd5, definitions = cPickle.load(f)
+        except Exception:
+            return None
+        if cacheformat != cls.__FORMAT__ or cachedmd5 != md5:
+            return None
+        return definitions
+
+    @classmethod
+    def writeCacheFile(cls, filename, md5, definitions):
+        cachefilename = cls.getCacheFileName(filename)
+        if not cachefilename:
+            return
+        tempfilename = '{name}.{pid}.tmp'.format(name=cachefilename, pid=os.getpid())
+        try:
+            if not os.path.isdir(cls._cachedir):
+                os.makedirs(cls._cachedir)
+            with open(tempfilename, 'wb') as f:
+                cPickle.dump((cls.__FORMAT__, md5, definitions), f, cPickle.HIGHEST_PROTOCOL)
+            os.rename(tempfilename, cachefilename)
+        except (OSError, IOError, cPickle.PicklingError):
+            try:
+                os.remove(tempfilename)
+            except OSError:
+                pass
+
+
+class SiteIndex(object):
+    """
+    SiteIndex indexes the valid SiteDefinition objects of a run once by
+    the target types they accept and by name, so planning looks up the
+    definitions that apply to a target instead of scanning every site
+    entry for every target and source.
+
+    Public Method(s):
+    getDefinitions
+    hasName
+    (Property) Definitions
+    (Property) ByType
+    (Property) ByName
+
+    Instance variable(s):
+    _definitions
+    _sitetypes
+    _bytype
+    _byname
+    """
+
+    def __init__(self, definitions):
+        """
+        Class constructor. Builds the indexes from the definitions in the
+        order they are listed in the xml config files.
+
+        Argument(s):
+        definitions -- iterable of valid SiteDefinition objects.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._definitions = []
+        self._sitetypes = []
+        self._bytype = {}
+        self._byname = {}
+        for definition in definitions:
+            position = len(self._definitions)
+            sitetypes = []
+            for sitetype in definition.sitetypes:
+                if sitetype not in sitetypes:
+                    sitetypes.append(sitetype)
+                    self._bytype.setdefault(sitetype, []).append(position)
+            self._byname.setdefault(definition.name, []).append(position)
+            self._definitions.append(definition)
+            self._sitetypes.append(tuple(sitetypes))
+
+    @property
+    def Definitions(self):
+        """
+        Returns the indexed definitions in the order they were listed.
+
+        Argument(s):
+        No arguments are required.
 
-requests.packages.urllib3.disable_warnings()
+        Return value(s):
+        list -- of SiteDefinition objects.
 
-__TEKDEFENSEXML__ = 'tekdefense.xml'
-__SITESXML__ = 'sites.xml'
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._definitions
 
-class SiteFacade(object):
+    @property
+    def ByType(self):
+        """
+        Returns the definitions that accept each target type.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict -- of target type string to list of SiteDefinition objects.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return dict((sitetype, [self._definitions[position] for position in positions])
+                    for sitetype, positions in self._bytype.iteritems())
+
+    @property
+    def ByName(self):
+        """
+        Returns the definitions listed under each site name.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict -- of site name string to list of SiteDefinition objects.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return dict((name, [self._definitions[position] for position in positions])
+                    for name, positions in self._byname.iteritems())
+
+    def hasName(self, name):
+        """
+        Returns True if a definition is listed under the site name.
+
+        Argument(s):
+        name -- string representing a site name passed with the -s option.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return name in self._byname
+
+    def getDefinitions(self, targettypes, sourcelist):
+        """
+        Returns the definitions that accept at least one of the target
+        types and are selected by the source list, in the order they were
+        listed, each with its distinct target types and the number of
+        sources that select it. A site is
+        selected once by every allsources entry and once by every entry
+        naming it, which is how often it is looked up for each target.
+
+        Argument(s):
+        targettypes -- iterable of target type strings present in the targets.
+        sourcelist -- list of strings passed with the -s option or allsources.
+
+        Return value(s):
+        list -- of (SiteDefinition, tuple of target type strings, integer) tuples.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        allsourcescount = 0
+        namecounts = {}
+        for source in sourcelist:
+            if source == "allsources":
+                allsourcescount += 1
+            else:
+                namecounts[source] = namecounts.get(source, 0) + 1
+        positions = set()
+        for targettype in targettypes:
+            positions.update(self._bytype.get(targettype, ()))
+        if not allsourcescount:
+            named = set()
+            for name in namecounts:
+                named.update(self._byname.get(name, ()))
+            positions &= named
+        definitions = []
+        for position in sorted(positions):
+            definition = self._definitions[position]
+            definitions.append((definition, self._sitetypes[position],
+                                allsourcescount + namecounts.get(definition.name, 0)))
+        return definitions
+
+
+class RegExCache(object):
     """
-    SiteFacade provides a Facade to run the multiple requirements needed
-    to automate the site retrieval and storage processes.
+    RegExCache provides Class Methods to compile the regexs defined in the
+    xml config file once instead of on every lookup. Regexs that do not
+    use the %TARGET% keyword are compiled when the config is loaded and
+    kept for the whole run. Regexs that become target specific once
+    %TARGET% is replaced are kept in a bounded least recently used cache.
+    Along with each compiled regex the literal text every match must
+    start with is kept so content can be prefiltered.
 
     Public Method(s):
-    runSiteAutomation
-    (Property) Sites
+    (Class Method) precompile
+    (Class Method) getCompiled
+    (Class Method) getCompiledWithPrefix
+    (Class Method) getRequiredPrefix
 
     Instance variable(s):
-    _sites
+    No instance variables.
     """
+    _static = {}
+    _targeted = OrderedDict()
+    _maxtargeted = 1024
+    _guard = threading.Lock()
 
-    def __init__(self, verbose):
+    @classmethod
+    def precompile(cls, regexs):
         """
-        Class constructor. Simply creates a blank list and assigns it to
-        instance variable _sites that will be filled with retrieved info
-        from sites defined in the xml configuration file.
+        Compiles every regex that does not contain the %TARGET% keyword and
+        keeps it for the rest of the run. Regexs that fail to compile are
+        skipped so the error is still reported when the site uses them.
 
         Argument(s):
-        No arguments are required.
+        regexs -- iterable of regex strings from the regex XML tag.
 
         Return value(s):
         Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
         """
+        for regex in regexs:
+            if not regex or "%TARGET%" in regex or regex in cls._static:
+                continue
+            try:
+                compiled = cls.compileWithPrefix(regex)
+            except re.error:
+                continue
+            with cls._guard:
+                cls._static[regex] = compiled
 
-        self._sites = []
-        self._verbose = verbose
+    @classmethod
+    def compileWithPrefix(cls, regex):
+        """
+        Compiles a regex case insensitively and works out its required prefix.
 
-    def runSiteAutomation(self, webretrievedelay, proxy, targetlist, sourcelist,
-                          useragent, botoutputrequested, refreshremotexml, versionlocation):
+        Argument(s):
+        regex -- regex string with any %TARGET% keyword already replaced.
+
+        Return value(s):
+        tuple -- (compiled regular expression object, prefix string).
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises re.error if the regex cannot be compiled.
         """
-        Builds site objects representative of each site listed in the xml
-        config file. Appends a Site object or one of it's subordinate objects
-        to the _sites instance variable so retrieved information can be used.
-        Returns nothing.
+        return re.compile(regex, re.IGNORECASE), cls.getRequiredPrefix(regex)
+
+    @classmethod
+    def getRequiredPrefix(cls, regex):
+        """
+        Returns the lower-cased literal text that every match of the regex
+        must start with, taken from the leading literal characters of the
+        parsed regex. Returns an empty string if the regex does not start
+        with a literal, for example when it starts with a group, a class
+        or an anchor.
 
         Argument(s):
-        webretrievedelay -- The amount of seconds to wait between site retrieve
-        calls. Default delay is 2 seconds.
-        proxy -- proxy server address as server:port_number
-        targetlist -- list of strings representing targets to be investigated.
-        Targets can be IP Addresses, MD5 hashes, or hostnames.
-        sourcelist -- list of strings representing a specific site that should only be used
-        for investigation purposes instead of all sites listed in the xml
-        config file.
-        useragent -- String representing user-agent that will be utilized when
-        requesting or submitting data to or from a web site.
-        botoutputrequested -- true or false representing if a minimalized output
-        will be required for the site.
-        refreshremotexml -- true or false representing if Automater will refresh 
-        the tekdefense.xml file on each run.
+        regex -- regex string with any %TARGET% keyword already replaced.
 
         Return value(s):
-        Nothing is returned from this Method.
+        string.
 
         Restriction(s):
-        The Method has no restrictions.
+        This Method is tagged as a Class Method
         """
-        if refreshremotexml:
-            SitesFile.updateTekDefenseXMLTree(proxy, self._verbose)
+        chars = []
+        try:
+            for op, av in sre_parse.parse(regex, re.IGNORECASE):
+                # only ASCII literals lower-case the same way the regex engine folds them
+                if op != sre_constants.LITERAL or av >= 128:
+                    break
+                chars.append(chr(av).lower())
+        except (re.error, ValueError, TypeError):
+            return ''
+        return ''.join(chars)
 
-        remotesitetree = SitesFile.getXMLTree(__TEKDEFENSEXML__, self._verbose)
-        localsitetree = SitesFile.getXMLTree(__SITESXML__, self._verbose)
+    @classmethod
+    def getCompiledWithPrefix(cls, regex):
+        """
+        Returns the compiled, case insensitive form of a regex and its
+        required prefix, compiling it only if it is not cached yet.
 
-        if not localsitetree and not remotesitetree:
-            print 'Unfortunately there is neither a {tekd} file nor a {sites} file that can be utilized for proper' \
-                  ' parsing.\nAt least one configuration XML file must be available for Automater to work properly.\n' \
-                  'Please see {url} for further instructions.'\
-                .format(tekd=__TEKDEFENSEXML__, sites=__SITESXML__, url=versionlocation)
-        else:
-            if localsitetree:
-                for siteelement in localsitetree.iter(tag="site"):
-                    if self.siteEntryIsValid(siteelement):
-                        for targ in targetlist:
-                            for source in sourcelist:
-                                sitetypematch, targettype, target = self.getSiteInfoIfSiteTypesMatch(source, targ,
-                                                                                                     siteelement)
-                                if sitetypematch:
-                                    self.buildSiteList(siteelement, webretrievedelay, proxy, targettype, target,
-                                                       useragent, botoutputrequested)
-                    else:
-                        print 'A problem was found in the {sites} file. There appears to be a site entry with ' \
-                              'unequal numbers of regexs and reporting requirements'.format(sites=__SITESXML__)
-            if remotesitetree:
-                for siteelement in remotesitetree.iter(tag="site"):
-                    if self.siteEntryIsValid(siteelement):
-                        for targ in targetlist:
-                            for source in sourcelist:
-                                sitetypematch, targettype, target = self.getSiteInfoIfSiteTypesMatch(source, targ,
-                                                                                                     siteelement)
-                                if sitetypematch:
-                                    self.buildSiteList(siteelement, webretrievedelay, proxy, targettype, target,
-                                                       useragent, botoutputrequested)
-                    else:
-                        print 'A problem was found in the {sites} file. There appears to be a site entry with ' \
-                              'unequal numbers of regexs and reporting requirements'.format(sites=__SITESXML__)
+        Argument(s):
+        regex -- regex string with any %TARGET% keyword already replaced.
 
-    def getSiteInfoIfSiteTypesMatch(self, source, target, siteelement):
-        if source == "allsources" or source == siteelement.get("name"):
-            targettype = self.identifyTargetType(target)
-            for st in siteelement.find("sitetype").findall("entry"):
-                if st.text == targettype:
-                    return True, targettype, target
+        Return value(s):
+        tuple -- (compiled regular expression object, prefix string).
 
-        return False, None, None
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises re.error if the regex cannot be compiled.
+        """
+        compiled = cls._static.get(regex)
+        if compiled is not None:
+            return compiled
+        with cls._guard:
+            compiled = cls._targeted.pop(regex, None)
+            if compiled is not None:
+                cls._targeted[regex] = compiled
+                return compiled
+        compiled = cls.compileWithPrefix(regex)
+        with cls._guard:
+            cls._targeted[regex] = compiled
+            while len(cls._targeted) > cls._maxtargeted:
+                cls._targeted.popitem(last=False)
+        return compiled
 
-    def siteEntryIsValid(self, siteelement):
-        reportstringcount = len(siteelement.find("reportstringforresult").findall("entry"))
-        sitefriendlynamecount = len(siteelement.find("sitefriendlyname").findall("entry"))
-        regexcount = len(siteelement.find("regex").findall("entry"))
-        importantpropertycount = len(siteelement.find("importantproperty").findall("entry"))
+    @classmethod
+    def getCompiled(cls, regex):
+        """
+        Returns the compiled, case insensitive form of a regex, compiling it
+        only if it is not cached yet.
 
-        if reportstringcount == sitefriendlynamecount and reportstringcount == regexcount and reportstringcount == importantpropertycount:
-            return True
-        return False
+        Argument(s):
+        regex -- regex string with any %TARGET% keyword already replaced.
 
-    def buildSiteList(self, siteelement, webretrievedelay, proxy, targettype, targ, useragent, botoutputrequested):
-        site = Site.buildSiteFromXML(siteelement, webretrievedelay, proxy, targettype, targ, useragent,
-                                     botoutputrequested, self._verbose)
-        if site.Method == "POST":
-            self._sites.append(MethodPostSite(site))
-        elif isinstance(site.RegEx, basestring):
-            self._sites.append(SingleResultsSite(site))
-        else:
-            self._sites.append(MultiResultsSite(site))
+        Return value(s):
+        compiled regular expression object.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises re.error if the regex cannot be compiled.
+        """
+        return cls.getCompiledWithPrefix(regex)[0]
+
+
+class FieldExtractor(object):
+    """
+    FieldExtractor runs the regexs of a site against one piece of content.
+    The content is lower-cased once and each regex is only run if the
+    literal text its matches must start with is present, starting at the
+    first place that text appears. The results are identical to running
+    findall over the whole content for every regex, but fields that
+    cannot match cost a substring search instead of a regex scan.
+
+    Public Method(s):
+    findall
+    (Property) Content
+
+    Instance variable(s):
+    _content
+    _lowered
+    """
+
+    def __init__(self, content):
+        """
+        Class constructor. Stores the content the regexs will run against.
+
+        Argument(s):
+        content -- string content retrieved from the site.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._content = content
+        self._lowered = None
 
     @property
-    def Sites(self):
+    def Content(self):
         """
-        Checks the instance variable _sites is empty or None.
-        Returns _sites (the site list) or None if it is empty.
+        Returns the content the regexs run against.
 
         Argument(s):
         No arguments are required.
 
         Return value(s):
-        list -- of Site objects or its subordinates.
-        None -- if _sites is empty or None.
+        string.
 
         Restriction(s):
         This Method is tagged as a Property.
         """
-        if self._sites is None or len(self._sites) == 0:
-            return None
-        return self._sites
+        return self._content
 
-    def identifyTargetType(self, target):
+    def findall(self, regex):
         """
-        Checks the target information provided to determine if it is a(n)
-        IP Address in standard; CIDR or dash notation, or an MD5 hash,
-        or a string hostname.
-        Returns a string md5 if MD5 hash is identified. Returns the string
-        ip if any IP Address format is found. Returns the string hostname
-        if neither of those two are found.
+        Returns every match of the regex in the content in the same form as
+        re.findall.
 
         Argument(s):
-        target -- string representing the target provided as the first
-        argument to the program when Automater is run.
+        regex -- regex string with any %TARGET% keyword already replaced.
 
         Return value(s):
-        string.
+        list -- of strings or tuples of strings for regexs with several groups.
 
         Restriction(s):
-        The Method has no restrictions.
+        Raises re.error if the regex cannot be compiled and TypeError or
+        AttributeError if there is no content.
         """
-        ipAddress = re.compile('\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
-        ipFind = re.findall(ipAddress, target)
-        if ipFind is not None and len(ipFind) > 0:
-            return "ip"
-
-        md5 = re.compile('[a-fA-F0-9]{32}', re.IGNORECASE)
-        md5Find = re.findall(md5,target)
-        if md5Find is not None and len(md5Find) > 0:
-            return "md5"
+        repattern, prefix = RegExCache.getCompiledWithPrefix(regex)
+        if not prefix:
+            return repattern.findall(self._content)
+        if self._lowered is None:
+            self._lowered = self._content.lower()
+        position = self._lowered.find(prefix)
+        if position < 0:
+            return []
+        return repattern.findall(self._content, position)
 
-        return "hostname"
 
 class Site(object):
     """
@@ -229,9 +1841,16 @@ class Site(object):
 
     Public Method(s):
     (Class Method) buildSiteFromXML
+    (Class Method) buildSiteFromDefinition
     (Class Method) buildStringOrListfromXML
     (Class Method) buildDictionaryFromXML
+    (Class Method) buildRateLimitFromXML
+    (Class Method) buildCacheTTLFromXML
+    (Class Method) buildMaxBytesFromXML
     (Property) WebRetrieveDelay
+    (Property) RateLimit
+    (Property) CacheTTL
+    (Property) MaxBytes
     (Property) TargetType
     (Property) ReportStringForResult
     (Property) FriendlyName
@@ -251,13 +1870,28 @@ class Site(object):
     (Property) UserAgent
     (Property) Results
     (Property) Method
+    (Property) Elapsed
+    (Setter) Elapsed
+    (Property) CacheHit
+    (Property) Deadline
+    (Setter) Deadline
+    (Property) OutOfTime
     addResults
+    restoreResults
     postMessage
+    retrieveResults
     getImportantProperty
     getTarget
     getResults
     getFullURL
+    getRequestKey
+    retrieveThroughCache
     getWebScrape
+    retrieveWebScrape
+    sendRequest
+    readContent
+    submitPost
+    retrievePost
 
     Instance variable(s):
     _sites
@@ -278,10 +1912,20 @@ class Site(object):
     _headers
     _results
     _method
+    _ratelimit
+    _cachettl
+    _maxbytes
+    _statuscode
+    _elapsed
+    _cachehit
+    _deadline
+    _outoftime
+    _stoppedearly
     """
     def __init__(self, domainurl, webretrievedelay, proxy, targettype,
                  reportstringforresult, target, useragent, friendlyname, regex,
-                 fullurl, boutoutputrequested, importantproperty, params, headers, method, postdata, verbose):
+                 fullurl, boutoutputrequested, importantproperty, params, headers, method, postdata, verbose,
+                 ratelimit=None, cachettl=None, maxbytes=None):
         """
         Class constructor. Sets the instance variables based on input from
         the arguments supplied when Automater is run and what the xml
@@ -318,6 +1962,12 @@ class Site(object):
         method -- holds whether this is a GET or POST required site. by default = GET
         postdata -- dict holding data required for posting values to a site. by default = None
         verbose -- boolean representing whether text will be printed to stdout
+        ratelimit -- tuple of (requests per second, burst) provided in the ratelimit
+        XML tag in the xml configuration file. by default = None
+        cachettl -- integer seconds the site's content is kept in the response cache
+        provided in the cachettl XML tag. by default = None which uses the --cache-ttl value
+        maxbytes -- integer most bytes read from the site's responses provided in the
+        maxbytes XML tag. by default = None which uses the --max-bytes value
 
         Return value(s):
         Nothing is returned from this Method.
@@ -351,6 +2001,15 @@ class Site(object):
         self.Method = method  # call the helper method to ensure result is either GET or POST
         self._results = []
         self._verbose = verbose
+        self._ratelimit = ratelimit
+        self._cachettl = cachettl
+        self._maxbytes = maxbytes
+        self._statuscode = None
+        self._elapsed = None
+        self._cachehit = None
+        self._deadline = None
+        self._outoftime = False
+        self._stoppedearly = False
 
     @classmethod
     def checkmoduleversion(self, prefix, gitlocation, proxy, verbose):
@@ -405,10 +2064,50 @@ class Site(object):
         importantproperty = Site.buildStringOrListfromXML(siteelement, "importantproperty")
         params = Site.buildDictionaryFromXML(siteelement, "params")
         headers = Site.buildDictionaryFromXML(siteelement, "headers")
+        ratelimit = Site.buildRateLimitFromXML(siteelement)
+        cachettl = Site.buildCacheTTLFromXML(siteelement)
+        maxbytes = Site.buildMaxBytesFromXML(siteelement)
 
         return Site(domainurl, webretrievedelay, proxy, targettype, reportstringforresult, target,
                     useragent, sitefriendlyname, regex, fullurl, botoutputrequested, importantproperty,
-                    params, headers, method.upper(), postdata, verbose)
+                    params, headers, method.upper(), postdata, verbose, ratelimit, cachettl, maxbytes)
+
+    @classmethod
+    def buildSiteFromDefinition(self, definition, webretrievedelay, proxy, targettype,
+                                target, useragent, botoutputrequested, verbose):
+        """
+        Builds the Site object from a SiteDefinition without reading the
+        XML again. Every mutable value handed to the Site object is a
+        fresh copy, so the definition can be shared by every lookup.
+        Returns a Site object that defines results returned during the web
+        retrieval investigations.
+
+        Argument(s):
+        definition -- the SiteDefinition object of the site.
+        webretrievedelay -- the amount of seconds to wait between site retrieve
+        calls. Default delay is 2 seconds.
+        proxy -- sets a proxy to use in the form of proxy.example.com:8080.
+        targettype -- the targettype as defined. Either ip, md5, or hostname.
+        target -- the target that will be used to gather information on.
+        useragent -- the string utilized to represent the user-agent when
+        web requests or submissions are made.
+        botoutputrequested -- true or false representing if a minimalized output
+        will be required for the site.
+
+        Return value(s):
+        Site object.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return Site(definition.domainurl, webretrievedelay, proxy, targettype,
+                    SiteDefinition.copyStringOrList(definition.reportstringforresult), target, useragent,
+                    SiteDefinition.copyStringOrList(definition.sitefriendlyname),
+                    SiteDefinition.copyStringOrList(definition.regex), definition.fullurl, botoutputrequested,
+                    SiteDefinition.copyStringOrList(definition.importantproperty),
+                    SiteDefinition.copyDictionary(definition.params), SiteDefinition.copyDictionary(definition.headers),
+                    definition.method, SiteDefinition.copyDictionary(definition.postdata), verbose,
+                    definition.ratelimit, definition.cachettl, definition.maxbytes)
 
     @classmethod
     def buildStringOrListfromXML(self, siteelement, elementstring):
@@ -466,23 +2165,100 @@ class Site(object):
         XML tags.
 
         Return value(s):
-        None if no entry XML tags are found.
-        Dictionary representing all entry keys found within the elementstring.
+        None if no entry XML tags are found.
+        Dictionary representing all entry keys found within the elementstring.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        variablename = ""
+        try:
+            if len(siteelement.find(elementstring).findall("entry")) > 0:
+                variablename = {}
+                for entry in siteelement.find(elementstring).findall("entry"):
+                    variablename[entry.get("key")] = entry.text
+            else:
+                return None
+        except:
+            return None
+        return variablename
+
+    @classmethod
+    def buildRateLimitFromXML(self, siteelement):
+        """
+        Takes in a siteelement and builds the rate limit declared in the
+        optional ratelimit XML tag. The tag text is the number of requests
+        per second allowed to the source and the optional burst attribute
+        is the number of requests that may be sent back to back, for example
+        <ratelimit burst="2">0.5</ratelimit>.
+
+        Argument(s):
+        siteelement -- the siteelement object that will be used as the
+        start element.
+
+        Return value(s):
+        None if no valid ratelimit XML tag is found.
+        Tuple of (float requests per second, integer burst).
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        try:
+            ratelimitelement = siteelement.find("ratelimit")
+            rate = float(ratelimitelement.text)
+            burst = int(ratelimitelement.get("burst", 1))
+        except (AttributeError, TypeError, ValueError):
+            return None
+        if rate <= 0:
+            return None
+        return rate, max(1, burst)
+
+    @classmethod
+    def buildCacheTTLFromXML(self, siteelement):
+        """
+        Takes in a siteelement and builds the number of seconds content
+        retrieved from the site stays in the response cache, declared in
+        the optional cachettl XML tag. A value of 0 disables caching for
+        the site.
+
+        Argument(s):
+        siteelement -- the siteelement object that will be used as the
+        start element.
+
+        Return value(s):
+        None if no valid cachettl XML tag is found.
+        Integer representing seconds.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        try:
+            return max(0, int(siteelement.find("cachettl").text))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def buildMaxBytesFromXML(self, siteelement):
+        """
+        Takes in a siteelement and builds the most bytes read from each
+        response of the site, declared in the optional maxbytes XML tag.
+        A value of 0 reads every response whole.
+
+        Argument(s):
+        siteelement -- the siteelement object that will be used as the
+        start element.
+
+        Return value(s):
+        None if no valid maxbytes XML tag is found.
+        Integer representing bytes.
 
         Restriction(s):
         This Method is tagged as a Class Method
         """
-        variablename = ""
         try:
-            if len(siteelement.find(elementstring).findall("entry")) > 0:
-                variablename = {}
-                for entry in siteelement.find(elementstring).findall("entry"):
-                    variablename[entry.get("key")] = entry.text
-            else:
-                return None
-        except:
+            return max(0, int(siteelement.find("maxbytes").text))
+        except (AttributeError, TypeError, ValueError):
             return None
-        return variablename
 
     @property
     def WebRetrieveDelay(self):
@@ -502,6 +2278,64 @@ class Site(object):
         """
         return self._webretrievedelay
 
+    @property
+    def RateLimit(self):
+        """
+        Returns the rate limit declared for the site in the xml
+        configuration file.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- (requests per second, burst) declared for the site.
+        None -- if the site does not declare a rate limit.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._ratelimit
+
+    @property
+    def CacheTTL(self):
+        """
+        Returns the number of seconds content retrieved from the site
+        stays in the response cache.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- seconds declared for the site in the cachettl XML tag or
+        the --cache-ttl value if the site does not declare one.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self._cachettl is None:
+            return ResponseCache.DefaultTTL()
+        return self._cachettl
+
+    @property
+    def MaxBytes(self):
+        """
+        Returns the most bytes read from each response of the site.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- bytes declared for the site in the maxbytes XML tag or the
+        --max-bytes value if the site does not declare one. 0 if responses
+        are read whole.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self._maxbytes is None:
+            return ResponseReader.MaxBytes()
+        return self._maxbytes
+
     @property
     def Proxy(self):
         """
@@ -999,6 +2833,107 @@ class Site(object):
 
         self._method = "GET"
 
+    @property
+    def Elapsed(self):
+        """
+        Returns the seconds the lookup of the site took.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+        None -- if the lookup has not run.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._elapsed
+
+    @Elapsed.setter
+    def Elapsed(self, elapsed):
+        """
+        Stores the seconds the lookup of the site took.
+
+        Argument(s):
+        elapsed -- float seconds the lookup took.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Setter.
+        """
+        self._elapsed = elapsed
+
+    @property
+    def CacheHit(self):
+        """
+        Returns whether the content of the site came from the response cache.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+        None -- if this site did not look its content up, such as when the
+        results were restored from a journal or shared with an identical request.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._cachehit
+
+    @property
+    def Deadline(self):
+        """
+        Returns the Deadline the lookup of the site has to finish by.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Deadline.
+        None -- if the lookup has no deadline.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._deadline
+
+    @Deadline.setter
+    def Deadline(self, deadline):
+        """
+        Stores the Deadline the lookup of the site has to finish by.
+
+        Argument(s):
+        deadline -- the Deadline of the lookup.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Setter.
+        """
+        self._deadline = deadline
+
+    @property
+    def OutOfTime(self):
+        """
+        Returns whether the content of the site could not be retrieved
+        before the Deadline of the lookup passed.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._outoftime
+
     @property
     def Results(self):
         """
@@ -1036,6 +2971,22 @@ class Site(object):
         else:
             self._results = results
 
+    def restoreResults(self, results):
+        """
+        Assigns results recorded by an earlier run to the _results instance
+        variable exactly as they were stored.
+
+        Argument(s):
+        results -- results of the site as recorded in a journal.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self._results = results
+
     def postMessage(self, message):
         """
         Prints multiple messages to inform the user of progress.
@@ -1069,6 +3020,23 @@ class Site(object):
         """
         self.postMessage(message)
 
+    def retrieveResults(self):
+        """
+        Retrieves the site content and stores the results discovered. The
+        undecorated Site does not know how to interpret content so nothing
+        is retrieved; subordinate objects override this Method.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        pass
+
     def getImportantProperty(self, index):
         """
         Gets the property information from the property value listed in the
@@ -1170,11 +3138,83 @@ class Site(object):
             params = None
         return headers, params, proxy
 
+    def getRequestKey(self):
+        """
+        Builds a hashable key describing the fully expanded request this
+        site sends and how much of the response is read. Sites with equal
+        keys receive identical content. When reading stops once every regex
+        has matched, the regexs are part of the key as well.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- method, full URL, parameters, post data, headers, proxy, the
+        most bytes read and, when reading may stop early, the regexs.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        headers, params, proxy = self.getHeaderParamProxyInfo()
+        postdata = self.PostData if self.Method == "POST" else None
+        requestkey = (self.Method, self.FullURL,
+                      tuple(sorted(params.items())) if params else None,
+                      tuple(sorted(postdata.items())) if postdata else None,
+                      tuple(sorted(headers.items())),
+                      self.Proxy, self.MaxBytes)
+        if ResponseReader.StopEarly():
+            requestkey += (self.RegEx if isinstance(self.RegEx, basestring) else tuple(self.RegEx),)
+        return requestkey
+
+    def readContent(self, resp, deadline=None):
+        """
+        Reads the body of a streamed response of the site up to the most
+        bytes allowed for it. When --stop-early was chosen reading stops
+        once every regex of the site has matched, and content read only in
+        part this way is never stored in the response cache. Content cut
+        short by the deadline is dropped and the site is out of time.
+
+        Argument(s):
+        resp -- the requests response sent with stream=True.
+        deadline -- Deadline of the lookup. Default is None which reads
+        until the end of the body.
+
+        Return value(s):
+        string.
+        None -- if the deadline passed before the body was read.
+
+        Restriction(s):
+        Raises the errors of requests if the body cannot be read.
+        """
+        finished = None
+        if ResponseReader.StopEarly():
+            regexs = [self.RegEx] if isinstance(self.RegEx, basestring) else list(self.RegEx)
+            try:
+                unmatched = [RegExCache.getCompiled(regex) for regex in regexs]
+            except (re.error, TypeError):
+                unmatched = None
+            if unmatched:
+                def finished(text):
+                    unmatched[:] = [repattern for repattern in unmatched if not repattern.search(text)]
+                    return not unmatched
+
+        content, reason = ResponseReader.read(resp, self.MaxBytes, finished, deadline)
+        if reason == 'deadline':
+            self._outoftime = True
+            self.postErrorMessage('[-] No time is left to read ' + self.FullURL)
+            return None
+        self._stoppedearly = reason == 'finished'
+        if reason == 'maxbytes':
+            self.postErrorMessage('[-] Only the first {count} bytes of {url} were read'.format(count=self.MaxBytes,
+                                                                                             url=self.FullURL))
+        return content
+
     def getWebScrape(self):
         """
         Attempts to retrieve a string from a web site. String retrieved is
         the entire web site including HTML markup. Requests via proxy if
         --proxy option was chosen during execution of the Automater.
+        Identical requests planned for the same run are retrieved once.
         Returns the string representing the entire web site including the
         HTML markup retrieved from the site.
 
@@ -1187,20 +3227,150 @@ class Site(object):
         Restriction(s):
         The Method has no restrictions.
         """
-        delay = self.WebRetrieveDelay
+        return RequestCoalescer.fetch(self.getRequestKey(), lambda: self.retrieveThroughCache(self.retrieveWebScrape))
+
+    def retrieveThroughCache(self, retrieve):
+        """
+        Returns the content of the site's request from the response cache
+        if fresh content is stored, otherwise calls retrieve and stores the
+        content when the source answered without an error status and the
+        whole of it up to the most bytes allowed was read. When
+        --cache-only was chosen the network is never used.
+
+        Argument(s):
+        retrieve -- the Method that sends the request, either
+        retrieveWebScrape or retrievePost.
+
+        Return value(s):
+        string.
+        None -- if the content is not cached and cannot be retrieved.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        requestkey = self.getRequestKey()
+        content = ResponseCache.get(requestkey, self.CacheTTL)
+        self._cachehit = content is not None
+        if content is not None:
+            return content
+        if ResponseCache.CacheOnly():
+            self.postErrorMessage('[-] No cached content for ' + self.FullURL)
+            return None
+        self._statuscode = None
+        content = retrieve()
+        if content is not None and self._statuscode is not None and self._statuscode < 400 \
+                and not self._stoppedearly:
+            ResponseCache.put(requestkey, content, self.CacheTTL)
+        return content
+
+    def retrieveWebScrape(self):
+        """
+        Sends the GET request for the site and returns the content
+        retrieved. Called by getWebScrape when the content is not already
+        being retrieved for another site.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if the site cannot be reached.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
         headers, params, proxy = self.getHeaderParamProxyInfo()
+        return self.sendRequest(lambda session, timeout: session.get(self.FullURL, headers=headers, params=params,
+                                                                     proxies=proxy, verify=False, timeout=timeout,
+                                                                     stream=True))
+
+    def sendRequest(self, send):
+        """
+        Sends a request to the site through the pooled session of its
+        domain, paced by the RateLimiter. A request that cannot connect
+        or is answered with 429 or a 5xx status is sent again as the
+        RetryPolicy allows. Every request to a domain whose CircuitBreaker
+        is open fails at once. Requests are sent with the connect and read
+        timeouts of the SessionRegistry, shortened to the time left before
+        the Deadline of the lookup, and nothing is sent or retried once
+        the Deadline has passed. Requests are recorded to or replayed from
+        the Cassette if one was chosen. Returns the content of the last
+        response.
+
+        Argument(s):
+        send -- callable taking the session and the (connect, read) timeouts
+        and returning the requests response.
+
+        Return value(s):
+        string.
+        None -- if the site cannot be reached.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if not CircuitBreaker.allow(self.FullURL):
+            self.postErrorMessage('[-] Skipping ' + self.FullURL + ' while its source keeps failing')
+            return None
+        deadline = self.Deadline or Deadline()
+        # a half-open breaker waits on the outcome of this request, so every exit records one
+        recorded = False
         try:
-            time.sleep(delay)
-            resp = requests.get(self.FullURL, headers=headers, params=params, proxies=proxy, verify=False, timeout=5)
-            return str(resp.content)
-        except ConnectionError as ce:
-            try:
-                self.postErrorMessage('[-] Cannot connect to {url}. Server response is {resp} Server error code is {code}'.
-                                      format(url=self.FullURL, resp=ce.message[0], code=ce.message[1][0]))
-            except:
+            attempt = 0
+            while True:
+                resp = None
+                error = None
+                try:
+                    waited = RateLimiter.wait(self.FullURL, self.WebRetrieveDelay, self.RateLimit, deadline.Remaining)
+                    if waited is None or deadline.Expired:
+                        self._outoftime = True
+                        self.postErrorMessage('[-] No time is left to retrieve ' + self.FullURL)
+                        return None
+                    timeout = deadline.limitTimeout(SessionRegistry.Timeout())
+                    # a cassette keys the request only, not how much of the answer is read
+                    resp = Cassette.send(self.getRequestKey()[:5], self.FullURL, timeout,
+                                         lambda: send(SessionRegistry.getSession(self.FullURL, self.Proxy), timeout),
+                                         self.MaxBytes, deadline)
+                    if not RetryPolicy.isRetryable(resp):
+                        content = self.readContent(resp, deadline)
+                        CircuitBreaker.recordSuccess(self.FullURL)
+                        recorded = True
+                        self._statuscode = resp.status_code
+                        return content
+                except Exception as e:
+                    resp = None
+                    error = e
+                delay = RetryPolicy.getDelay(attempt, resp)
+                if delay is None or (deadline.Remaining is not None and delay >= deadline.Remaining):
+                    break
+                if resp is not None:
+                    resp.close()
+                self.postErrorMessage('[-] Retrying {url} in {delay:.1f} seconds'.format(url=self.FullURL, delay=delay))
+                time.sleep(delay)
+                attempt += 1
+            recorded = True
+            if CircuitBreaker.recordFailure(self.FullURL):
+                self.postErrorMessage('[-] ' + RateLimiter.getDomain(self.FullURL) + ' keeps failing. Its requests will '
+                                      'fail at once for a while.')
+            if resp is not None:
+                self._statuscode = resp.status_code
+                try:
+                    return self.readContent(resp, deadline)
+                except Exception:
+                    self.postErrorMessage('[-] Cannot read the answer of ' + self.FullURL)
+                    return None
+            self._outoftime = deadline.Expired
+            if isinstance(error, ConnectionError):
+                try:
+                    self.postErrorMessage('[-] Cannot connect to {url}. Server response is {resp} Server error code is {code}'.
+                                          format(url=self.FullURL, resp=error.message[0], code=error.message[1][0]))
+                except:
+                    self.postErrorMessage('[-] Cannot connect to ' + self.FullURL)
+            else:
                 self.postErrorMessage('[-] Cannot connect to ' + self.FullURL)
-        except:
-            self.postErrorMessage('[-] Cannot connect to ' + self.FullURL)
+            return None
+        finally:
+            if not recorded:
+                CircuitBreaker.abandonProbe(self.FullURL)
 
     def addMultiResults(self, results, index):
         """
@@ -1242,21 +3412,31 @@ class Site(object):
         string -- contains entire web site being used as a
         resource including HTML markup information.
 
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        return RequestCoalescer.fetch(self.getRequestKey(), lambda: self.retrieveThroughCache(self.retrievePost))
+
+    def retrievePost(self):
+        """
+        Sends the POST request for the site and returns the content
+        retrieved. Called by submitPost when the content is not already
+        being retrieved for another site.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if the site cannot be reached.
+
         Restriction(s):
         The Method has no restrictions.
         """
         headers, params, proxy = self.getHeaderParamProxyInfo()
-        try:
-            resp = requests.post(self.FullURL, data=self.PostData, headers=headers, params=params, proxies=proxy, verify=False)
-            return str(resp.content)
-        except ConnectionError as ce:
-            try:
-                self.postErrorMessage('[-] Cannot connect to {url}. Server response is {resp} Server error code is {code}'.
-                                      format(url=self.FullURL, resp=ce.message[0], code=ce.message[1][0]))
-            except:
-                self.postErrorMessage('[-] Cannot connect to ' + self.FullURL)
-        except:
-            self.postErrorMessage('[-] Cannot connect to ' + self.FullURL)
+        return self.sendRequest(lambda session, timeout: session.post(self.FullURL, data=self.PostData,
+                                                                      headers=headers, params=params, proxies=proxy,
+                                                                      verify=False, timeout=timeout, stream=True))
 
 
 class SingleResultsSite(Site):
@@ -1265,6 +3445,7 @@ class SingleResultsSite(Site):
     a site that is being used that has a single result returned.
 
     Public Method(s):
+    retrieveResults
     getContentList
 
     Instance variable(s):
@@ -1274,7 +3455,8 @@ class SingleResultsSite(Site):
     def __init__(self, site):
         """
         Class constructor. Assigns a site from the parameter into the _site
-        instance variable. This is a play on the decorator pattern.
+        instance variable. This is a play on the decorator pattern. Nothing
+        is retrieved until retrieveResults is called.
 
         Argument(s):
         site -- the site that we will decorate.
@@ -1289,7 +3471,22 @@ class SingleResultsSite(Site):
                                                 self._site.RegEx, self._site.FullURL, self._site.BotOutputRequested,
                                                 self._site.ImportantPropertyString, self._site.Params,
                                                 self._site.Headers, self._site.Method, self._site.PostData,
-                                                site._verbose)
+                                                site._verbose, self._site.RateLimit,
+                                                self._site._cachettl, self._site._maxbytes)
+
+    def retrieveResults(self):
+        """
+        Retrieves the site content and stores the results found by the regex.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
         self.postMessage(self.UserMessage + " " + self.FullURL)
         websitecontent = self.getContentList(self.getWebScrape())
         if websitecontent:
@@ -1313,8 +3510,8 @@ class SingleResultsSite(Site):
         The Method has no restrictions.
         """
         try:
-            repattern = re.compile(self.RegEx, re.IGNORECASE)
-            foundlist = re.findall(repattern, webcontent)
+            repattern = RegExCache.getCompiled(self.RegEx)
+            foundlist = repattern.findall(webcontent)
             return foundlist
         except:
             self.postErrorMessage(self.ErrorMessage + " " + self.FullURL)
@@ -1327,6 +3524,7 @@ class MultiResultsSite(Site):
 
     Public Method(s):
     addResults
+    retrieveResults
     getContentList
 
     Instance variable(s):
@@ -1337,7 +3535,8 @@ class MultiResultsSite(Site):
     def __init__(self, site):
         """
         Class constructor. Assigns a site from the parameter into the _site
-        instance variable. This is a play on the decorator pattern.
+        instance variable. This is a play on the decorator pattern. Nothing
+        is retrieved until retrieveResults is called.
 
         Argument(s):
         site -- the site that we will decorate.
@@ -1352,13 +3551,27 @@ class MultiResultsSite(Site):
                                               self._site.UserAgent, self._site.FriendlyName,
                                               self._site.RegEx, self._site.FullURL, self._site.BotOutputRequested,
                                               self._site.ImportantPropertyString, self._site.Params,
-                                              self._site.Headers, self._site.Method, self._site.PostData, site._verbose)
+                                              self._site.Headers, self._site.Method, self._site.PostData, site._verbose,
+                                              self._site.RateLimit, self._site._cachettl, self._site._maxbytes)
         self._results = [[] for x in xrange(len(self._site.RegEx))]
-        self.postMessage(self.UserMessage + " " + self.FullURL)
 
-        webcontent = self.getWebScrape()
+    def retrieveResults(self):
+        """
+        Retrieves the site content and stores the results found by each regex.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        self.postMessage(self.UserMessage + " " + self.FullURL)
+        extractor = FieldExtractor(self.getWebScrape())
         for index in xrange(len(self.RegEx)):
-            websitecontent = self.getContentList(webcontent, index)
+            websitecontent = self.getContentList(extractor, index)
             if websitecontent:
                 self.addMultiResults(websitecontent, index)
 
@@ -1371,7 +3584,7 @@ class MultiResultsSite(Site):
 
         Argument(s):
         webcontent -- actual content of the web page that's been returned
-        from a request.
+        from a request or a FieldExtractor wrapping that content.
         index -- the integer representing the index of the regex list.
 
         Return value(s):
@@ -1381,8 +3594,9 @@ class MultiResultsSite(Site):
         The Method has no restrictions.
         """
         try:
-            repattern = re.compile(self.RegEx[index], re.IGNORECASE)
-            foundlist = re.findall(repattern, webcontent)
+            if not isinstance(webcontent, FieldExtractor):
+                webcontent = FieldExtractor(webcontent)
+            foundlist = webcontent.findall(self.RegEx[index])
             return foundlist
         except:
             self.postErrorMessage(self.ErrorMessage + " " + self.FullURL)
@@ -1395,6 +3609,7 @@ class MethodPostSite(Site):
 
     Public Method(s):
     addMultiResults
+    retrieveResults
     getContentList
     getContent
     postIsNecessary
@@ -1411,7 +3626,8 @@ class MethodPostSite(Site):
         instance variable. This is a play on the decorator pattern. Also
         assigns the postbydefault parameter to the _postByDefault instance
         variable to determine if the Automater should post information
-        to a site. By default Automater will NOT post information.
+        to a site. By default Automater will NOT post information. Nothing
+        is submitted until retrieveResults is called.
 
         Argument(s):
         site -- the site that we will decorate.
@@ -1430,18 +3646,36 @@ class MethodPostSite(Site):
                                              self._site.BotOutputRequested,
                                              self._site.ImportantPropertyString,
                                              self._site.Params, self._site.Headers,
-                                             self._site.Method, self._site.PostData, site._verbose)
+                                             self._site.Method, self._site.PostData, site._verbose,
+                                             self._site.RateLimit, self._site._cachettl,
+                                             self._site._maxbytes)
+
+    def retrieveResults(self):
+        """
+        Submits the post to the site and stores the results found by the
+        regex or regexs.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
         self.postMessage(self.UserMessage + " " + self.FullURL)
         SiteDetailOutput.PrintStandardOutput('[-] {url} requires a submission for {target}. '
                                              'Submitting now, this may take a moment.'.
                                              format(url=self._site.URL, target=self._site.Target),
-                                             verbose=site._verbose)
+                                             verbose=self._verbose)
         content = self.submitPost()
         if content:
             if not isinstance(self.FriendlyName, basestring):  # this is a multi instance
                 self._results = [[] for x in xrange(len(self.RegEx))]
+                extractor = FieldExtractor(content)
                 for index in range(len(self.RegEx)):
-                    self.addMultiResults(self.getContentList(content, index), index)
+                    self.addMultiResults(self.getContentList(extractor, index), index)
             else:  # this is a single instance
                 self.addResults(self.getContentList(content))
 
@@ -1454,7 +3688,7 @@ class MethodPostSite(Site):
 
         Argument(s):
         content -- string representation of the web site being used
-        as a resource.
+        as a resource or a FieldExtractor wrapping that content.
         index -- the integer representing the index of the regex list.
 
         Return value(s):
@@ -1464,13 +3698,13 @@ class MethodPostSite(Site):
         The Method has no restrictions.
         """
         try:
+            if not isinstance(content, FieldExtractor):
+                content = FieldExtractor(content)
             if index == -1: # this is a return for a single instance site
-                repattern = re.compile(self.RegEx, re.IGNORECASE)
-                foundlist = re.findall(repattern, content)
+                foundlist = content.findall(self.RegEx)
                 return foundlist
             else: # this is the return for a multisite
-                repattern = re.compile(self.RegEx[index], re.IGNORECASE)
-                foundlist = re.findall(repattern, content)
+                foundlist = content.findall(self.RegEx[index])
                 return foundlist
         except:
             self.postErrorMessage(self.ErrorMessage + " " + self.FullURL)
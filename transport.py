@@ -0,0 +1,1724 @@
+"""
+The transport.py module handles the HTTP transport concerns shared
+by every site Automater retrieves information from. Anything that
+controls how or when a request reaches a source should be
+programmed in this module.
+
+Class(es):
+TokenBucket -- Class representing a token bucket used to pace requests
+to a single source.
+RateLimiter -- Class providing a registry of token buckets keyed by
+source domain.
+SessionRegistry -- Class providing pooled keep-alive HTTP sessions keyed
+by source domain and proxy.
+RequestCoalescer -- Class ensuring identical requests planned for a run
+or in flight at the same time are only sent once.
+RetryPolicy -- Class deciding whether and when a failed request is sent
+again.
+CircuitBreaker -- Class failing requests at once to a source domain that
+keeps failing.
+Deadline -- Class representing the time by which a lookup or a run has
+to be finished.
+ResponseReader -- Class reading the body of a streamed response in
+bounded chunks.
+ResponseCache -- Class providing a persistent on-disk cache of retrieved
+content.
+Cassette -- Class recording responses to a directory and replaying them
+without contacting any source.
+
+Function(s):
+No global exportable functions are defined.
+
+Exception(s):
+No exceptions exported.
+"""
+import threading
+import time
+import os
+import hashlib
+import random
+import sqlite3
+import json
+import io
+import requests
+from cookielib import DefaultCookiePolicy
+from email.utils import parsedate_tz, mktime_tz
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urlparse import urlparse
+from outputs import SiteDetailOutput
+
+
+class TokenBucket(object):
+    """
+    TokenBucket represents a classic token bucket. Tokens refill at a
+    fixed rate up to a maximum capacity and every request consumes one
+    token. A request arriving to an empty bucket reserves the next token
+    and waits until it would have been refilled.
+
+    Public Method(s):
+    acquire
+    getWait
+    slowDown
+    (Property) Rate
+    (Property) Capacity
+
+    Instance variable(s):
+    _rate
+    _capacity
+    _tokens
+    _lastrefill
+    _lock
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        Class constructor. Starts the bucket full so the first request
+        to a source is never delayed.
+
+        Argument(s):
+        rate -- float representing the number of tokens added per second.
+        capacity -- integer representing the maximum number of tokens stored.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._rate = float(rate)
+        self._capacity = max(1, int(capacity))
+        self._tokens = float(self._capacity)
+        self._lastrefill = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def Rate(self):
+        """
+        Returns the number of tokens added to the bucket each second.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._rate
+
+    @property
+    def Capacity(self):
+        """
+        Returns the maximum number of tokens the bucket can hold.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._capacity
+
+    def slowDown(self, rate, capacity):
+        """
+        Lowers the rate and capacity of the bucket if the values given are
+        more restrictive than the ones currently used. Used when more than
+        one site definition shares a source domain.
+
+        Argument(s):
+        rate -- float representing the number of tokens added per second.
+        capacity -- integer representing the maximum number of tokens stored.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._lock:
+            self._rate = min(self._rate, float(rate))
+            self._capacity = min(self._capacity, max(1, int(capacity)))
+            self._tokens = min(self._tokens, float(self._capacity))
+
+    def acquire(self, limit=None):
+        """
+        Takes one token from the bucket, sleeping the calling thread until
+        the token is available. Waiting happens outside of the bucket lock
+        so other threads can reserve their own slot in the meantime.
+
+        Argument(s):
+        limit -- the most seconds the caller is willing to wait. The token
+        is given back instead of waiting any longer. Default is None which
+        waits as long as needed.
+
+        Return value(s):
+        float -- the number of seconds the caller waited.
+        None -- if the token would have arrived after the limit.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._lock:
+            now = time.time()
+            self._tokens = min(float(self._capacity), self._tokens + (now - self._lastrefill) * self._rate)
+            self._lastrefill = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            wait = -self._tokens / self._rate
+            if limit is not None and wait > limit:
+                self._tokens += 1
+                return None
+        time.sleep(wait)
+        return wait
+
+    def getWait(self):
+        """
+        Returns how long a request arriving now would wait for its token,
+        without taking it.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float -- seconds, 0 if a token is available.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        with self._lock:
+            tokens = min(float(self._capacity), self._tokens + (time.time() - self._lastrefill) * self._rate)
+            if tokens >= 1:
+                return 0.0
+            return (1 - tokens) / self._rate
+
+
+class RateLimiter(object):
+    """
+    RateLimiter provides Class Methods to pace the requests sent to
+    each source domain. One TokenBucket is kept per domain so sources
+    never wait on each other's delays.
+
+    Public Method(s):
+    (Class Method) getDomain
+    (Class Method) getBucket
+    (Class Method) wait
+    (Class Method) getWait
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _buckets = {}
+    _guard = threading.Lock()
+
+    @classmethod
+    def getDomain(cls, url):
+        """
+        Returns the lower-cased network location (host and port) of a URL.
+        The full string is returned if it cannot be parsed as a URL.
+
+        Argument(s):
+        url -- string representing the URL a request will be sent to.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        netloc = urlparse(url).netloc
+        if netloc:
+            return netloc.lower()
+        return url
+
+    @classmethod
+    def getBucket(cls, domain, rate, capacity=1):
+        """
+        Returns the TokenBucket used for a domain, creating it if this is
+        the first request to the domain. If the domain already has a bucket
+        the more restrictive of the two rates is kept.
+
+        Argument(s):
+        domain -- string representing the source domain.
+        rate -- float representing the requests allowed per second.
+        capacity -- integer representing the burst allowed for the domain.
+
+        Return value(s):
+        TokenBucket.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            bucket = cls._buckets.get(domain)
+            if bucket is None:
+                bucket = TokenBucket(rate, capacity)
+                cls._buckets[domain] = bucket
+                return bucket
+        if rate < bucket.Rate or capacity < bucket.Capacity:
+            bucket.slowDown(rate, capacity)
+        return bucket
+
+    @classmethod
+    def wait(cls, url, delay, ratelimit=None, limit=None):
+        """
+        Blocks the calling thread until a request to the domain of the url
+        is allowed. A rate declared for the site in the xml configuration
+        file takes precedence over the retrieve delay. A delay of 0 without
+        a declared rate disables limiting.
+
+        Argument(s):
+        url -- string representing the URL a request will be sent to.
+        delay -- the amount of seconds to wait between requests to one source.
+        ratelimit -- tuple of (requests per second, burst) declared in the
+        ratelimit XML tag or None if the site does not declare one.
+        limit -- the most seconds the caller is willing to wait. Default is
+        None which waits as long as needed.
+
+        Return value(s):
+        float -- the number of seconds the caller waited.
+        None -- if the request would not have been allowed within the limit.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if ratelimit:
+            rate, capacity = ratelimit
+        elif delay and delay > 0:
+            rate, capacity = 1.0 / delay, 1
+        else:
+            return 0.0
+        return cls.getBucket(cls.getDomain(url), rate, capacity).acquire(limit)
+
+    @classmethod
+    def getWait(cls, url, delay, ratelimit=None):
+        """
+        Returns how long a request to the domain of the url would wait if
+        it was sent now, without reserving a slot. A domain nothing was
+        sent to yet never waits.
+
+        Argument(s):
+        url -- string representing the URL a request will be sent to.
+        delay -- the amount of seconds to wait between requests to one source.
+        ratelimit -- tuple of (requests per second, burst) declared in the
+        ratelimit XML tag or None if the site does not declare one.
+
+        Return value(s):
+        float -- seconds, 0 if the request would be sent at once.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if not ratelimit and not (delay and delay > 0):
+            return 0.0
+        with cls._guard:
+            bucket = cls._buckets.get(cls.getDomain(url))
+        if bucket is None:
+            return 0.0
+        return bucket.getWait()
+
+
+class SessionRegistry(object):
+    """
+    SessionRegistry provides Class Methods to share keep-alive HTTP
+    sessions between every site that uses the same source domain and
+    proxy, so repeated lookups against a source reuse open TCP and TLS
+    connections instead of handshaking for every request. Headers,
+    parameters and proxies are still supplied on each request.
+
+    Public Method(s):
+    (Class Method) setPoolSize
+    (Class Method) setTimeout
+    (Class Method) Timeout
+    (Class Method) getSession
+    (Class Method) closeAll
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _sessions = {}
+    _guard = threading.Lock()
+    _poolsize = 10
+    _timeout = (5.0, 5.0)
+
+    @classmethod
+    def setPoolSize(cls, poolsize):
+        """
+        Sets the number of connections each session keeps open to its
+        domain. Only sessions created after the call are affected.
+
+        Argument(s):
+        poolsize -- integer representing the connections kept per domain.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        cls._poolsize = max(1, int(poolsize))
+
+    @classmethod
+    def setTimeout(cls, connect, read):
+        """
+        Sets the seconds every request waits to connect to a source and
+        then between bytes of its answer.
+
+        Argument(s):
+        connect -- float seconds allowed to establish a connection.
+        read -- float seconds allowed between bytes received.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        cls._timeout = (max(0.001, float(connect)), max(0.001, float(read)))
+
+    @classmethod
+    def Timeout(cls):
+        """
+        Returns the connect and read timeouts every request is sent with.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- (connect, read) float seconds.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._timeout
+
+    @classmethod
+    def getSession(cls, url, proxy=None):
+        """
+        Returns the session used for the domain of the url through the
+        proxy given, creating it on first use. Sessions never store cookies
+        so every lookup is sent the same way a standalone request would be.
+
+        Argument(s):
+        url -- string representing the URL a request will be sent to.
+        proxy -- string representing the proxy server as server:port or None.
+
+        Return value(s):
+        requests.Session.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        key = (RateLimiter.getDomain(url), proxy)
+        with cls._guard:
+            session = cls._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cls._poolsize)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                cls._sessions[key] = session
+            return session
+
+    @classmethod
+    def closeAll(cls):
+        """
+        Closes every pooled session and the connections they hold.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
+
+
+class RequestCoalescer(object):
+    """
+    RequestCoalescer provides Class Methods to retrieve the content of
+    identical requests only once. The planner registers the key of every
+    request it will send; the first site to ask for a key retrieves the
+    content, every other site with the same key waits for and reuses it,
+    and the content is dropped once the last registered site has it.
+    Requests that were never registered still join an identical request
+    that is in flight, such as one sent for another caller of the
+    service, and are dropped as soon as it completes. How often content
+    was retrieved, joined while in flight or reused is counted.
+
+    Public Method(s):
+    (Class Method) register
+    (Class Method) release
+    (Class Method) fetch
+    (Class Method) getMetrics
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _entries = {}
+    _guard = threading.Lock()
+    _retrieved = 0
+    _joined = 0
+    _reused = 0
+
+    class _Entry(object):
+        __slots__ = ('registered', 'started', 'done', 'content', 'transient')
+
+        def __init__(self, transient=False):
+            self.registered = 0
+            self.started = False
+            self.done = threading.Event()
+            self.content = None
+            self.transient = transient
+
+    @classmethod
+    def register(cls, key):
+        """
+        Records that one more site will ask for the content of a request.
+
+        Argument(s):
+        key -- hashable key describing the fully expanded request.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            entry = cls._entries.get(key)
+            if entry is None:
+                entry = cls._Entry()
+                cls._entries[key] = entry
+            # an unregistered request in flight is kept for the sites registering it
+            entry.transient = False
+            entry.registered += 1
+
+    @classmethod
+    def release(cls, key):
+        """
+        Records that a registered site will no longer ask for the content
+        of a request, dropping the stored content if nobody else will.
+
+        Argument(s):
+        key -- hashable key describing the fully expanded request.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            entry = cls._entries.get(key)
+            if entry is not None:
+                entry.registered -= 1
+                if entry.registered <= 0:
+                    del cls._entries[key]
+
+    @classmethod
+    def fetch(cls, key, retrieve):
+        """
+        Returns the content of a request, calling retrieve only if no other
+        site has retrieved or is retrieving the same request.
+
+        Argument(s):
+        key -- hashable key describing the fully expanded request.
+        retrieve -- callable that sends the request and returns its content.
+
+        Return value(s):
+        The value returned by retrieve.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            entry = cls._entries.get(key)
+            registered = entry is not None and not entry.transient
+            if entry is None:
+                entry = cls._Entry(True)
+                cls._entries[key] = entry
+            owner = not entry.started
+            entry.started = True
+            if owner:
+                cls._retrieved += 1
+            elif entry.done.is_set():
+                cls._reused += 1
+            else:
+                cls._joined += 1
+        try:
+            if owner:
+                try:
+                    entry.content = retrieve()
+                finally:
+                    entry.done.set()
+                    if not registered:
+                        with cls._guard:
+                            if cls._entries.get(key) is entry and entry.registered <= 0:
+                                del cls._entries[key]
+            else:
+                entry.done.wait()
+            return entry.content
+        finally:
+            if registered:
+                cls.release(key)
+
+    @classmethod
+    def getMetrics(cls):
+        """
+        Returns how many requests were retrieved, joined an identical
+        request in flight or reused content an identical request had
+        already retrieved, and how many requests are pending.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict -- holding retrieved, joined, reused and pending counts.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            return {'retrieved': cls._retrieved, 'joined': cls._joined, 'reused': cls._reused,
+                    'pending': len(cls._entries)}
+
+
+class RetryPolicy(object):
+    """
+    RetryPolicy provides Class Methods deciding whether and when a failed
+    request is sent again. Requests that cannot connect or that a source
+    answers with 429 or a 5xx status are retried after an exponential
+    backoff with full jitter, so callers failing together do not retry
+    together. A Retry-After header sent with 429 or 503 is honoured
+    instead; if it asks for a longer wait than the policy allows the
+    request is not retried.
+
+    Public Method(s):
+    (Class Method) configure
+    (Class Method) Retries
+    (Class Method) isRetryable
+    (Class Method) getRetryAfter
+    (Class Method) getDelay
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _retries = 2
+    _backoff = 1.0
+    _maxdelay = 60.0
+    __RETRYSTATUS__ = frozenset([429, 500, 502, 503, 504])
+
+    @classmethod
+    def configure(cls, retries=2, backoff=1.0, maxdelay=60.0):
+        """
+        Sets how often and how patiently failed requests are retried.
+
+        Argument(s):
+        retries -- integer number of times a failed request is sent again. 0 never retries.
+        backoff -- float seconds the first retry waits at most. Each retry doubles it.
+        maxdelay -- float seconds no single wait exceeds.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        cls._retries = max(0, int(retries))
+        cls._backoff = max(0.0, float(backoff))
+        cls._maxdelay = max(0.0, float(maxdelay))
+
+    @classmethod
+    def Retries(cls):
+        """
+        Returns the number of times a failed request is sent again.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._retries
+
+    @classmethod
+    def isRetryable(cls, response):
+        """
+        Checks whether a response shows a failure that may pass.
+
+        Argument(s):
+        response -- the requests response, or None if no response was received.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return response is None or response.status_code in cls.__RETRYSTATUS__
+
+    @classmethod
+    def getRetryAfter(cls, response):
+        """
+        Reads the Retry-After header of a 429 or 503 response given either
+        as seconds or as an HTTP date.
+
+        Argument(s):
+        response -- the requests response, or None if no response was received.
+
+        Return value(s):
+        float -- seconds the source asked to wait.
+        None -- if the source did not ask for a wait.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if response is None or response.status_code not in (429, 503):
+            return None
+        retryafter = response.headers.get('Retry-After')
+        if not retryafter:
+            return None
+        retryafter = retryafter.strip()
+        if retryafter.isdigit():
+            return float(retryafter)
+        date = parsedate_tz(retryafter)
+        if date is None:
+            return None
+        return max(0.0, mktime_tz(date) - time.time())
+
+    @classmethod
+    def getDelay(cls, attempt, response=None):
+        """
+        Returns the seconds to wait before sending a failed request again.
+
+        Argument(s):
+        attempt -- integer number of retries already made.
+        response -- the requests response, or None if no response was received.
+
+        Return value(s):
+        float.
+        None -- if the request should not be retried.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if attempt >= cls._retries:
+            return None
+        retryafter = cls.getRetryAfter(response)
+        if retryafter is not None:
+            if retryafter > cls._maxdelay:
+                return None
+            return retryafter
+        return random.uniform(0, min(cls._maxdelay, cls._backoff * (2 ** attempt)))
+
+
+class CircuitBreaker(object):
+    """
+    CircuitBreaker provides Class Methods that stop sending requests to a
+    source domain that keeps failing. After a number of consecutive failed
+    requests the breaker of the domain opens and requests fail at once
+    for a cooldown. Once the cooldown has passed one request is let
+    through as a probe: the breaker closes if it succeeds and opens for
+    another cooldown if it fails.
+
+    Public Method(s):
+    (Class Method) configure
+    (Class Method) allow
+    (Class Method) recordSuccess
+    (Class Method) recordFailure
+    (Class Method) abandonProbe
+    (Class Method) getMetrics
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _breakers = {}
+    _guard = threading.Lock()
+    _threshold = 5
+    _cooldown = 60.0
+    _opened = 0
+    _rejected = 0
+
+    class _Breaker(object):
+        __slots__ = ('failures', 'openeduntil', 'probing')
+
+        def __init__(self):
+            self.failures = 0
+            self.openeduntil = None
+            self.probing = False
+
+    @classmethod
+    def configure(cls, threshold=5, cooldown=60.0):
+        """
+        Sets when breakers open and for how long.
+
+        Argument(s):
+        threshold -- integer number of consecutive failures that open a breaker. 0 never opens one.
+        cooldown -- float seconds requests fail at once before a probe is let through.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            cls._threshold = max(0, int(threshold))
+            cls._cooldown = max(0.0, float(cooldown))
+            cls._breakers = {}
+
+    @classmethod
+    def allow(cls, url):
+        """
+        Checks whether a request may be sent to the domain of a URL.
+
+        Argument(s):
+        url -- string representing the URL a request will be sent to.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if cls._threshold == 0:
+            return True
+        domain = RateLimiter.getDomain(url)
+        with cls._guard:
+            breaker = cls._breakers.get(domain)
+            if breaker is None or breaker.openeduntil is None:
+                return True
+            if breaker.probing or time.time() < breaker.openeduntil:
+                cls._rejected += 1
+                return False
+            # half-open: let one request through to probe the source
+            breaker.probing = True
+            return True
+
+    @classmethod
+    def recordSuccess(cls, url):
+        """
+        Records that the domain of a URL answered, closing its breaker.
+
+        Argument(s):
+        url -- string representing the URL the request was sent to.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if cls._threshold == 0:
+            return
+        domain = RateLimiter.getDomain(url)
+        with cls._guard:
+            if domain in cls._breakers:
+                del cls._breakers[domain]
+
+    @classmethod
+    def recordFailure(cls, url):
+        """
+        Records that a request to the domain of a URL failed, opening its
+        breaker after enough consecutive failures or a failed probe.
+
+        Argument(s):
+        url -- string representing the URL the request was sent to.
+
+        Return value(s):
+        Boolean -- True if the breaker opened.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if cls._threshold == 0:
+            return False
+        domain = RateLimiter.getDomain(url)
+        with cls._guard:
+            breaker = cls._breakers.get(domain)
+            if breaker is None:
+                breaker = cls._Breaker()
+                cls._breakers[domain] = breaker
+            breaker.failures += 1
+            if breaker.probing or (breaker.openeduntil is None and breaker.failures >= cls._threshold):
+                breaker.probing = False
+                breaker.openeduntil = time.time() + cls._cooldown
+                cls._opened += 1
+                return True
+            return False
+
+    @classmethod
+    def abandonProbe(cls, url):
+        """
+        Records that a request to the domain of a URL ended without telling
+        whether the source answers, such as when its deadline passed first.
+        A probe it was sending is given up, so the next request after the
+        cooldown probes the source again.
+
+        Argument(s):
+        url -- string representing the URL the request was sent to.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if cls._threshold == 0:
+            return
+        domain = RateLimiter.getDomain(url)
+        with cls._guard:
+            breaker = cls._breakers.get(domain)
+            if breaker is not None:
+                breaker.probing = False
+
+    @classmethod
+    def getMetrics(cls):
+        """
+        Returns how often breakers opened, how many requests they failed at
+        once and how many breakers are open now.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict -- holding opened, rejected and open counts.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            return {'opened': cls._opened, 'rejected': cls._rejected,
+                    'open': len([b for b in cls._breakers.values() if b.openeduntil is not None])}
+
+
+class Deadline(object):
+    """
+    Deadline represents the time by which some work has to be finished.
+    The run deadline bounds a whole run, and every lookup gets its own
+    deadline that never outlasts the run deadline. The timeouts of a
+    request are shortened to the time remaining, so a request cannot
+    outlive its deadline.
+
+    Public Method(s):
+    limitTimeout
+    (Property) Remaining
+    (Property) Expired
+    (Property) RunBound
+    (Class Method) configure
+    (Class Method) forLookup
+    (Class Method) RunExpired
+
+    Instance variable(s):
+    _expires
+    _runbound
+    """
+    _lookupseconds = 0
+    _run = None
+
+    def __init__(self, seconds=0, parent=None):
+        """
+        Class constructor.
+
+        Argument(s):
+        seconds -- float seconds from now the work has to be finished in.
+        0 sets no deadline. Default is 0.
+        parent -- Deadline this deadline may not outlast. Default is None.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._expires = None
+        self._runbound = False
+        if seconds > 0:
+            self._expires = time.time() + seconds
+        if parent is not None and parent._expires is not None:
+            if self._expires is None or parent._expires <= self._expires:
+                self._expires = parent._expires
+                self._runbound = parent is Deadline._run
+
+    @classmethod
+    def configure(cls, lookupseconds=0, runseconds=0):
+        """
+        Sets the seconds each lookup may take and starts the run deadline.
+
+        Argument(s):
+        lookupseconds -- float seconds each lookup may take. 0 sets no limit.
+        runseconds -- float seconds from now the run has to be finished in. 0 sets no limit.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        cls._lookupseconds = max(0, lookupseconds)
+        cls._run = cls(max(0, runseconds))
+
+    @classmethod
+    def forLookup(cls):
+        """
+        Returns the deadline of a lookup starting now.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Deadline.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls(cls._lookupseconds, cls._run)
+
+    @classmethod
+    def RunExpired(cls):
+        """
+        Checks whether the run deadline has passed.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._run is not None and cls._run.Expired
+
+    @property
+    def Remaining(self):
+        """
+        Returns the seconds left before the deadline.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+        None -- if there is no deadline.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self._expires is None:
+            return None
+        return max(0.0, self._expires - time.time())
+
+    @property
+    def Expired(self):
+        """
+        Checks whether the deadline has passed.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._expires is not None and time.time() >= self._expires
+
+    @property
+    def RunBound(self):
+        """
+        Returns whether this deadline is the run deadline reached through a
+        lookup, so running out of time means the run itself is over.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._runbound
+
+    def limitTimeout(self, timeout):
+        """
+        Shortens request timeouts to the time left before the deadline.
+
+        Argument(s):
+        timeout -- tuple of (connect, read) float seconds.
+
+        Return value(s):
+        tuple -- (connect, read) float seconds.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        remaining = self.Remaining
+        if remaining is None:
+            return timeout
+        remaining = max(0.001, remaining)
+        return min(timeout[0], remaining), min(timeout[1], remaining)
+
+
+class ResponseReader(object):
+    """
+    ResponseReader provides Class Methods to read the body of a response
+    requested with stream=True in chunks, so no more than the most bytes
+    allowed for a source are ever held for one lookup. The chunks are
+    joined once into the content the regexs run against. Reading can
+    also stop as soon as a caller decides it has seen enough, such as
+    when every regex of a site has matched.
+
+    Public Method(s):
+    (Class Method) configure
+    (Class Method) MaxBytes
+    (Class Method) StopEarly
+    (Class Method) read
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _maxbytes = 10485760
+    _stopearly = False
+    __CHUNKSIZE__ = 65536
+    __OVERLAP__ = 4096
+
+    @classmethod
+    def configure(cls, maxbytes=10485760, stopearly=False):
+        """
+        Sets the most bytes read from a response and whether reading stops
+        once the caller has seen enough.
+
+        Argument(s):
+        maxbytes -- integer most bytes read from a source that does not declare
+        its own limit. 0 does not limit the body.
+        stopearly -- boolean representing whether reading stops once the caller
+        has seen enough.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        cls._maxbytes = max(0, int(maxbytes))
+        cls._stopearly = bool(stopearly)
+
+    @classmethod
+    def MaxBytes(cls):
+        """
+        Returns the most bytes read from a source that does not declare
+        its own limit.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- 0 if the body is not limited.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._maxbytes
+
+    @classmethod
+    def StopEarly(cls):
+        """
+        Returns whether reading stops once the caller has seen enough.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._stopearly
+
+    @classmethod
+    def read(cls, resp, maxbytes=0, finished=None, deadline=None):
+        """
+        Reads the body of a streamed response up to maxbytes or until a
+        deadline passes. The response is closed when reading stops before
+        the end of the body.
+
+        Argument(s):
+        resp -- the requests response sent with stream=True.
+        maxbytes -- integer most bytes read. 0 does not limit the body.
+        finished -- callable taking the text read last, including the end of
+        the text read before it, and returning True once reading can stop.
+        Only used when stopping early was configured. Default is None.
+        deadline -- Deadline checked between chunks. Default is None which
+        reads until the end of the body.
+
+        Return value(s):
+        tuple -- (content, reason) where reason is None if the whole body was
+        read, 'maxbytes' if it was cut at maxbytes, 'finished' if finished
+        stopped the reading and 'deadline' if the deadline passed first.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Errors raised while reading close the response and are raised again.
+        """
+        chunks = []
+        size = 0
+        tail = ''
+        reason = None
+        if not cls._stopearly:
+            finished = None
+        try:
+            for chunk in resp.iter_content(cls.__CHUNKSIZE__):
+                if maxbytes and size + len(chunk) > maxbytes:
+                    chunk = chunk[:maxbytes - size]
+                    reason = 'maxbytes'
+                chunks.append(chunk)
+                size += len(chunk)
+                if reason is not None:
+                    break
+                if deadline is not None and deadline.Expired:
+                    reason = 'deadline'
+                    break
+                if finished is not None:
+                    window = tail + chunk
+                    if finished(window):
+                        reason = 'finished'
+                        break
+                    tail = window[-cls.__OVERLAP__:]
+        except Exception:
+            resp.close()
+            raise
+        if reason is not None:
+            resp.close()
+        return ''.join(chunks), reason
+
+
+class ResponseCache(object):
+    """
+    ResponseCache provides Class Methods to store retrieved content in a
+    SQLite database on disk so repeated lookups of the same request are
+    answered locally until their time to live expires. Entries are keyed
+    by a hash of the fully expanded request.
+
+    Public Method(s):
+    (Class Method) configure
+    (Class Method) close
+    (Class Method) get
+    (Class Method) put
+    (Class Method) getCacheKey
+    (Class Method) Enabled
+    (Class Method) CacheOnly
+    (Class Method) DefaultTTL
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _connection = None
+    _guard = threading.Lock()
+    _cacheonly = False
+    _defaultttl = 3600
+    __CACHEFILE__ = 'responses.sqlite'
+
+    @classmethod
+    def configure(cls, cachedir, enabled=True, cacheonly=False, defaultttl=3600, verbose=False):
+        """
+        Opens (creating if necessary) the cache database in cachedir. If the
+        database cannot be opened the cache is disabled and a message is
+        printed.
+
+        Argument(s):
+        cachedir -- string representing the directory holding the cache.
+        enabled -- true or false representing if the cache should be used.
+        cacheonly -- true or false representing if content should only ever
+        be read from the cache and never retrieved from the network.
+        defaultttl -- integer seconds content is kept for sites that do not
+        declare a cachettl XML tag.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        cls.close()
+        cls._cacheonly = cacheonly
+        cls._defaultttl = defaultttl
+        if not enabled and not cacheonly:
+            return
+        try:
+            if not os.path.isdir(cachedir):
+                os.makedirs(cachedir)
+            connection = sqlite3.connect(os.path.join(cachedir, cls.__CACHEFILE__), check_same_thread=False)
+            connection.execute('CREATE TABLE IF NOT EXISTS responses '
+                               '(key TEXT PRIMARY KEY, content BLOB, stored REAL)')
+            connection.commit()
+        except (OSError, sqlite3.Error):
+            SiteDetailOutput.PrintStandardOutput('[-] Cannot open the response cache in {cachedir}. '
+                                                 'Continuing without a cache.'.format(cachedir=cachedir),
+                                                 verbose=verbose)
+            return
+        with cls._guard:
+            cls._connection = connection
+
+    @classmethod
+    def close(cls):
+        """
+        Closes the cache database if it is open.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            if cls._connection is not None:
+                cls._connection.close()
+                cls._connection = None
+
+    @classmethod
+    def Enabled(cls):
+        """
+        Returns True if a cache database is open.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._connection is not None
+
+    @classmethod
+    def CacheOnly(cls):
+        """
+        Returns True if content must only be read from the cache.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._cacheonly
+
+    @classmethod
+    def DefaultTTL(cls):
+        """
+        Returns the seconds content is kept for sites that do not declare
+        a cachettl XML tag.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._defaultttl
+
+    @classmethod
+    def getCacheKey(cls, requestkey):
+        """
+        Returns the hash used to store a request in the cache.
+
+        Argument(s):
+        requestkey -- tuple describing the fully expanded request.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return hashlib.sha1(repr(requestkey)).hexdigest()
+
+    @classmethod
+    def get(cls, requestkey, ttl):
+        """
+        Returns the cached content of a request if it is younger than ttl.
+
+        Argument(s):
+        requestkey -- tuple describing the fully expanded request.
+        ttl -- integer seconds the content is considered fresh.
+
+        Return value(s):
+        string -- the cached content.
+        None -- if nothing fresh is cached for the request.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if cls._connection is None or (ttl <= 0 and not cls._cacheonly):
+            return None
+        with cls._guard:
+            if cls._connection is None:
+                return None
+            row = cls._connection.execute('SELECT content, stored FROM responses WHERE key = ?',
+                                          (cls.getCacheKey(requestkey),)).fetchone()
+        if row is None:
+            return None
+        content, stored = row
+        # --cache-only answers from whatever is stored regardless of its age
+        if not cls._cacheonly and time.time() - stored > ttl:
+            return None
+        return str(content)
+
+    @classmethod
+    def put(cls, requestkey, content, ttl):
+        """
+        Stores the content of a request in the cache.
+
+        Argument(s):
+        requestkey -- tuple describing the fully expanded request.
+        content -- string content retrieved for the request.
+        ttl -- integer seconds the content is considered fresh. Nothing is
+        stored when ttl is 0 or lower.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        if cls._connection is None or ttl <= 0:
+            return
+        with cls._guard:
+            if cls._connection is None:
+                return
+            cls._connection.execute('INSERT OR REPLACE INTO responses (key, content, stored) VALUES (?, ?, ?)',
+                                    (cls.getCacheKey(requestkey), sqlite3.Binary(content), time.time()))
+            cls._connection.commit()
+
+
+class Cassette(object):
+    """
+    Cassette provides Class Methods to record the responses sources send
+    to a directory and to replay them later without contacting any
+    source, so runs can be repeated and measured on one machine with no
+    network. Each request is kept in its own JSON file named by a hash
+    of the fully expanded request.
+
+    When replaying, a profile may inject latency and errors per source
+    domain. A profile is a JSON file mapping a domain, or * for every
+    other domain, to any of:
+    latency -- float seconds every response is delayed.
+    jitter -- float most seconds added at random to the latency.
+    errorrate -- float share of requests, between 0 and 1, that fail.
+    status -- integer status the failing requests are answered with. 0
+    fails them as if the source could not be reached. Default is 503.
+    The random choices are seeded by the seed, the request and how often
+    it was sent, so a replay makes the same choices every time.
+
+    Public Method(s):
+    (Class Method) configure
+    (Class Method) Mode
+    (Class Method) getEntryFileName
+    (Class Method) getProfile
+    (Class Method) send
+    (Class Method) record
+    (Class Method) replay
+    (Class Method) buildResponse
+    (Class Method) getMetrics
+
+    Instance variable(s):
+    No instance variables.
+    """
+    RECORD = 'record'
+    REPLAY = 'replay'
+    _mode = None
+    _directory = None
+    _profiles = {}
+    _seed = 0
+    _sent = {}
+    _guard = threading.Lock()
+    _recorded = 0
+    _replayed = 0
+    _missing = 0
+    _injected = 0
+    __WIREHEADERS__ = frozenset(['content-encoding', 'content-length', 'transfer-encoding'])
+
+    @classmethod
+    def configure(cls, directory=None, mode=None, profilefile=None, seed=0):
+        """
+        Sets the directory responses are recorded to or replayed from.
+
+        Argument(s):
+        directory -- string representing the cassette directory.
+        mode -- Cassette.RECORD, Cassette.REPLAY or None which neither records
+        nor replays.
+        profilefile -- string representing the JSON file of latency and error
+        profiles used when replaying. Default is None which injects nothing.
+        seed -- integer seeding the random choices of the profiles.
+
+        Return value(s):
+        Nothing is returned from this Method.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises IOError or ValueError if the profile file cannot be read and
+        OSError if the directory cannot be created for recording.
+        """
+        profiles = {}
+        if profilefile:
+            with open(profilefile) as f:
+                profiles = json.load(f)
+            if not isinstance(profiles, dict):
+                raise ValueError(profilefile + ' does not map source domains to profiles')
+        if mode == cls.RECORD and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with cls._guard:
+            cls._mode = mode if directory else None
+            cls._directory = directory
+            cls._profiles = profiles
+            cls._seed = seed
+            cls._sent = {}
+            cls._recorded = cls._replayed = cls._missing = cls._injected = 0
+
+    @classmethod
+    def Mode(cls):
+        """
+        Returns whether responses are recorded or replayed.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- Cassette.RECORD or Cassette.REPLAY.
+        None -- if responses are neither recorded nor replayed.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls._mode
+
+    @classmethod
+    def getEntryFileName(cls, requestkey):
+        """
+        Returns the file a request is recorded in.
+
+        Argument(s):
+        requestkey -- hashable key describing the fully expanded request.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return os.path.join(cls._directory, hashlib.sha1(repr(requestkey)).hexdigest() + '.json')
+
+    @classmethod
+    def getProfile(cls, url):
+        """
+        Returns the latency and error profile of the domain of the url.
+
+        Argument(s):
+        url -- string representing the URL of the request.
+
+        Return value(s):
+        dict -- the profile of the domain, the * profile, or an empty dict.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        profile = cls._profiles.get(RateLimiter.getDomain(url))
+        if profile is None:
+            profile = cls._profiles.get('*', {})
+        return profile
+
+    @classmethod
+    def send(cls, requestkey, url, timeout, send, maxbytes=0, deadline=None):
+        """
+        Sends a request through the cassette. When recording the request is
+        sent with send and its response stored up to maxbytes. When replaying the stored
+        response is returned after the latency of the profile, or the
+        request fails as the profile asks. Otherwise send is called.
+
+        Argument(s):
+        requestkey -- hashable key describing the fully expanded request.
+        url -- string representing the URL of the request.
+        timeout -- tuple of (connect, read) float seconds of the request.
+        send -- callable taking no arguments and returning the requests response.
+        maxbytes -- integer most bytes of the response recorded. 0 records the
+        whole body. Default is 0.
+        deadline -- Deadline the body is recorded within. Default is None.
+
+        Return value(s):
+        requests response.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises requests.exceptions.ConnectionError when replaying a request
+        that was not recorded or that the profile fails, and
+        requests.exceptions.ReadTimeout when the latency is longer than
+        the read timeout.
+        """
+        if cls._mode == cls.RECORD:
+            return cls.record(requestkey, url, send(), maxbytes, deadline)
+        if cls._mode == cls.REPLAY:
+            return cls.replay(requestkey, url, timeout)
+        return send()
+
+    @classmethod
+    def record(cls, requestkey, url, resp, maxbytes=0, deadline=None):
+        """
+        Reads a streamed response with the ResponseReader, stores what was
+        read in the cassette directory and returns an equal response built
+        from it. A body cut at maxbytes is stored as read. A body the
+        deadline cut short is returned but not stored.
+
+        Argument(s):
+        requestkey -- hashable key describing the fully expanded request.
+        url -- string representing the URL of the request.
+        resp -- the requests response of the source sent with stream=True.
+        maxbytes -- integer most bytes of the body read. 0 reads the whole
+        body. Default is 0.
+        deadline -- Deadline checked between chunks of the body. Default is
+        None which reads until the end of the body.
+
+        Return value(s):
+        requests response.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        try:
+            body, reason = ResponseReader.read(resp, maxbytes, None, deadline)
+        finally:
+            resp.close()
+        # the body is stored decoded, so headers describing its encoding on the wire are dropped
+        headers = dict((name, value) for name, value in resp.headers.items()
+                       if name.lower() not in cls.__WIREHEADERS__)
+        if reason == 'deadline':
+            return cls.buildResponse(url, resp.status_code, headers, body)
+        entry = {'url': url, 'status': resp.status_code, 'headers': headers, 'body': body.decode('latin-1')}
+        filename = cls.getEntryFileName(requestkey)
+        tempfilename = '{name}.{thread}.tmp'.format(name=filename, thread=threading.current_thread().ident)
+        with open(tempfilename, 'wb') as f:
+            json.dump(entry, f)
+        os.rename(tempfilename, filename)
+        with cls._guard:
+            cls._recorded += 1
+        return cls.buildResponse(url, resp.status_code, entry['headers'], body)
+
+    @classmethod
+    def replay(cls, requestkey, url, timeout):
+        """
+        Returns the response recorded for a request, delayed and failed as
+        the profile of its domain asks.
+
+        Argument(s):
+        requestkey -- hashable key describing the fully expanded request.
+        url -- string representing the URL of the request.
+        timeout -- tuple of (connect, read) float seconds of the request.
+
+        Return value(s):
+        requests response.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        Raises requests.exceptions.ConnectionError if the request was not
+        recorded or the profile fails it, and
+        requests.exceptions.ReadTimeout when the latency is longer than the
+        read timeout.
+        """
+        filename = cls.getEntryFileName(requestkey)
+        profile = cls.getProfile(url)
+        with cls._guard:
+            sent = cls._sent.get(filename, 0)
+            cls._sent[filename] = sent + 1
+        chooser = random.Random(int(hashlib.sha1('{seed}:{name}:{sent}'.format(
+            seed=cls._seed, name=os.path.basename(filename), sent=sent)).hexdigest()[:8], 16))
+        latency = float(profile.get('latency', 0)) + chooser.uniform(0, float(profile.get('jitter', 0)))
+        if latency > timeout[1]:
+            time.sleep(timeout[1])
+            raise requests.exceptions.ReadTimeout('Replayed response of {url} timed out'.format(url=url))
+        if latency > 0:
+            time.sleep(latency)
+        if chooser.random() < float(profile.get('errorrate', 0)):
+            with cls._guard:
+                cls._injected += 1
+            status = int(profile.get('status', 503))
+            if status == 0:
+                raise requests.exceptions.ConnectionError('Injected failure for {url}'.format(url=url))
+            return cls.buildResponse(url, status, {}, '')
+        try:
+            with open(filename, 'rb') as f:
+                entry = json.load(f)
+        except (IOError, ValueError):
+            with cls._guard:
+                cls._missing += 1
+            raise requests.exceptions.ConnectionError('No recorded response for {url}'.format(url=url))
+        with cls._guard:
+            cls._replayed += 1
+        return cls.buildResponse(url, entry['status'], entry['headers'], entry['body'].encode('latin-1'))
+
+    @classmethod
+    def buildResponse(cls, url, status, headers, body):
+        """
+        Builds a requests response whose body is read from memory, so it
+        is read like a response requested with stream=True.
+
+        Argument(s):
+        url -- string representing the URL of the request.
+        status -- integer status code.
+        headers -- dict of response headers.
+        body -- string body of the response.
+
+        Return value(s):
+        requests response.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        resp = requests.models.Response()
+        resp.status_code = status
+        resp.headers = CaseInsensitiveDict(headers)
+        resp.raw = io.BytesIO(body)
+        resp.url = url
+        return resp
+
+    @classmethod
+    def getMetrics(cls):
+        """
+        Returns how many responses were recorded, replayed, missing from
+        the cassette and failed by a profile.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        dict -- recorded, replayed, missing and injected counts.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        with cls._guard:
+            return {'recorded': cls._recorded, 'replayed': cls._replayed, 'missing': cls._missing,
+                    'injected': cls._injected}
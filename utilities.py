@@ -5,7 +5,14 @@ requires.
 Class(es):
 Parser -- Class to handle standard argparse functions with
 a class-based structure.
+QueryParser -- Class to handle the argparse functions of the query command.
+ServeParser -- Class to handle the argparse functions of the serve command.
 IPWrapper -- Class to provide IP Address formatting and parsing.
+IPAddressSet -- Class to hold a compact set of IP Address ranges.
+SeenAddressSet -- Class to remember single IP Addresses in a few bytes each.
+TargetPipeline -- Class to turn raw target strings into lookup targets lazily.
+TargetSet -- Class to remember targets already seen by the pipeline.
+BloomFilter -- Class to provide a memory-bounded probabilistic set of strings.
 VersionChecker -- Class to check if modifications to any files are available
 
 Function(s):
@@ -17,8 +24,15 @@ No exceptions exported.
 import argparse
 import re
 import os
+import time
+import math
+import struct
 import hashlib
 import requests
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from outputs import SiteDetailOutput
 
 class Parser(object):
     """
@@ -33,6 +47,11 @@ class Parser(object):
     (Property) TextOutFile
     hasCSVOutSet
     (Property) CSVOutFile
+    hasJSONLOutFile
+    (Property) JSONLOutFile
+    hasJSONLMetadata
+    hasDatabase
+    (Property) Database
     (Property) Delay
     hasProxy
     (Property) Proxy
@@ -46,6 +65,36 @@ class Parser(object):
     hasPost
     (Property) InputFile
     (Property) UserAgent
+    (Property) Workers
+    (Property) PoolSize
+    (Property) Retries
+    (Property) RetryBackoff
+    (Property) BreakerThreshold
+    (Property) BreakerCooldown
+    (Property) ConnectTimeout
+    (Property) ReadTimeout
+    (Property) LookupDeadline
+    (Property) Deadline
+    (Property) CacheDir
+    (Property) CacheTTL
+    hasNoCache
+    hasCacheOnly
+    hasDryRun
+    (Property) MaxBytes
+    hasStopEarly
+    (Property) MaxExpansion
+    hasIncludeReserved
+    (Property) DedupeLimit
+    hasJournal
+    (Property) Journal
+    hasResume
+    (Property) Resume
+    hasSort
+    hasRecord
+    hasReplay
+    (Property) Cassette
+    (Property) ReplayProfile
+    (Property) ReplaySeed
 
     Instance variable(s):
     _parser
@@ -64,20 +113,52 @@ class Parser(object):
         """
         # Adding arguments
         self._parser = argparse.ArgumentParser(description=desc)
-        self._parser.add_argument('target', help='List one IP Address (CIDR or dash notation accepted), URL or Hash to query or pass the filename of a file containing IP Address info, URL or Hash to query each separated by a newline.')
+        self._parser.add_argument('target', help='List one IP Address (CIDR or dash notation accepted), URL or Hash to query or pass the filename of a file containing IP Address info, URL or Hash to query each separated by a newline. The file may be gzip compressed when its name ends in .gz and - reads the targets from stdin. Use query as the first argument to search a database written with --db (see query -h) or serve to run Automater as a local HTTP service (see serve -h).')
         self._parser.add_argument('-o', '--output', help='This option will output the results to a file.')
         self._parser.add_argument('-b', '--bot', action="store_true", help='This option will output minimized results for a bot.')
         self._parser.add_argument('-f', '--cef', help='This option will output the results to a CEF formatted file.')
         self._parser.add_argument('-w', '--web', help='This option will output the results to an HTML file.')
         self._parser.add_argument('-c', '--csv', help='This option will output the results to a CSV file.')
-        self._parser.add_argument('-d', '--delay', type=int, default=2, help='This will change the delay to the inputted seconds. Default is 2.')
+        self._parser.add_argument('--jsonl', help='This option will output one JSON record per result to a file. The file is gzip compressed when its name ends in .gz.')
+        self._parser.add_argument('--jsonl-metadata', action='store_true', help='This option adds the seconds each lookup took and whether its content came from the response cache to every JSON record. Default (no --jsonl-metadata) is False.')
+        self._parser.add_argument('--db', help='This option will store the results of the run in a SQLite database that can be searched with the query command.')
+        self._parser.add_argument('-d', '--delay', type=int, default=2, help='This will change the delay to the inputted seconds. The delay is applied between requests to the same source domain unless the site declares a ratelimit in the XML configuration file. Default is 2.')
         self._parser.add_argument('-s', '--source', help='This option will only run the target against a specific source engine to pull associated domains. Options are defined in the name attribute of the site element in the XML configuration file. This can be a list of names separated by a semicolon.')
         self._parser.add_argument('--proxy', help='This option will set a proxy to use (eg. proxy.example.com:8080)')
         self._parser.add_argument('-a', '--useragent', default='Automater/{version}'.format(version=version), help='This option allows the user to set the user-agent seen by web servers being utilized. By default, the user-agent is set to Automater/version')
         self._parser.add_argument('-V', '--vercheck', action='store_true', help='This option checks and reports versioning for Automater. Checks each python module in the Automater scope. Default, (no -V) is False')
         self._parser.add_argument('-r', '--refreshxml', action='store_true', help='This option refreshes the tekdefense.xml file from the remote GitHub site. Default (no -r) is False.')
         self._parser.add_argument('-v', '--verbose', action='store_true', help='This option prints messages to the screen. Default (no -v) is False.')
+        self._parser.add_argument('--cache-dir', default=os.path.join(os.path.expanduser('~'), '.automater'), help='This option sets the directory holding the response cache and the parsed XML configuration files. Default is ~/.automater')
+        self._parser.add_argument('--cache-ttl', type=int, default=3600, help='This option sets the seconds retrieved content is reused for sites that do not declare a cachettl in the XML configuration file. Default is 3600.')
+        self._parser.add_argument('--no-cache', action='store_true', help='This option disables the response cache. Default (no --no-cache) is False.')
+        self._parser.add_argument('--cache-only', action='store_true', help='This option only answers lookups from the response cache and never contacts a source. Default (no --cache-only) is False.')
+        self._parser.add_argument('--dry-run', action='store_true', help='This option lists the lookups that would be made without contacting any source. Default (no --dry-run) is False.')
+        self._parser.add_argument('--pool-size', type=int, default=10, help='This option sets the number of keep-alive connections kept open to each source domain. Default is 10.')
+        self._parser.add_argument('--retries', type=int, default=2, help='This option sets how many times a request that cannot connect or is answered with 429 or a 5xx status is sent again, waiting a jittered exponential backoff or the Retry-After the source asks for. Default is 2.')
+        self._parser.add_argument('--retry-backoff', type=float, default=1.0, help='This option sets the most seconds the first retry waits. Every further retry doubles it. Default is 1.')
+        self._parser.add_argument('--breaker-threshold', type=int, default=5, help='This option sets how many requests to a source domain must fail in a row before its requests fail at once for a cooldown. 0 never stops requests. Default is 5.')
+        self._parser.add_argument('--breaker-cooldown', type=int, default=60, help='This option sets the seconds requests to a failing source domain fail at once before one request is let through to probe it. Default is 60.')
+        self._parser.add_argument('--connect-timeout', type=float, default=5, help='This option sets the seconds every GET and POST request waits to connect to a source. Default is 5.')
+        self._parser.add_argument('--read-timeout', type=float, default=5, help='This option sets the seconds every GET and POST request waits between bytes of the answer of a source. Default is 5.')
+        self._parser.add_argument('--lookup-deadline', type=float, default=0, help='This option sets the seconds each lookup may take including its retries. Requests are cut short once they are passed. 0 does not limit a lookup. Default is 0.')
+        self._parser.add_argument('--deadline', type=float, default=0, help='This option sets the seconds the whole run may take. Lookups still outstanding once they are passed are cancelled and the results retrieved so far are written. 0 does not limit the run. Default is 0.')
+        self._parser.add_argument('--workers', type=int, default=1, help='This option sets the number of site lookups that will run at the same time. Requests to a single source are still separated by the delay. Default is 1.')
+        self._parser.add_argument('--max-bytes', type=int, default=10485760, help='This option sets the most bytes read from each answer of a source that does not declare a maxbytes in the XML configuration file. 0 reads every answer whole. Default is 10485760.')
+        self._parser.add_argument('--stop-early', action='store_true', help='This option stops reading the answer of a source once every regex of the site has matched, so later matches in the rest of the answer are not reported. Default (no --stop-early) is False.')
+        self._parser.add_argument('--max-expansion', type=int, default=65536, help='This option sets the most addresses a single CIDR or dash range expands to. 0 does not limit the expansion. Default is 65536.')
+        self._parser.add_argument('--include-reserved', action='store_true', help='This option keeps private, loopback, multicast and other reserved addresses when a range is expanded. Default (no --include-reserved) is False.')
+        self._parser.add_argument('--dedupe-limit', type=int, default=1000000, help='This option sets how many unique targets are remembered exactly before duplicates are found with a probabilistic filter that uses less memory. IP Addresses are always remembered exactly and are not counted. Default is 1000000.')
+        self._parser.add_argument('--journal', help='This option appends every completed lookup and its results to the file named so an interrupted run can be resumed with --resume.')
+        self._parser.add_argument('--resume', help='This option restores the lookups completed in the journal file named instead of running them again and appends new lookups to the same file unless --journal names another.')
+        self._parser.add_argument('--sort', action='store_true', help='This option writes the outputs sorted by target once every lookup has completed instead of writing each result as soon as its lookup completes. Default (no --sort) is False.')
+        self._parser.add_argument('--record', help='This option records every answer of a source to the cassette directory named so the run can be replayed with --replay. Answers are recorded up to the most bytes read from the source. The response cache is not used.')
+        self._parser.add_argument('--replay', help='This option answers every request from the cassette directory named instead of contacting any source. The response cache is not used.')
+        self._parser.add_argument('--replay-profile', help='This option injects the latency and errors declared per source domain in the JSON file named into a --replay run.')
+        self._parser.add_argument('--replay-seed', type=int, default=0, help='This option seeds the random latency and errors of --replay-profile. Default is 0.')
         self.args = self._parser.parse_args()
+        if self.args.record and self.args.replay:
+            self._parser.error('--record and --replay cannot be used together')
 
     def hasBotOut(self):
         """
@@ -368,6 +449,108 @@ class Parser(object):
         else:
             return None
 
+    def hasJSONLOutFile(self):
+        """
+        Checks to determine if user requested an output file of JSON records.
+        Returns True if user requested file output, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.jsonl:
+            return True
+        else:
+            return False
+
+    @property
+    def JSONLOutFile(self):
+        """
+        Checks if there is a JSON records output requested.
+        Returns string name of JSON records output file if requested
+        or None if not requested.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- Name of a JSON records file to write to system.
+        None -- if JSON records output was not requested.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.hasJSONLOutFile():
+            return self.args.jsonl
+        else:
+            return None
+
+    def hasJSONLMetadata(self):
+        """
+        Checks to determine if the user requested lookup timing and cache
+        metadata in the JSON records.
+        Returns True if the metadata is requested, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.jsonl_metadata:
+            return True
+        else:
+            return False
+
+    def hasDatabase(self):
+        """
+        Checks to determine if user requested the results stored in a SQLite database.
+        Returns True if user requested the database, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.db:
+            return True
+        else:
+            return False
+
+    @property
+    def Database(self):
+        """
+        Checks if the results are stored in a SQLite database.
+        Returns string name of the database file if requested
+        or None if not requested.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- Name of a SQLite database file to write to system.
+        None -- if the database was not requested.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.hasDatabase():
+            return self.args.db
+        else:
+            return None
+
     @property
     def Delay(self):
         """
@@ -498,7 +681,7 @@ class Parser(object):
     def hasInputFile(self):
         """
         Checks to determine if input file is the target of the program.
-        Returns True if a target is an input file, False if not.
+        Returns True if a target is an input file or - for stdin, False if not.
 
         Argument(s):
         No arguments are required.
@@ -509,6 +692,8 @@ class Parser(object):
         Restriction(s):
         The Method has no restrictions.
         """
+        if self.args.target == '-':
+            return True
         if os.path.exists(self.args.target) and os.path.isfile(self.args.target):
             return True
         else:
@@ -596,84 +781,1932 @@ class Parser(object):
         """
         return self.args.useragent
 
-class IPWrapper(object):
-    """
-    IPWrapper provides Class Methods to enable checks
-    against strings to determine if the string is an IP Address
-    or an IP Address in CIDR or dash notation.
+    @property
+    def Workers(self):
+        """
+        Returns the number of site lookups that can run concurrently. Values
+        lower than 1 are treated as 1 which runs every lookup serially.
 
-    Public Method(s):
-    (Class Method) isIPorIPList
-    (Class Method) getTarget
+        Argument(s):
+        No arguments are required.
 
-    Instance variable(s):
-    No instance variables.
-    """
+        Return value(s):
+        integer -- Number of worker threads used for site lookups.
 
-    @classmethod
-    def isIPorIPList(cls, target):
+        Restriction(s):
+        This Method is tagged as a Property.
         """
-        Checks if an input string is an IP Address or if it is
-        an IP Address in CIDR or dash notation.
-        Returns True if IP Address or CIDR/dash. Returns False if not.
+        if self.args.workers < 1:
+            return 1
+        return self.args.workers
+
+    @property
+    def PoolSize(self):
+        """
+        Returns the number of keep-alive connections kept open to each
+        source domain.
 
         Argument(s):
-        target -- string target provided as the first argument to the program.
+        No arguments are required.
+
+        Return value(s):
+        integer -- Connections pooled per source domain. Minimum of 1.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.args.pool_size < 1:
+            return 1
+        return self.args.pool_size
+
+    @property
+    def Retries(self):
+        """
+        Returns how many times a failed request is sent again.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- Retries per request. Minimum of 0.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.retries)
+
+    @property
+    def RetryBackoff(self):
+        """
+        Returns the most seconds the first retry of a request waits.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.0, self.args.retry_backoff)
+
+    @property
+    def BreakerThreshold(self):
+        """
+        Returns how many requests to a source domain must fail in a row
+        before its requests fail at once.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- 0 if requests are never stopped.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.breaker_threshold)
+
+    @property
+    def BreakerCooldown(self):
+        """
+        Returns the seconds requests to a failing source domain fail at once.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.breaker_cooldown)
+
+    @property
+    def ConnectTimeout(self):
+        """
+        Returns the seconds every request waits to connect to a source.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.001, self.args.connect_timeout)
+
+    @property
+    def ReadTimeout(self):
+        """
+        Returns the seconds every request waits between bytes of an answer.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.001, self.args.read_timeout)
+
+    @property
+    def LookupDeadline(self):
+        """
+        Returns the seconds each lookup may take.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float -- 0 if a lookup is not limited.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.0, self.args.lookup_deadline)
+
+    @property
+    def Deadline(self):
+        """
+        Returns the seconds the whole run may take.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float -- 0 if the run is not limited.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.0, self.args.deadline)
+
+    @property
+    def CacheDir(self):
+        """
+        Returns the directory holding the response cache.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- Directory used for the response cache.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.cache_dir
+
+    @property
+    def CacheTTL(self):
+        """
+        Returns the seconds retrieved content is reused for sites that do not
+        declare a cachettl in the XML configuration file.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- Seconds content is kept in the response cache.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.cache_ttl
+
+    def hasNoCache(self):
+        """
+        Checks to determine if the user disabled the response cache.
+        Returns True if the cache should not be used, False if not.
+
+        Argument(s):
+        No arguments are required.
 
         Return value(s):
         Boolean.
 
         Restriction(s):
-        This Method is tagged as a Class Method
+        The Method has no restrictions.
         """
-        # IP Address range using prefix syntax
-        #ipRangePrefix = re.compile('\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\/\d{1,2}')
-        #ipRgeFind = re.findall(ipRangePrefix, target)
-        #if ipRgeFind is not None or len(ipRgeFind) != 0:
-        #    return True
-        ipRangeDash = re.compile('\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}-\d{1,3}')
-        ipRgeDashFind = re.findall(ipRangeDash,target)
-        if ipRgeDashFind is not None or len(ipRgeDashFind) != 0:
-            return True
-        ipAddress = re.compile('\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
-        ipFind = re.findall(ipAddress, target)
-        if ipFind is not None and len(ipFind) != 0:
+        if self.args.no_cache:
             return True
+        else:
+            return False
 
-        return False
-
-    @classmethod
-    def getTarget(cls, target):
+    def hasCacheOnly(self):
         """
-        Determines whether the target provided is an IP Address or
-        an IP Address in dash notation. Then creates a list
-        that can be utilized as targets by the program.
-        Returns a list of string IP Addresses that can be used as targets.
+        Checks to determine if the user only wants lookups answered from
+        the response cache. Returns True if sources must not be contacted.
 
         Argument(s):
-        target -- string target provided as the first argument to the program.
+        No arguments are required.
 
         Return value(s):
-        Iterator of string(s) representing IP Addresses.
+        Boolean.
 
         Restriction(s):
-        This Method is tagged as a Class Method
+        The Method has no restrictions.
         """
-        # IP Address range using prefix syntax
-        ipRangeDash = re.compile('\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}-\d{1,3}')
-        ipRgeDashFind = re.findall(ipRangeDash, target)
-        # IP Address range seperated with a dash
-        if ipRgeDashFind is not None and len(ipRgeDashFind) > 0:
-            iplist = target[:target.index("-")].split(".")
-            iplast = target[target.index("-") + 1:]
-            if int(iplist[3]) < int(iplast):
-                for lastoctet in xrange(int(iplist[3]), int(iplast) + 1):
-                    yield target[:target.rindex(".") + 1] + str(lastoctet)
-            else:
-                yield target[:target.rindex(".") + 1] + str(iplist[3])
-        # it's just an IP address at this point
+        if self.args.cache_only:
+            return True
         else:
-            yield target
+            return False
+
+    def hasDryRun(self):
+        """
+        Checks to determine if the user only wants to list the planned lookups.
+        Returns True if no source should be contacted, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.dry_run:
+            return True
+        else:
+            return False
+
+    @property
+    def MaxBytes(self):
+        """
+        Returns the most bytes read from each answer of a source that does
+        not declare its own limit.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- 0 if answers are read whole.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.max_bytes)
+
+    def hasStopEarly(self):
+        """
+        Checks to determine if the user wants reading to stop once every
+        regex of a site has matched.
+        Returns True if reading stops early, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.stop_early:
+            return True
+        else:
+            return False
+
+    @property
+    def MaxExpansion(self):
+        """
+        Returns the most addresses a single IP Address range expands to.
+        Values lower than 1 mean the expansion is not limited and are
+        returned as 0.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- Number of addresses.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.args.max_expansion < 1:
+            return 0
+        return self.args.max_expansion
+
+    def hasIncludeReserved(self):
+        """
+        Checks to determine if reserved addresses are kept when a range is expanded.
+        Returns True if reserved addresses should be looked up, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.include_reserved:
+            return True
+        else:
+            return False
+
+    @property
+    def DedupeLimit(self):
+        """
+        Returns how many unique targets other than IP Addresses are
+        remembered exactly before duplicates are found with a
+        probabilistic filter.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- Number of targets.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.dedupe_limit)
+
+    def hasJournal(self):
+        """
+        Checks to determine if the user requested a journal of completed lookups.
+        Returns True if a journal file was named, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.journal:
+            return True
+        else:
+            return False
+
+    @property
+    def Journal(self):
+        """
+        Checks if the user named a journal file.
+        Returns string representing the journal file or None.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- name of the journal file.
+        None -- if no journal file was named.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.hasJournal():
+            return self.args.journal
+        else:
+            return None
+
+    def hasResume(self):
+        """
+        Checks to determine if the user requested to resume from a journal.
+        Returns True if a journal file to resume from was named, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.resume:
+            return True
+        else:
+            return False
+
+    @property
+    def Resume(self):
+        """
+        Checks if the user named a journal file to resume from.
+        Returns string representing the journal file or None.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- name of the journal file.
+        None -- if no journal file was named.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.hasResume():
+            return self.args.resume
+        else:
+            return None
+
+    def hasSort(self):
+        """
+        Checks to determine if the user requested outputs sorted by target.
+        Returns True if the outputs are written once every lookup has completed, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.sort:
+            return True
+        else:
+            return False
+
+    def hasRecord(self):
+        """
+        Checks to determine if the user wants the answers of the sources recorded.
+        Returns True if a cassette directory was named for recording, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.record:
+            return True
+        else:
+            return False
+
+    def hasReplay(self):
+        """
+        Checks to determine if the user wants requests answered from a cassette.
+        Returns True if a cassette directory was named for replaying, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.replay:
+            return True
+        else:
+            return False
+
+    @property
+    def Cassette(self):
+        """
+        Checks if the user named a cassette directory to record to or replay from.
+        Returns string representing the cassette directory or None.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- name of the cassette directory.
+        None -- if no cassette directory was named.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.record or self.args.replay
+
+    @property
+    def ReplayProfile(self):
+        """
+        Checks if the user named a file of latency and error profiles.
+        Returns string representing the profile file or None.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string -- name of the profile file.
+        None -- if no profile file was named.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.replay_profile
+
+    @property
+    def ReplaySeed(self):
+        """
+        Returns the seed of the random latency and errors of a replay.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.replay_seed
+
+class QueryParser(object):
+    """
+    QueryParser represents an argparse object representing the
+    input parameters of the query command, which searches the
+    results stored by earlier runs with --db.
+
+    Public Method(s):
+    (Property) Database
+    (Property) Target
+    (Property) Source
+    (Property) Since
+    (Property) Run
+    (Property) Limit
+    hasRuns
+    hasDiff
+    (Property) Diff
+
+    Instance variable(s):
+    _parser
+    args
+    """
+
+    def __init__(self, desc, arguments):
+        """
+        Class constructor. Adds the argparse info into the instance variables.
+
+        Argument(s):
+        desc -- ArgumentParser description.
+        arguments -- list of the arguments following the query command.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._parser = argparse.ArgumentParser(prog='Automater.py query', description=desc)
+        self._parser.add_argument('database', help='The SQLite database file written with --db.')
+        self._parser.add_argument('-t', '--target', help='This option only lists results for the target.')
+        self._parser.add_argument('-s', '--source', help='This option only lists results from the source named by its friendly name.')
+        self._parser.add_argument('--since', help='This option only lists results stored on or after the date given as YYYY-MM-DD.')
+        self._parser.add_argument('--run', type=int, help='This option only lists results stored by the run numbered.')
+        self._parser.add_argument('--limit', type=int, default=0, help='This option sets the most results listed. 0 lists every result. Default is 0.')
+        self._parser.add_argument('--runs', action='store_true', help='This option lists the runs stored instead of results. Default (no --runs) is False.')
+        self._parser.add_argument('--diff', type=int, nargs=2, metavar=('OLDRUN', 'NEWRUN'), help='This option lists the values found by only one of the two runs numbered. --target and --source narrow the comparison.')
+        self.args = self._parser.parse_args(arguments)
+
+    @property
+    def Database(self):
+        """
+        Returns the name of the SQLite database file to search.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.database
+
+    @property
+    def Target(self):
+        """
+        Returns the target the results must belong to.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if every target is listed.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.target
+
+    @property
+    def Source(self):
+        """
+        Returns the friendly name of the source the results must come from.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if every source is listed.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.source
+
+    @property
+    def Since(self):
+        """
+        Returns the start of the date results must be stored on or after
+        as seconds since the epoch. Exits with a message if the date is
+        not given as YYYY-MM-DD.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+        None -- if no date was given.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if not self.args.since:
+            return None
+        try:
+            return time.mktime(datetime.strptime(self.args.since, '%Y-%m-%d').timetuple())
+        except ValueError:
+            self._parser.error('--since must be a date given as YYYY-MM-DD')
+
+    @property
+    def Run(self):
+        """
+        Returns the number of the run the results must be stored by.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+        None -- if every run is listed.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.run
+
+    @property
+    def Limit(self):
+        """
+        Returns the most results listed. 0 lists every result.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.limit
+
+    def hasRuns(self):
+        """
+        Checks to determine if the user requested the list of runs.
+        Returns True if the runs are listed, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.runs:
+            return True
+        else:
+            return False
+
+    def hasDiff(self):
+        """
+        Checks to determine if the user requested two runs compared.
+        Returns True if two runs are compared, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.diff:
+            return True
+        else:
+            return False
+
+    @property
+    def Diff(self):
+        """
+        Returns the numbers of the two runs compared.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        tuple -- (oldrun, newrun).
+        None -- if no runs are compared.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.hasDiff():
+            return tuple(self.args.diff)
+        else:
+            return None
+
+class ServeParser(object):
+    """
+    ServeParser represents an argparse object representing the
+    input parameters of the serve command, which runs Automater
+    as a long-running local HTTP service.
+
+    Public Method(s):
+    (Property) Host
+    (Property) Port
+    hasSocket
+    (Property) Socket
+    (Property) Workers
+    (Property) Delay
+    (Property) Proxy
+    (Property) UserAgent
+    (Property) CacheDir
+    (Property) CacheTTL
+    hasNoCache
+    (Property) PoolSize
+    (Property) Retries
+    (Property) RetryBackoff
+    (Property) BreakerThreshold
+    (Property) BreakerCooldown
+    (Property) ConnectTimeout
+    (Property) ReadTimeout
+    (Property) LookupDeadline
+    (Property) MaxBytes
+    (Property) MaxExpansion
+    hasIncludeReserved
+    (Property) Verbose
+
+    Instance variable(s):
+    _parser
+    args
+    """
+
+    def __init__(self, desc, version, arguments):
+        """
+        Class constructor. Adds the argparse info into the instance variables.
+
+        Argument(s):
+        desc -- ArgumentParser description.
+        version -- string representing the version of Automater.
+        arguments -- list of the arguments following the serve command.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._parser = argparse.ArgumentParser(prog='Automater.py serve', description=desc)
+        self._parser.add_argument('--host', default='127.0.0.1', help='This option sets the address the service listens on. Default is 127.0.0.1.')
+        self._parser.add_argument('--port', type=int, default=8770, help='This option sets the port the service listens on. Default is 8770.')
+        self._parser.add_argument('--socket', help='This option listens on the Unix socket named instead of a TCP port.')
+        self._parser.add_argument('--workers', type=int, default=4, help='This option sets the number of site lookups of one request that will run at the same time. Default is 4.')
+        self._parser.add_argument('-d', '--delay', type=int, default=2, help='This will change the delay to the inputted seconds. The delay is applied between requests to the same source domain unless the site declares a ratelimit in the XML configuration file. Default is 2.')
+        self._parser.add_argument('--proxy', help='This option will set a proxy to use (eg. proxy.example.com:8080)')
+        self._parser.add_argument('-a', '--useragent', default='Automater/{version}'.format(version=version), help='This option allows the user to set the user-agent seen by web servers being utilized. By default, the user-agent is set to Automater/version')
+        self._parser.add_argument('--cache-dir', default=os.path.join(os.path.expanduser('~'), '.automater'), help='This option sets the directory holding the response cache and the parsed XML configuration files. Default is ~/.automater')
+        self._parser.add_argument('--cache-ttl', type=int, default=3600, help='This option sets the seconds retrieved content is reused for sites that do not declare a cachettl in the XML configuration file. Default is 3600.')
+        self._parser.add_argument('--no-cache', action='store_true', help='This option disables the response cache. Default (no --no-cache) is False.')
+        self._parser.add_argument('--pool-size', type=int, default=10, help='This option sets the number of keep-alive connections kept open to each source domain. Default is 10.')
+        self._parser.add_argument('--retries', type=int, default=2, help='This option sets how many times a request that cannot connect or is answered with 429 or a 5xx status is sent again, waiting a jittered exponential backoff or the Retry-After the source asks for. Default is 2.')
+        self._parser.add_argument('--retry-backoff', type=float, default=1.0, help='This option sets the most seconds the first retry waits. Every further retry doubles it. Default is 1.')
+        self._parser.add_argument('--breaker-threshold', type=int, default=5, help='This option sets how many requests to a source domain must fail in a row before its requests fail at once for a cooldown. 0 never stops requests. Default is 5.')
+        self._parser.add_argument('--breaker-cooldown', type=int, default=60, help='This option sets the seconds requests to a failing source domain fail at once before one request is let through to probe it. Default is 60.')
+        self._parser.add_argument('--connect-timeout', type=float, default=5, help='This option sets the seconds every GET and POST request waits to connect to a source. Default is 5.')
+        self._parser.add_argument('--read-timeout', type=float, default=5, help='This option sets the seconds every GET and POST request waits between bytes of the answer of a source. Default is 5.')
+        self._parser.add_argument('--lookup-deadline', type=float, default=0, help='This option sets the seconds each lookup may take including its retries. Requests are cut short once they are passed. 0 does not limit a lookup. Default is 0.')
+        self._parser.add_argument('--max-bytes', type=int, default=10485760, help='This option sets the most bytes read from each answer of a source that does not declare a maxbytes in the XML configuration file. 0 reads every answer whole. Default is 10485760.')
+        self._parser.add_argument('--max-expansion', type=int, default=65536, help='This option sets the most addresses a single CIDR or dash range expands to. 0 does not limit the expansion. Default is 65536.')
+        self._parser.add_argument('--include-reserved', action='store_true', help='This option keeps private, loopback, multicast and other reserved addresses when a range is expanded. Default (no --include-reserved) is False.')
+        self._parser.add_argument('-v', '--verbose', action='store_true', help='This option prints messages and every request to the screen. Default (no -v) is False.')
+        self.args = self._parser.parse_args(arguments)
+
+    @property
+    def Host(self):
+        """
+        Returns the address the service listens on.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.host
+
+    @property
+    def Port(self):
+        """
+        Returns the port the service listens on.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.port
+
+    def hasSocket(self):
+        """
+        Checks to determine if the user requested a Unix socket.
+        Returns True if the service listens on a Unix socket, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.socket:
+            return True
+        else:
+            return False
+
+    @property
+    def Socket(self):
+        """
+        Returns the path of the Unix socket the service listens on.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if the service listens on a TCP port.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        if self.hasSocket():
+            return self.args.socket
+        else:
+            return None
+
+    @property
+    def Workers(self):
+        """
+        Returns the number of site lookups of one request that may run at the same time.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(1, self.args.workers)
+
+    @property
+    def Delay(self):
+        """
+        Returns the delay between requests to the same source domain.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.delay
+
+    @property
+    def Proxy(self):
+        """
+        Returns the proxy requests are sent through.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+        None -- if no proxy was given.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.proxy
+
+    @property
+    def UserAgent(self):
+        """
+        Returns the user-agent string sent to the sources.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.useragent
+
+    @property
+    def CacheDir(self):
+        """
+        Returns the directory holding the response cache and the parsed XML configuration files.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.cache_dir
+
+    @property
+    def CacheTTL(self):
+        """
+        Returns the seconds retrieved content is reused.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.cache_ttl
+
+    def hasNoCache(self):
+        """
+        Checks to determine if the user disabled the response cache.
+        Returns True if the response cache is disabled, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.no_cache:
+            return True
+        else:
+            return False
+
+    @property
+    def PoolSize(self):
+        """
+        Returns the number of keep-alive connections kept open to each source domain.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.pool_size
+
+    @property
+    def Retries(self):
+        """
+        Returns how many times a failed request is sent again.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- Retries per request. Minimum of 0.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.retries)
+
+    @property
+    def RetryBackoff(self):
+        """
+        Returns the most seconds the first retry of a request waits.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.0, self.args.retry_backoff)
+
+    @property
+    def BreakerThreshold(self):
+        """
+        Returns how many requests to a source domain must fail in a row
+        before its requests fail at once.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- 0 if requests are never stopped.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.breaker_threshold)
+
+    @property
+    def BreakerCooldown(self):
+        """
+        Returns the seconds requests to a failing source domain fail at once.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.breaker_cooldown)
+
+    @property
+    def ConnectTimeout(self):
+        """
+        Returns the seconds every request waits to connect to a source.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.001, self.args.connect_timeout)
+
+    @property
+    def ReadTimeout(self):
+        """
+        Returns the seconds every request waits between bytes of an answer.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.001, self.args.read_timeout)
+
+    @property
+    def LookupDeadline(self):
+        """
+        Returns the seconds each lookup may take.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        float -- 0 if a lookup is not limited.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0.0, self.args.lookup_deadline)
+
+    @property
+    def MaxBytes(self):
+        """
+        Returns the most bytes read from each answer of a source that does
+        not declare its own limit.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer -- 0 if answers are read whole.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return max(0, self.args.max_bytes)
+
+    @property
+    def MaxExpansion(self):
+        """
+        Returns the most addresses a single range expands to. 0 does not limit the expansion.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.max_expansion
+
+    def hasIncludeReserved(self):
+        """
+        Checks to determine if reserved addresses are kept when a range is expanded.
+        Returns True if reserved addresses should be looked up, False if not.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if self.args.include_reserved:
+            return True
+        else:
+            return False
+
+    @property
+    def Verbose(self):
+        """
+        Returns whether messages are printed to the screen.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self.args.verbose
+
+class IPWrapper(object):
+    """
+    IPWrapper provides Class Methods to enable checks
+    against strings to determine if the string is an IP Address
+    or an IP Address in CIDR or dash notation, and to expand those
+    ranges. Ranges are handled as integer start and end addresses and
+    expanded lazily, so a large range is never held as a list of strings.
+
+    Public Method(s):
+    (Class Method) isIPorIPList
+    (Class Method) getTarget
+    (Class Method) getRange
+    (Class Method) addressToInt
+    (Class Method) intToAddress
+
+    Instance variable(s):
+    No instance variables.
+    """
+    _ipaddress = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$')
+    _iprangeprefix = re.compile(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})/(\d{1,2})$')
+    _iprangefull = re.compile(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})-(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})$')
+    _iprangedash = re.compile(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.)(\d{1,3})-(\d{1,3})$')
+    # special purpose IPv4 blocks that public sources hold nothing useful for
+    _reservedranges = ('0.0.0.0/8', '10.0.0.0/8', '100.64.0.0/10', '127.0.0.0/8', '169.254.0.0/16',
+                       '172.16.0.0/12', '192.0.0.0/24', '192.0.2.0/24', '192.88.99.0/24', '192.168.0.0/16',
+                       '198.18.0.0/15', '198.51.100.0/24', '203.0.113.0/24', '224.0.0.0/4', '240.0.0.0/4')
+    _reserved = None
+
+    @classmethod
+    def isIPorIPList(cls, target):
+        """
+        Checks if an input string is an IP Address or if it is
+        an IP Address in CIDR or dash notation.
+        Returns True if IP Address or CIDR/dash. Returns False if not.
+
+        Argument(s):
+        target -- string target provided as the first argument to the program.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls.getRange(target) is not None or cls.addressToInt(target) is not None
+
+    @classmethod
+    def getTarget(cls, target, maxexpansion=0, excludereserved=False):
+        """
+        Determines whether the target provided is an IP Address or
+        an IP Address in CIDR or dash notation. Then creates a list
+        that can be utilized as targets by the program. Dash notation
+        may give the last octet (1.2.3.4-10) or a full end address
+        (1.2.3.4-1.2.4.10).
+        Returns a list of string IP Addresses that can be used as targets.
+
+        Argument(s):
+        target -- string target provided as the first argument to the program.
+        maxexpansion -- integer representing the most addresses a single range
+        expands to. The first addresses are kept and a message is printed.
+        Default is 0 which does not limit the expansion.
+        excludereserved -- true or false representing if private, loopback,
+        multicast and other special purpose addresses are left out of a
+        range. A message says how many were left out. Default is False.
+
+        Return value(s):
+        Iterator of string(s) representing IP Addresses.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        addressrange = cls.getRange(target)
+        # it's just an IP address at this point
+        if addressrange is None or addressrange[0] >= addressrange[1]:
+            if addressrange is not None:
+                target = cls.intToAddress(addressrange[0])
+            yield target
+            return
+
+        start, end = addressrange
+        if excludereserved:
+            if cls._reserved is None:
+                cls._reserved = IPAddressSet.fromCIDRs(cls._reservedranges)
+            intervals = list(cls._reserved.subtract(start, end))
+            excluded = end - start + 1 - sum(last - first + 1 for first, last in intervals)
+            if not intervals:
+                SiteDetailOutput.PrintStandardOutput('[-] Every address of {target} is reserved and was left out. Use '
+                                                     '--include-reserved to look them up.'.format(target=target))
+                return
+            if excluded:
+                SiteDetailOutput.PrintStandardOutput('[-] {count} reserved addresses of {target} were left out. Use '
+                                                     '--include-reserved to look them up.'.format(count=excluded,
+                                                                                                 target=target))
+        else:
+            intervals = [(start, end)]
+
+        if maxexpansion > 0 and sum(last - first + 1 for first, last in intervals) > maxexpansion:
+            SiteDetailOutput.PrintStandardOutput('[-] {target} expands to more than {cap} addresses. Only the first '
+                                                 '{cap} will be used.'.format(target=target, cap=maxexpansion))
+            remaining = maxexpansion
+            capped = []
+            for first, last in intervals:
+                if remaining <= 0:
+                    break
+                last = min(last, first + remaining - 1)
+                capped.append((first, last))
+                remaining -= last - first + 1
+            intervals = capped
+
+        for first, last in intervals:
+            for address in xrange(first, last + 1):
+                yield cls.intToAddress(address)
+
+    @classmethod
+    def getRange(cls, target):
+        """
+        Returns the first and last address of an IP Address range in CIDR
+        or dash notation as integers, or None if the target is not a range.
+
+        Argument(s):
+        target -- string target provided as the first argument to the program.
+
+        Return value(s):
+        tuple -- (integer, integer).
+        None -- if the target is not a valid range.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        prefixfind = cls._iprangeprefix.match(target)
+        if prefixfind:
+            network = cls.addressToInt(prefixfind.group(1))
+            prefix = int(prefixfind.group(2))
+            if network is None or prefix > 32:
+                return None
+            hostmask = (1 << (32 - prefix)) - 1
+            return network & ~hostmask & 0xFFFFFFFF, network | hostmask
+        fullfind = cls._iprangefull.match(target)
+        if fullfind:
+            start = cls.addressToInt(fullfind.group(1))
+            end = cls.addressToInt(fullfind.group(2))
+            if start is None or end is None:
+                return None
+            return start, end
+        dashfind = cls._iprangedash.match(target)
+        if dashfind:
+            start = cls.addressToInt(dashfind.group(1) + dashfind.group(2))
+            end = cls.addressToInt(dashfind.group(1) + dashfind.group(3))
+            if start is None or end is None:
+                return None
+            return start, end
+        return None
+
+    @classmethod
+    def addressToInt(cls, address):
+        """
+        Returns the integer value of a dotted IP Address or None if the
+        string is not a valid IP Address.
+
+        Argument(s):
+        address -- string representing an IP Address.
+
+        Return value(s):
+        integer.
+        None -- if the string is not a valid IP Address.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        addressfind = cls._ipaddress.match(address)
+        if not addressfind:
+            return None
+        value = 0
+        for octet in addressfind.groups():
+            octet = int(octet)
+            if octet > 255:
+                return None
+            value = (value << 8) | octet
+        return value
+
+    @classmethod
+    def intToAddress(cls, value):
+        """
+        Returns the dotted IP Address of an integer value.
+
+        Argument(s):
+        value -- integer between 0 and 4294967295.
+
+        Return value(s):
+        string.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return '{0}.{1}.{2}.{3}'.format(value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+
+
+class IPAddressSet(object):
+    """
+    IPAddressSet is a compact, immutable set of IP Addresses held as
+    sorted, merged integer ranges in two arrays rather than one object
+    per address. Membership is checked with a binary search and ranges
+    can be subtracted without visiting every address.
+
+    Public Method(s):
+    (Class Method) fromCIDRs
+    subtract
+    (Property) Ranges
+
+    Instance variable(s):
+    _starts
+    _ends
+    """
+
+    def __init__(self, ranges):
+        """
+        Class constructor. Sorts and merges the ranges into the arrays.
+
+        Argument(s):
+        ranges -- iterable of (integer, integer) first and last addresses.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._starts = array('L')
+        self._ends = array('L')
+        for start, end in sorted(ranges):
+            if len(self._ends) and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    @classmethod
+    def fromCIDRs(cls, cidrs):
+        """
+        Builds an IPAddressSet from IP Address ranges in CIDR notation.
+
+        Argument(s):
+        cidrs -- iterable of strings in CIDR notation.
+
+        Return value(s):
+        IPAddressSet object.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls(IPWrapper.getRange(cidr) for cidr in cidrs)
+
+    @property
+    def Ranges(self):
+        """
+        Returns the merged ranges held by the set.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        list -- of (integer, integer) first and last addresses.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return zip(self._starts, self._ends)
+
+    def __contains__(self, address):
+        index = bisect_right(self._starts, address) - 1
+        return index >= 0 and address <= self._ends[index]
+
+    def __len__(self):
+        return int(sum(end - start + 1 for start, end in zip(self._starts, self._ends)))
+
+    def subtract(self, start, end):
+        """
+        Yields the parts of a range that are not in the set.
+
+        Argument(s):
+        start -- integer representing the first address of the range.
+        end -- integer representing the last address of the range.
+
+        Return value(s):
+        Iterator of (integer, integer) first and last addresses.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        index = max(0, bisect_right(self._starts, start) - 1)
+        while start <= end and index < len(self._starts):
+            if self._ends[index] < start:
+                index += 1
+                continue
+            if self._starts[index] > end:
+                break
+            if self._starts[index] > start:
+                yield start, self._starts[index] - 1
+            start = self._ends[index] + 1
+            index += 1
+        if start <= end:
+            yield start, end
+
+
+class SeenAddressSet(object):
+    """
+    SeenAddressSet is a compact set of IP Addresses that grows one address
+    at a time. Addresses are held as integers split by their first two
+    octets: each /16 keeps the last two octets in a sorted array of
+    2 byte values, turned into an 8192 byte bitmap once it would be
+    larger, so a full /16 costs 8 KB instead of 65536 strings.
+
+    Public Method(s):
+    add
+
+    Instance variable(s):
+    _buckets
+    _count
+    """
+    # entries of a /16 kept as an array before it becomes a bitmap of the same bytes
+    __BITMAPAT__ = 4096
+
+    def __init__(self):
+        """
+        Class constructor. Starts empty.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._buckets = {}
+        self._count = 0
+
+    def __contains__(self, address):
+        bucket = self._buckets.get(address >> 16)
+        if bucket is None:
+            return False
+        low = address & 0xFFFF
+        if isinstance(bucket, bytearray):
+            return bool(bucket[low >> 3] & (1 << (low & 7)))
+        index = bisect_left(bucket, low)
+        return index < len(bucket) and bucket[index] == low
+
+    def __len__(self):
+        return self._count
+
+    def add(self, address):
+        """
+        Remembers an IP Address. Returns True if it had not been seen before.
+
+        Argument(s):
+        address -- integer value of an IP Address.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        high = address >> 16
+        low = address & 0xFFFF
+        bucket = self._buckets.get(high)
+        if bucket is None:
+            self._buckets[high] = array('H', [low])
+        elif isinstance(bucket, bytearray):
+            if bucket[low >> 3] & (1 << (low & 7)):
+                return False
+            bucket[low >> 3] |= 1 << (low & 7)
+        else:
+            index = bisect_left(bucket, low)
+            if index < len(bucket) and bucket[index] == low:
+                return False
+            if len(bucket) < self.__BITMAPAT__:
+                bucket.insert(index, low)
+            else:
+                bitmap = bytearray(8192)
+                for value in bucket:
+                    bitmap[value >> 3] |= 1 << (value & 7)
+                bitmap[low >> 3] |= 1 << (low & 7)
+                self._buckets[high] = bitmap
+        self._count += 1
+        return True
+
+
+class TargetPipeline(object):
+    """
+    TargetPipeline provides Class Methods that chain generators turning
+    the raw strings read from the command line, a target file or stdin
+    into the targets Automater looks up. Each stage takes an iterable and
+    yields as it goes, so a feed is never held in memory and lookups can
+    start as soon as the first target has been read.
+
+    Public Method(s):
+    (Class Method) getTargets
+    (Class Method) defang
+    (Class Method) normalize
+    (Class Method) expand
+    (Class Method) dedupe
+
+    Instance variable(s):
+    No instance variables.
+    """
+
+    @classmethod
+    def getTargets(cls, rawtargets, maxexpansion=0, excludereserved=False, exactlimit=None, verbose=False):
+        """
+        Chains every stage of the pipeline over the raw target strings:
+        defang, normalize, expand ranges and drop duplicates.
+
+        Argument(s):
+        rawtargets -- iterable of strings read from the input.
+        maxexpansion -- integer representing the most addresses a single range
+        expands to. Default is 0 which does not limit the expansion.
+        excludereserved -- true or false representing if special purpose
+        addresses are left out of ranges. Default is False.
+        exactlimit -- integer representing how many unique targets are
+        remembered exactly before a probabilistic filter is used. Default
+        is None which uses TargetSet's default.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        Iterator of string(s) representing targets.
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        return cls.dedupe(cls.expand(cls.normalize(cls.defang(rawtargets)), maxexpansion, excludereserved),
+                          exactlimit, verbose)
+
+    @classmethod
+    def defang(cls, targets):
+        """
+        Replaces the defanged dots [.], {.} and (.) with a plain dot.
+
+        Argument(s):
+        targets -- iterable of target strings.
+
+        Return value(s):
+        Iterator of string(s).
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for target in targets:
+            yield target.replace('[.]', '.').replace('{.}', '.').replace('(.)', '.')
+
+    @classmethod
+    def normalize(cls, targets):
+        """
+        Puts each target in its canonical form so the same indicator is
+        always written the same way. Surrounding whitespace is removed,
+        the host part is lower-cased and trailing dots are dropped from
+        it. A path after the host keeps its case. Empty targets are
+        dropped.
+
+        Argument(s):
+        targets -- iterable of target strings.
+
+        Return value(s):
+        Iterator of string(s).
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for target in targets:
+            target = target.strip()
+            schemeindex = target.find('://')
+            hoststart = schemeindex + 3 if schemeindex >= 0 else 0
+            hostend = target.find('/', hoststart)
+            if hostend < 0:
+                hostend = len(target)
+            host = target[hoststart:hostend].lower().rstrip('.')
+            target = target[:hoststart].lower() + host + target[hostend:]
+            if target:
+                yield target
+
+    @classmethod
+    def dedupe(cls, targets, exactlimit=None, verbose=False):
+        """
+        Drops every target that has already been seen, keeping the first
+        occurrence in order.
+
+        Argument(s):
+        targets -- iterable of target strings.
+        exactlimit -- integer representing how many unique targets are
+        remembered exactly before a probabilistic filter is used. Default
+        is None which uses TargetSet's default.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        Iterator of string(s).
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        seen = TargetSet(exactlimit, verbose)
+        for target in targets:
+            if seen.add(target):
+                yield target
+
+    @classmethod
+    def expand(cls, targets, maxexpansion=0, excludereserved=False):
+        """
+        Expands IP Address ranges into the IP Addresses they hold. Any
+        other target is passed through unchanged.
+
+        Argument(s):
+        targets -- iterable of target strings.
+        maxexpansion -- integer representing the most addresses a single range
+        expands to. Default is 0 which does not limit the expansion.
+        excludereserved -- true or false representing if special purpose
+        addresses are left out of ranges. Default is False.
+
+        Return value(s):
+        Iterator of string(s).
+
+        Restriction(s):
+        This Method is tagged as a Class Method
+        """
+        for target in targets:
+            if IPWrapper.isIPorIPList(target):
+                for targ in IPWrapper.getTarget(target, maxexpansion, excludereserved):
+                    yield targ
+            else:
+                yield target
+
+
+class TargetSet(object):
+    """
+    TargetSet remembers the targets already seen by the pipeline. IP
+    Addresses, including every address a range expands to, are always
+    remembered exactly as integers in a SeenAddressSet. Other targets
+    are kept in an exact set until exactlimit unique ones have been
+    seen. It then moves to a BloomFilter, so a feed of tens of millions
+    of indicators costs a bounded number of bytes per indicator instead
+    of a Python string each. Once filtered, a small fraction of unique
+    targets (about 1 in 1000) may be mistaken for duplicates.
+
+    Public Method(s):
+    add
+    (Property) Exact
+
+    Instance variable(s):
+    _exactlimit
+    _verbose
+    _addresses
+    _exact
+    _filter
+    """
+    __EXACTLIMIT__ = 1000000
+    __ERRORRATE__ = 0.001
+
+    def __init__(self, exactlimit=None, verbose=False):
+        """
+        Class constructor. Starts with an empty exact set.
+
+        Argument(s):
+        exactlimit -- integer representing how many unique targets other than
+        IP Addresses are remembered exactly. Default is None which uses 1000000.
+        verbose -- boolean value representing whether output will be printed to stdout
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._exactlimit = self.__EXACTLIMIT__ if exactlimit is None else max(0, exactlimit)
+        self._verbose = verbose
+        self._addresses = SeenAddressSet()
+        self._exact = set()
+        self._filter = None
+
+    @property
+    def Exact(self):
+        """
+        Returns True while targets other than IP Addresses are still
+        remembered exactly.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._filter is None
+
+    def add(self, target):
+        """
+        Remembers a target. Returns True if it had not been seen before.
+
+        Argument(s):
+        target -- string representing a normalized target.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        address = IPWrapper.addressToInt(target)
+        if address is not None:
+            return self._addresses.add(address)
+        if self._filter is not None:
+            return self._filter.add(target)
+        if target in self._exact:
+            return False
+        if len(self._exact) < self._exactlimit:
+            self._exact.add(target)
+            return True
+        SiteDetailOutput.PrintStandardOutput('[*] More than {limit} unique targets. Duplicates are now found with a '
+                                             'probabilistic filter.'.format(limit=self._exactlimit),
+                                             verbose=self._verbose)
+        self._filter = BloomFilter(max(self._exactlimit, 1) * 4, self.__ERRORRATE__)
+        for seen in self._exact:
+            self._filter.add(seen)
+        self._exact = None
+        return self._filter.add(target)
+
+
+class BloomFilter(object):
+    """
+    BloomFilter is a scalable Bloom filter held in bytearrays. Each
+    filter is sized for a capacity and error rate; when it is full a new
+    filter with twice the capacity is added, so the error rate stays
+    bounded however many strings are added and memory grows by roughly
+    two bytes per string.
+
+    Public Method(s):
+    add
+    (Property) Count
+
+    Instance variable(s):
+    _capacity
+    _errorrate
+    _filters
+    _count
+    """
+
+    def __init__(self, capacity, errorrate):
+        """
+        Class constructor. Creates the first filter.
+
+        Argument(s):
+        capacity -- integer representing how many strings the first filter holds.
+        errorrate -- float representing the chance an unseen string is reported
+        as seen.
+
+        Return value(s):
+        Nothing is returned from this Method.
+        """
+        self._capacity = max(1, capacity)
+        self._errorrate = errorrate
+        self._filters = []
+        self._count = 0
+        self.addFilter()
+
+    @property
+    def Count(self):
+        """
+        Returns the number of strings added.
+
+        Argument(s):
+        No arguments are required.
+
+        Return value(s):
+        integer.
+
+        Restriction(s):
+        This Method is tagged as a Property.
+        """
+        return self._count
+
+    def addFilter(self):
+        capacity = self._capacity * (2 ** len(self._filters))
+        # each filter takes half the remaining error budget so the total stays below errorrate
+        errorrate = self._errorrate / (2 ** (len(self._filters) + 1))
+        bits = int(math.ceil(-capacity * math.log(errorrate) / (math.log(2) ** 2)))
+        hashes = max(1, int(round(bits / float(capacity) * math.log(2))))
+        self._filters.append([bytearray((bits + 7) // 8), bits, hashes, capacity, 0])
+
+    def contains(self, filterbits, bits, hashes, first, second):
+        for index in xrange(hashes):
+            position = (first + index * second) % bits
+            if not filterbits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, value):
+        """
+        Adds a string to the filter. Returns True if it had not been seen
+        before, or False if it has probably been seen.
+
+        Argument(s):
+        value -- string to add.
+
+        Return value(s):
+        Boolean.
+
+        Restriction(s):
+        The Method has no restrictions.
+        """
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        # double hashing: every position is derived from the two halves of one digest
+        first, second = struct.unpack('>QQ', hashlib.md5(value).digest())
+        second |= 1
+        for filterbits, bits, hashes, capacity, count in self._filters:
+            if self.contains(filterbits, bits, hashes, first, second):
+                return False
+        current = self._filters[-1]
+        if current[4] >= current[3]:
+            self.addFilter()
+            current = self._filters[-1]
+        filterbits, bits, hashes = current[0], current[1], current[2]
+        for index in xrange(hashes):
+            position = (first + index * second) % bits
+            filterbits[position >> 3] |= 1 << (position & 7)
+        current[4] += 1
+        self._count += 1
+        return True
 
 
 class VersionChecker(object):